@@ -167,6 +167,30 @@ class XMLBasedAtlas(BaseAtlas):
         return c
 
 
+    def _check_ranges(self, coords):
+        """Check and adjust many voxel coordinates at once
+
+        Parameters
+        ----------
+        coords : array-like (N x 3)
+          Voxel coordinates.
+
+        Returns
+        -------
+        array (N x 3) of int
+          Coordinates, where the ones outside of the extent are reset to
+          (0,0,0), as done by `_check_range`.
+        """
+        coords = np.array(coords, dtype=int).reshape(-1, 3)
+        outside = np.logical_or(coords < 0,
+                                coords >= self.extent[None]).any(axis=1)
+        if outside.any():
+            warning("%i coordinates are not within the extent %r."
+                    " Reseting them to (0,0,0)" % (outside.sum(), self.extent))
+            coords[outside] = 0
+        return coords
+
+
     @staticmethod
     def _check_version(version):
         """To be overriden in the derived classes. By default anything is good"""
@@ -267,6 +291,28 @@ class XMLBasedAtlas(BaseAtlas):
         return result
 
 
+    def label_points(self, coords, levels=None):
+        """Return labels for many spatial points at specified levels
+
+        All points are transformed into the voxel space and labeled at once
+        using `label_voxels`, which must be provided by the atlas.
+
+        Parameters
+        ----------
+        coords : array-like (N x 3)
+          Coordinates of the points (xyz)
+        levels : None or list of int
+          At what levels to return the results
+        """
+        coords = np.asanyarray(coords).reshape(-1, 3)
+        voxels = self.spaceT.transform_points(coords).reshape(-1, 3)
+
+        result = self.label_voxels(voxels, levels)
+        result['coord_queried'] = coords
+        result['voxel_atlas'] = voxels
+        return result
+
+
     def levels_listing(self):
         lkeys = range(self.nlevels)
         return '\n'.join(['%d: ' % k + str(self._levels[k])
@@ -763,6 +809,40 @@ class LabelsAtlas(PyMVPAAtlas):
         result['labels'] = resultLevels
         return result
 
+
+    def label_voxels(self, coords, levels=None):
+        """Return labels for many voxels at once
+
+        Parameters
+        ----------
+        coords : array-like (N x 3)
+          Voxel coordinates.
+        levels : None or list of int
+          At what levels to return the results
+
+        Returns
+        -------
+        dict
+          'labels' is a (nlevels x N) array with the indexes of the labels
+          of all voxels at the levels listed in 'levels'. Labels themselves
+          are available from the corresponding level of `levels`.
+          'voxel_queried' contains the range-checked voxel coordinates.
+        """
+        levels = self._get_selected_levels(levels=levels)
+        c = self._check_ranges(coords)
+
+        indexes = []
+        for level in levels:
+            if not self._levels.has_key(level):
+                raise IndexError(
+                    "Unknown index or description for level %d" % level)
+            indexes.append(self._levels[level].index)
+
+        labels = self._data[np.array(indexes, dtype=int)[:, None],
+                            c[:, 0], c[:, 1], c[:, 2]].astype(int)
+
+        return {'voxel_queried': c, 'levels': levels, 'labels': labels}
+
     __doc__ = enhanced_doc_string('LabelsAtlas', locals(), PyMVPAAtlas)
 
 
@@ -824,15 +904,21 @@ class ReferencesAtlas(PyMVPAAtlas):
                   "Known are %r" % (self._levels.keys(), )
 
 
-    ##REF: Name was automagically refactored
-    def label_voxel(self, c, levels = None):
-
+    def _assure_reference_level(self):
+        """Assign 0th level for reference if none was provided
+        """
         if self.__referenceLevel is None:
             warning("You did not provide what level to use "
                     "for reference. Assigning 0th level -- '%s'"
                     % (self._levels[0],))
             self.set_reference_level(0)
-            # return self.__referenceAtlas.label_voxel(c, levels)
+
+
+    ##REF: Name was automagically refactored
+    def label_voxel(self, c, levels = None):
+
+        self._assure_reference_level()
+        # return self.__referenceAtlas.label_voxel(c, levels)
 
         c = self._check_range(c)
 
@@ -856,6 +942,51 @@ class ReferencesAtlas(PyMVPAAtlas):
         return result
 
 
+    def label_voxels(self, coords, levels=None):
+        """Return labels for many voxels at once
+
+        The atlas image stores for every voxel the coordinates of the
+        closest voxel of the reference level, i.e. it already is a
+        precomputed distance-transform index.  Hence closest referenced
+        voxels of all given voxels are obtained with a single lookup, and
+        all voxels are labeled at once by the referenced atlas.
+
+        Parameters
+        ----------
+        coords : array-like (N x 3)
+          Voxel coordinates.
+        levels : None or list of int
+          At what levels of the referenced atlas to return the results
+
+        Returns
+        -------
+        dict
+          As returned by `label_voxels` of the referenced atlas, where
+          'voxel_queried' are the voxels which were actually labeled.
+          'voxel_referenced' contains the range-checked given voxels,
+          'referenced' indicates for which of them the closest referenced
+          voxel within `distance` was used, and 'distance' holds the
+          distances to those (0 for the others).
+        """
+        self._assure_reference_level()
+
+        c = self._check_ranges(coords)
+
+        # obtain coordinates of the closest voxels
+        cref = self._data[np.array(self.__referenceLevel.indexes)[:, None],
+                          c[:, 0], c[:, 1], c[:, 2]].T.astype(int)
+        dist = np.sqrt(np.sum(((cref - c) * self.voxdim) ** 2, axis=1))
+        # neglect everything smaller
+        referenced = (self.distance - dist) >= 1e-3
+
+        result = self.__referenceAtlas.label_voxels(
+                    np.where(referenced[:, None], cref, c), levels)
+        result['voxel_referenced'] = c
+        result['referenced'] = referenced
+        result['distance'] = np.where(referenced, dist, 0)
+        return result
+
+
     ##REF: Name was automagically refactored
     def levels_listing(self):
         return self.__referenceAtlas.levels_listing()
@@ -67,9 +67,27 @@ class TransformationBase:
     def __call__(self, coord):
         return self[coord]
 
+    def transform_points(self, coords):
+        """
+        Apply the transformation (including previous ones) to many
+        coordinates (N x 3) at once
+        """
+        # provide a copy to manipulate with
+        coords = np.array(coords, dtype=float).reshape(len(coords), -1)
+        if self.previous:
+            coords = self.previous.transform_points(coords)
+        return self.apply_points(coords)
+
     def apply(self, coord):
         return coord
 
+    def apply_points(self, coords):
+        """Apply the transformation to each row of `coords`
+
+        Subclasses should override it with a vectorized implementation.
+        """
+        return np.array([self.apply(c) for c in coords])
+
 
 class SpaceTransformation(TransformationBase):
     """
@@ -90,8 +108,10 @@ class SpaceTransformation(TransformationBase):
 
         if to_real_space:
             self.apply = self.to_real_space
+            self.apply_points = self.to_real_space
         else:
             self.apply = self.to_voxel_space
+            self.apply_points = self._points_to_voxel_space
 
     ##REF: Name was automagically refactored
     def to_real_space(self, coord):
@@ -109,6 +129,12 @@ class SpaceTransformation(TransformationBase):
         coord += self.origin
         return map(lambda x:int(round(x)), coord)
 
+    def _points_to_voxel_space(self, coords):
+        coords /= self.voxelSize
+        coords += self.origin
+        # round half away from zero, as the builtin round() does
+        return (np.sign(coords) * np.floor(np.abs(coords) + 0.5)).astype(int)
+
 
 class Linear(TransformationBase):
     """
@@ -137,6 +163,9 @@ class Linear(TransformationBase):
         result = np.dot(self.M, coord_)
         return result[0:-1]
 
+    def apply_points(self, coords):
+        return np.dot(coords, self.M[:-1, :-1].T) + self.M[:-1, -1]
+
 
 class MNI2Tal_MatthewBrett(TransformationBase):
     """
@@ -162,6 +191,12 @@ class MNI2Tal_MatthewBrett(TransformationBase):
         return {True: self.__upper,
                 False: self.__lower}[coord[2]>=0][coord]
 
+    def apply_points(self, coords):
+        upper = coords[:, 2] >= 0
+        result = self.__lower.apply_points(coords)
+        result[upper] = self.__upper.apply_points(coords[upper])
+        return result
+
 
 def mni_to_tal_meyer_lindenberg98 (*args, **kwargs):
     """
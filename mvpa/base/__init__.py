@@ -22,7 +22,7 @@ __docformat__ = 'restructuredtext'
 
 import sys, os
 from mvpa.base.config import ConfigManager
-from mvpa.base.verbosity import LevelLogger, OnceLogger
+from mvpa.base.verbosity import LevelLogger, OnceLogger, Profiler
 
 #
 # Setup verbose and debug outputs
@@ -172,6 +172,19 @@ warning = WarningLog(
     )
 
 
+#
+# Profiling of hot paths -- available also with optimized Python
+#
+profiler = __Singleton("profiler", Profiler(
+    active=cfg.getboolean('general', 'profile', default=False),
+    memory=cfg.getboolean('profile', 'memory', default=True)))
+
+if profiler.active:
+    import atexit
+    atexit.register(profiler.dump,
+                    cfg.get('profile', 'output', default='stderr'))
+
+
 if __debug__:
     from mvpa.base.verbosity import DebugLogger
     # NOTE: all calls to debug must be preconditioned with
@@ -164,7 +164,10 @@ class ConditionalAttribute(IndexedCollectable):
 
     def __reduce__(self):
         icr = IndexedCollectable.__reduce__(self)
-        icr[2].update({'_ConditionalAttribute__enabled' : self.__enabled})
+        # the value has to be part of the state as well, since the constructor
+        # would ignore it if the attribute is disabled by default
+        icr[2].update({'_ConditionalAttribute__enabled' : self.__enabled,
+                       '_value' : self._value})
         res = (icr[0], (self._defaultenabled,) + icr[1], icr[2])
         #if __debug__ and 'COL_RED' in debug.active:
         #    debug('COL_RED', 'Returning %s for %s' % (res, self))
@@ -29,6 +29,7 @@ if __debug__:
 
 _object_getattribute = dict.__getattribute__
 _object_setattr = dict.__setattr__
+_object_getitem = dict.__getitem__
 _object_setitem = dict.__setitem__
 
 # To validate fresh
@@ -260,6 +261,10 @@ class ArrayCollectable(SequenceCollectable):
                                 length=self._target_length)
         # just get a view of the old data!
         copied.value = self.value.view()
+        # same data -- hence caches remain valid
+        copied._unique_values = self._unique_values
+        copied._factorization = self._factorization
+        copied._groups = self._groups
         return copied
 
 
@@ -282,6 +287,71 @@ class ArrayCollectable(SequenceCollectable):
         SequenceCollectable._set(self, val)
 
 
+    def _reset_unique(self):
+        SequenceCollectable._reset_unique(self)
+        self._factorization = None
+        self._groups = None
+
+
+    def _get_factorization(self):
+        """Compute (once per assigned value) the integer coding of the value.
+
+        Returns
+        -------
+        tuple
+          (unique, codes, order, starts, counts): the sorted unique values,
+          for every element the index of its value in `unique`, indices of
+          all elements stably sorted by their code, and the offsets and
+          number of elements of each unique value within `order`.
+        """
+        if self._factorization is None:
+            value = self.value
+            unique, codes = np.unique(value, return_inverse=True)
+            codes = codes.reshape(value.shape)
+            counts = np.bincount(codes.ravel())
+            # stable sort keeps the original order within each group
+            order = np.argsort(codes.ravel(), kind='mergesort')
+            starts = np.cumsum(counts) - counts
+            self._factorization = (unique, codes, order, starts, counts)
+            if self._unique_values is None:
+                self._unique_values = unique
+        return self._factorization
+
+
+    @property
+    def codes(self):
+        """Index of each element's value into `unique`.
+
+        Allows for bincount-style operations on groups of elements sharing
+        the same value, instead of comparing the value against each unique
+        value.
+        """
+        if self.value is None:
+            return None
+        return self._get_factorization()[1]
+
+
+    @property
+    def counts(self):
+        """Number of occurrences of each value in `unique`."""
+        if self.value is None:
+            return None
+        return self._get_factorization()[4]
+
+
+    @property
+    def groups(self):
+        """List of index arrays with the elements for each value in `unique`.
+        """
+        if self.value is None:
+            return None
+        if self._groups is None:
+            unique, codes, order, starts, counts = self._get_factorization()
+            self._groups = [order[start:start + count]
+                            for start, count in zip(starts, counts)]
+        return self._groups
+
+
 class SampleAttribute(ArrayCollectable):
     """Per sample attribute in a dataset"""
     pass
@@ -320,7 +390,8 @@ class Collection(dict):
         ----------
         deep : boolean, optional
           If False, a shallow copy of the collection is return instead. The copy
-          contains only views of the values.
+          contains only views of the values (`UniformLengthCollection` shares
+          the very same values until they get modified).
         a : list or None
           List of attributes to include in the copy of the dataset. If
           `None` all attributes are considered. If an empty list is
@@ -455,7 +526,8 @@ class Collection(dict):
 
     def __getattribute__(self, key):
         try:
-            return self[key].value
+            # read-only access -- no need to go through __getitem__
+            return _object_getitem(self, key).value
         except KeyError:
             return _object_getattribute(self, key)
 
@@ -479,6 +551,17 @@ class Collection(dict):
 
 class UniformLengthCollection(Collection):
     """Container for attributes with the same length.
+
+    Shallow copies of such a collection are copy-on-write: the copy shares
+    the attributes with the original collection, and a private attribute
+    (holding a view of the same data) is created only once an attribute
+    is accessed via item access (e.g. ``col['targets']``) or assigned a new
+    value (e.g. ``col.targets = ...``) on either side. Until then, attribute
+    values (e.g. ``col.targets``) are the very same array objects on both
+    sides, hence not only in-place changes of the data, but also of the
+    array metadata (e.g. ``.shape``) affect both collections. Attributes
+    obtained by iterating over the collection (e.g. `values()`) must not be
+    modified.
     """
     def __init__(self, items=None, length=None):
         """
@@ -491,6 +574,8 @@ class UniformLengthCollection(Collection):
         # cannot call set_length(), since base class __getattribute__ goes wild
         # before its __init__ is called.
         self._uniform_length = length
+        # names of attributes shared with copies of this collection
+        self._shared = set()
         Collection.__init__(self, items)
 
 
@@ -499,9 +584,22 @@ class UniformLengthCollection(Collection):
                     (self.items(), self._uniform_length))
 
     @borrowdoc(Collection)
-    def copy(self, *args, **kwargs):
+    def copy(self, deep=True, a=None, memo=None):
+        if not deep:
+            # share all attributes until either side modifies them
+            anew = self.__class__(length=self._uniform_length)
+            shared = _object_getattribute(self, '_shared')
+            anew_shared = _object_getattribute(anew, '_shared')
+            for k, v in self.iteritems():
+                if a is None or k in a:
+                    _object_setitem(anew, k, v)
+                    shared.add(k)
+                    anew_shared.add(k)
+            return anew
+
         # Create a generic copy of the collection
-        anew = super(UniformLengthCollection, self).copy(*args, **kwargs)
+        anew = super(UniformLengthCollection, self).copy(deep=deep, a=a,
+                                                         memo=memo)
 
         # if it had any attributes assigned, those should have set
         # attr_length already, otherwise lets assure that we copy the
@@ -520,8 +618,21 @@ class UniformLengthCollection(Collection):
           this length.
         """
         self._uniform_length = value
-        for v in self.values():
-            v.set_length_check(value)
+        for k, v in self.items():
+            if v._target_length != value:
+                self[k].set_length_check(value)
+
+
+    def __getitem__(self, key):
+        value = _object_getitem(self, key)
+        shared = _object_getattribute(self, '_shared')
+        if shared and key in shared:
+            # the attribute is shared with a copy, so get a private one
+            # before handing it out for potential modification
+            value = copy.copy(value)
+            _object_setitem(self, key, value)
+            shared.discard(key)
+        return value
 
 
     def __setitem__(self, key, value):
@@ -555,6 +666,7 @@ class UniformLengthCollection(Collection):
                                 str(self)))
         # tell the attribute to maintain the desired length
         value.set_length_check(ulength)
+        _object_getattribute(self, '_shared').discard(key)
         Collection.__setitem__(self, key, value)
 
 
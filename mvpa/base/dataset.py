@@ -339,9 +339,14 @@ class AttrDataset(object):
         ----------
         deep : boolean, optional
           If False, a shallow copy of the dataset is return instead.  The copy
-          contains only views of the samples, sample attributes and feature
-          attributes, as well as shallow copies of all dataset
-          attributes.
+          contains only a view of the samples, as well as shallow copies of
+          all dataset attributes. Sample and feature attributes hold the
+          very same array objects as in the original dataset until an
+          attribute is reassigned or accessed via item access on either side
+          (see `UniformLengthCollection`), hence the costs of a shallow copy
+          do not depend on the number of attributes. Just like the data
+          itself, in-place changes of the arrays' metadata (e.g. of
+          ``.shape``) are visible in both datasets until then.
         sa : list or None
           List of attributes in the sample attributes collection to include in
           the copy of the dataset. If `None` all attributes are considered. If
@@ -359,11 +364,16 @@ class AttrDataset(object):
           inside the __deepcopy__() method and refers to the dict-argument
           `memo` in the Python documentation.
         """
-        if deep:
-            samples = copy.deepcopy(self.samples, memo)
-        else:
-            samples = self.samples.view()
-
+        if not deep:
+            out = self.__class__(self.samples.view())
+            # adopt the copied collections directly, since populating the
+            # fresh ones of the new dataset would modify shared attributes
+            out.sa = self.sa.copy(a=sa, deep=False)
+            out.fa = self.fa.copy(a=fa, deep=False)
+            out.a = self.a.copy(a=a, deep=False)
+            return out
+
+        samples = copy.deepcopy(self.samples, memo)
         # call the generic init
         out = self.__class__(samples,
                              sa=self.sa.copy(a=sa, deep=deep, memo=memo),
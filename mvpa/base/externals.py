@@ -480,6 +480,124 @@ _KNOWN = {'libsvm':'import mvpa.clfs.libsvmc._svm as __; x=__.seq_to_svm_node',
           }
 
 
+# Checks which depend on the running session or on data files rather than
+# on the installation, hence their results are never stored on disk
+_UNCACHED = set(['running ipython env', 'pylab plottable',
+                 'atlas_pymvpa', 'atlas_fsl'])
+# Successful checks of these configure the external (matplotlib backend,
+# R options, libsvm verbosity), so only their absence is stored on disk
+_CACHED_IF_MISSING = set(['matplotlib', 'pylab', 'rpy2', 'lars', 'mass',
+                          'elasticnet', 'glmnet', 'libsvm verbosity control'])
+# Only the checks known at this point -- custom ones added later on are
+# never stored
+_CACHEABLE = set(_KNOWN.keys()) - _UNCACHED
+# Directories (relative to the mvpa package) of the extensions which get
+# checked, hence their contents are part of the stamp of the cache
+_IN_PACKAGE_EXTENSIONS = [('clfs', 'libsvmc')]
+
+_cache = None
+"""Results of the checks stored on disk (loaded upon first use)"""
+_cache_filename = None
+_cache_modified = False
+
+
+def _get_cache_filename():
+    """Return filename of the on-disk cache of the checks (or None)
+
+    Results of the checks are valid only for the same interpreter, the
+    same versions of PyMVPA and NumPy, unmodified directories in
+    `sys.path`, and unmodified extensions built within PyMVPA itself
+    (e.g. libsvm wrapper), hence all of them are hashed into the filename.
+    """
+    if not cfg.getboolean('externals', 'cache', default=True):
+        return None
+    import sys
+    import mvpa
+    try:
+        from hashlib import md5
+    except ImportError:
+        from md5 import new as md5
+    stamp = [sys.executable, sys.version, mvpa.__version__, np.__version__]
+    cwd = os.getcwd()
+    for path in sys.path:
+        # current directory is not a place for installed externals
+        if not path or os.path.abspath(path) == cwd:
+            continue
+        try:
+            stamp.append('%s:%r' % (path, os.stat(path).st_mtime))
+        except OSError:
+            pass
+    # extensions built in-place (e.g. by 'setup.py build_ext --inplace')
+    # do not modify any directory in sys.path
+    for path in _IN_PACKAGE_EXTENSIONS:
+        path = os.path.join(os.path.dirname(mvpa.__file__), *path)
+        try:
+            for entry in sorted(os.listdir(path)):
+                entry = os.path.join(path, entry)
+                stamp.append('%s:%r' % (entry, os.stat(entry).st_mtime))
+        except OSError:
+            pass
+    cachedir = cfg.get('externals', 'cache directory',
+                       default=os.path.join(os.path.expanduser('~'),
+                                            '.cache', 'pymvpa'))
+    return os.path.join(os.path.expanduser(cachedir),
+                        'externals-%s' % md5('\n'.join(stamp)).hexdigest())
+
+
+def _get_cache():
+    """Load the on-disk cache of the checks if it was not loaded yet"""
+    global _cache, _cache_filename
+    if _cache is None:
+        _cache = {}
+        # some externals (e.g. weave) extend sys.path, so the filename is
+        # determined only once
+        _cache_filename = filename = _get_cache_filename()
+        if filename is not None and os.path.exists(filename):
+            try:
+                for line in open(filename):
+                    result, dep = line.rstrip('\n').split('\t', 1)
+                    if dep in _CACHEABLE:
+                        _cache[dep] = result == 'yes'
+            except (IOError, ValueError), e:
+                if __debug__:
+                    debug('EXT', "Failed to load cached checks from %s: %s"
+                          % (filename, e))
+                _cache = {}
+    return _cache
+
+
+def _save_cache():
+    """Store results of the checks on disk if there are new ones"""
+    filename = _cache_filename
+    if not _cache_modified or filename is None:
+        return
+    try:
+        cachedir = os.path.dirname(filename)
+        if not os.path.exists(cachedir):
+            os.makedirs(cachedir)
+        # write into a temporary file first, so concurrently running
+        # processes never see a partial cache
+        import tempfile
+        fd, tmpname = tempfile.mkstemp(dir=cachedir)
+        f = os.fdopen(fd, 'w')
+        for dep, result in sorted(_cache.items()):
+            f.write('%s\t%s\n' % ({True: 'yes', False: 'no'}[result], dep))
+        f.close()
+        os.rename(tmpname, filename)
+        # caches stored for previous installations are of no use any longer
+        basename = os.path.basename(filename)
+        for entry in os.listdir(cachedir):
+            if entry.startswith('externals-') and entry != basename:
+                os.unlink(os.path.join(cachedir, entry))
+    except (IOError, OSError), e:
+        if __debug__:
+            debug('EXT', "Failed to store cached checks in %s: %s"
+                  % (filename, e))
+
+import atexit
+atexit.register(_save_cache)
+
+
 def exists(dep, force=False, raise_=False, issueWarning=None):
     """
     Test whether a known dependency is installed on the system.
@@ -505,6 +623,8 @@ def exists(dep, force=False, raise_=False, issueWarning=None):
       If True, standard message would be used for the warning
       text.
     """
+    global _cache_modified
+
     # if we are provided with a list of deps - go through all of them
     if isinstance(dep, list) or isinstance(dep, tuple):
         results = [ exists(dep_, force, raise_) for dep_ in dep ]
@@ -545,6 +665,13 @@ def exists(dep, force=False, raise_=False, issueWarning=None):
 
     if not _KNOWN.has_key(dep):
         raise ValueError, "%s is not a known dependency key." % (dep)
+    elif not force and dep in _CACHEABLE and dep in _get_cache() \
+             and not cfg.getboolean('externals', 'retest', default='no'):
+        # result of the check is known from previous sessions
+        result = _cache[dep]
+        if __debug__:
+            debug('EXT', "Presence of %s is%s known from the cache" %
+                  (dep, {True:'', False:' NOT'}[result]))
     else:
         # try and load the specific dependency
         if __debug__:
@@ -580,6 +707,11 @@ def exists(dep, force=False, raise_=False, issueWarning=None):
             debug('EXT', "Presence of %s is%s verified%s" %
                   (dep, {True:'', False:' NOT'}[result], estr))
 
+        if dep in _CACHEABLE \
+               and (not result or not dep in _CACHED_IF_MISSING):
+            _get_cache()[dep] = result
+            _cache_modified = True
+
     if not result:
         if raise_:
             raise RuntimeError, "Required external '%s' was not found" % dep
@@ -619,6 +751,44 @@ versions._KNOWN.update({
     })
 
 
+def check_nproc(nproc, purpose):
+    """Verify that multiple processes can be used, if requested.
+
+    Parameters
+    ----------
+    nproc : None or int
+      Requested number of processes.
+    purpose : str
+      What the processes are used for (for the error message).
+
+    Raises
+    ------
+    RuntimeError
+      If `nproc` is larger than one, but `pprocess` is not available.
+    """
+    if nproc > 1 and not exists('pprocess'):
+        raise RuntimeError("The 'pprocess' module is required for "
+                           "multiprocess %s. Please either "
+                           "install python-pprocess, or reduce `nproc` "
+                           "to 1 (got nproc=%i)" % (purpose, nproc))
+
+
+def get_nproc(nproc):
+    """Number of processes to use, with None meaning all available cores.
+    """
+    if nproc is None:
+        nproc = 1
+        if exists('pprocess'):
+            import pprocess
+            try:
+                nproc = pprocess.get_number_of_cores() or 1
+            except AttributeError:
+                warning("pprocess version %s has no API to figure out maximal "
+                        "number of cores. Using 1"
+                        % versions['pprocess'])
+    return nproc
+
+
 ##REF: Name was automagically refactored
 def test_all_dependencies(force=False, verbosity=1):
     """
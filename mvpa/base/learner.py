@@ -11,6 +11,7 @@
 __docformat__ = 'restructuredtext'
 
 import time
+from mvpa.base import profiler
 from mvpa.base.node import Node
 from mvpa.base.state import ConditionalAttribute
 from mvpa.base.types import is_datasetlike
@@ -110,6 +111,8 @@ class Learner(Node):
             debug("LRN", "Training learner %(lrn)s on dataset %(dataset)s",
                   msgargs={'lrn':self, 'dataset': ds})
 
+        ptoken = profiler.active and profiler.start(self, 'train')
+
         self._pretrain(ds)
 
         # remember the time when started training
@@ -139,6 +142,9 @@ class Learner(Node):
         # finally flag as trained
         self._set_trained()
 
+        if ptoken:
+            profiler.stop(ptoken)
+
 
     def untrain(self):
         """Reverts changes in the state of this node caused by previous training
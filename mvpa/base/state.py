@@ -68,6 +68,48 @@ _def_sep = ('`', '')[int(_in_ipython)]
 _object_getattribute = object.__getattribute__
 _object_setattr = object.__setattr__
 
+# Values which deepcopy would return as is, hence can be shared between
+# copies of collections and their items
+_IMMUTABLE_TYPES = (type(None), bool, int, long, float, complex, basestring,
+                    type, type(lambda: None), type(len))
+
+_immutable_types = set(_IMMUTABLE_TYPES)
+
+def _is_immutable(value):
+    """Check if a value is safe to be shared instead of being deep-copied"""
+    t = type(value)
+    if t in _immutable_types:
+        return True
+    if t is tuple or t is frozenset:
+        for v in value:
+            if not _is_immutable(v):
+                return False
+        return True
+    return isinstance(value, _IMMUTABLE_TYPES)
+
+
+def _deepcopy_dict(d, memo):
+    """Deep-copy values of an instance __dict__ unless they are immutable"""
+    res = d.copy()
+    for k, v in d.iteritems():
+        if not type(v) in _immutable_types and not _is_immutable(v):
+            res[k] = copy.deepcopy(v, memo)
+    return res
+
+
+def _prototype_copy(obj, memo):
+    """Deep copy of an object derived from the state of a prototype
+
+    In contrast to a generic deepcopy through `__reduce__`, the constructor
+    is not invoked, and all immutable attributes (docstrings, names, indexes,
+    scalar values) are simply shared with the prototype.
+    """
+    anew = obj.__class__.__new__(obj.__class__)
+    memo[id(obj)] = anew
+    anew.__dict__.update(_deepcopy_dict(obj.__dict__, memo))
+    return anew
+
+
 ###################################################################
 # Collections
 #
@@ -108,6 +150,22 @@ class Collection(BaseCollection):
         return res
 
 
+    def __deepcopy__(self, memo):
+        # Collections of all instances of a class are created as copies
+        # of the class template, so avoid re-constructing every item:
+        # use the template items as prototypes for the new ones
+        anew = _prototype_copy(self, memo)
+        for k, v in self.iteritems():
+            if id(v) in memo:
+                v = memo[id(v)]
+            elif isinstance(v, IndexedCollectable):
+                v = _prototype_copy(v, memo)
+            else:
+                v = copy.deepcopy(v, memo)
+            dict.__setitem__(anew, k, v)
+        return anew
+
+
     @borrowdoc(BaseCollection)
     def copy(self, *args, **kwargs):
         # Create a generic copy of the collection
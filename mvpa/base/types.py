@@ -10,6 +10,8 @@
 
 import numpy as np
 
+from mvpa.base import cfg
+
 
 def is_datasetlike(obj):
     """Check if an object looks like a Dataset."""
@@ -37,6 +39,48 @@ def accepts_dataset_as_samples(fx):
     return extract_samples
 
 
+def get_float_dtype():
+    """Floating point dtype according to the configured precision policy.
+
+    By default PyMVPA computes in double precision. Setting ``precision``
+    in the ``[general]`` section of the configuration (or the environment
+    variable ``MVPA_PRECISION``) to ``single`` makes all components that
+    can afford it keep samples, kernel and distance matrices in
+    float32. This halves the memory footprint of large datasets at the
+    cost of accuracy. Algorithms that require double precision (e.g.
+    `SMLR`, `SVM` with the libsvm backend, `GPR`) document it and convert
+    their input regardless.
+
+    Returns
+    -------
+    numpy.float32 or numpy.float64
+    """
+    precision = cfg.get('general', 'precision', default='double').lower()
+    if precision in ('single', 'float32'):
+        return np.float32
+    elif precision in ('double', 'float64'):
+        return np.float64
+    raise ValueError, "Unknown value %r of [general] precision " \
+          "configuration setting. Use 'single' or 'double'." % precision
+
+
+def as_precision(x):
+    """Convert an array to single precision if so configured.
+
+    In the default double precision mode `x` is returned as is, so
+    the usual dtype handling of the respective algorithm applies. In
+    single precision mode numerical arrays of any other dtype are
+    converted into float32 (without a copy if they are float32 already).
+    Anything but ndarrays is passed through untouched.
+    """
+    if isinstance(x, np.ndarray) and x.dtype != np.float32 \
+       and (np.issubdtype(x.dtype, np.floating)
+            or np.issubdtype(x.dtype, np.integer)) \
+       and get_float_dtype() is np.float32:
+        return x.astype(np.float32)
+    return x
+
+
 def asobjarray(x):
     """Generates numpy.ndarray with dtype object from an iterable
 
@@ -15,6 +15,7 @@ from verbosity import verbose, debug; debug.active = [1,2,3]; debug(1, "blah")
 
 __docformat__ = 'restructuredtext'
 
+import os, time
 from sys import stdout, stderr
 # GOALS
 #  any logger should be able
@@ -368,6 +369,193 @@ class SetLogger(Logger):
     registered = property(fget=lambda self: self.__registered)
 
 
+try:
+    _PAGESIZE = os.sysconf('SC_PAGESIZE')
+except (AttributeError, ValueError, OSError):
+    _PAGESIZE = 4096
+
+def _get_rss():
+    """Resident memory of the current process in bytes (0 if unknown)
+
+    Reads /proc, hence only yields useful values on Linux.
+    """
+    try:
+        statm = open('/proc/self/statm')
+        try:
+            return int(statm.read().split()[1]) * _PAGESIZE
+        finally:
+            statm.close()
+    except (IOError, IndexError, ValueError):
+        return 0
+
+
+class Profiler(object):
+    """Aggregate wall time, call counts and memory growth of named nodes
+
+    Unlike `DebugLogger` metrics, profiling does not depend on `__debug__`
+    and hence is available with optimized Python (-O) as well.  Timed
+    sections are delimited by `start()` and `stop()`, while plain event
+    counts can be accumulated with `count()`.  Instrumented code is
+    expected to check `active` before calling `start()`, so a disabled
+    profiler costs a single attribute lookup::
+
+      ptoken = profiler.active and profiler.start(self, 'train')
+      ...
+      if ptoken:
+          profiler.stop(ptoken)
+
+    Timings are inclusive, i.e. time spent in nested nodes is accounted
+    for in each of them.  Memory growth is estimated from the change of
+    the resident set size of the process between `start()` and `stop()`.
+    Sections which raise an exception, or which run in subprocesses (e.g.
+    with `nproc` > 1), are not accounted for.
+    """
+
+    def __init__(self, active=False, memory=True):
+        """
+        Parameters
+        ----------
+        active : bool
+          Either to collect any statistics.
+        memory : bool
+          Either to track growth of the resident memory.  It requires an
+          additional read from /proc per `start()` and `stop()`.
+        """
+        self.active = active
+        self.memory = memory
+        self.__stats = {}
+        self.__counters = {}
+
+
+    def reset(self):
+        """Forget all collected statistics"""
+        self.__stats = {}
+        self.__counters = {}
+
+
+    def start(self, node, name=None):
+        """Start timing a section
+
+        Parameters
+        ----------
+        node : str or object
+          Either the name of the section or an instance, whose class name
+          is then joined with `name` (e.g. 'SMLR.train').
+        name : str, optional
+          Name of the method of `node` being timed.
+
+        Returns
+        -------
+        Token to be passed to `stop()`.
+        """
+        if not isinstance(node, basestring):
+            node = node.__class__.__name__
+        if name is not None:
+            node = '%s.%s' % (node, name)
+        if self.memory:
+            mem = _get_rss()
+        else:
+            mem = 0
+        return (node, time.time(), mem)
+
+
+    def stop(self, token):
+        """Stop timing a section started by `start()`"""
+        t = time.time()
+        node, t0, mem0 = token
+        if self.memory:
+            mem = _get_rss() - mem0
+        else:
+            mem = 0
+        stats = self.__stats.get(node)
+        if stats is None:
+            self.__stats[node] = [1, t - t0, mem]
+        else:
+            stats[0] += 1
+            stats[1] += t - t0
+            stats[2] += mem
+
+
+    def count(self, name, n=1):
+        """Increment named counter by `n`"""
+        self.__counters[name] = self.__counters.get(name, 0) + n
+
+
+    def _get_stats(self):
+        """Return dict of collected statistics
+
+        Each timed node maps into a dict with 'calls', 'time' (total wall
+        time in seconds) and 'bytes' (total memory growth).
+        """
+        return dict([(node, {'calls': s[0], 'time': s[1], 'bytes': s[2]})
+                     for node, s in self.__stats.iteritems()])
+
+
+    def as_json(self):
+        """Return collected statistics and counters as a JSON string"""
+        import json
+        return json.dumps({'nodes': self._get_stats(),
+                           'counters': self.__counters},
+                          sort_keys=True, indent=1)
+
+
+    def as_table(self):
+        """Return collected statistics as a table sorted by total time"""
+        nodes = sorted(self.__stats.items(), key=lambda x: -x[1][1])
+        width = max([len(n) for n in self.__stats.keys()
+                     + self.__counters.keys()] + [4])
+        lines = ['%-*s %8s %12s %12s %14s'
+                 % (width, 'node', 'calls', 'total [s]', 'mean [s]',
+                    'bytes')]
+        for node, (calls, t, mem) in nodes:
+            lines.append('%-*s %8d %12.6f %12.6f %14d'
+                         % (width, node, calls, t, t / calls, mem))
+        for name in sorted(self.__counters.keys()):
+            lines.append('%-*s %8d' % (width, name, self.__counters[name]))
+        return '\n'.join(lines) + '\n'
+
+
+    def dump(self, output, format=None):
+        """Write the report
+
+        Parameters
+        ----------
+        output : str or file-like
+          Filename or a stream (or 'stdout'/'stderr') to write into.
+        format : {'table', 'json'}, optional
+          By default JSON is used for filenames ending with '.json', and
+          a table otherwise.
+        """
+        if format is None:
+            if isinstance(output, basestring) and output.endswith('.json'):
+                format = 'json'
+            else:
+                format = 'table'
+        if format == 'json':
+            report = self.as_json()
+        elif format == 'table':
+            report = self.as_table()
+        else:
+            raise ValueError, "Unknown report format %r" % (format,)
+
+        if output == 'stdout':
+            output = stdout
+        elif output == 'stderr':
+            output = stderr
+        if isinstance(output, basestring):
+            f = open(output, 'w')
+            try:
+                f.write(report)
+            finally:
+                f.close()
+        else:
+            output.write(report)
+
+
+    stats = property(fget=_get_stats)
+    counters = property(fget=lambda self: self.__counters.copy())
+
+
 if __debug__:
 
     import os, re
@@ -29,7 +29,7 @@ from mvpa.base.dochelpers import _str
 
 from mvpa.clfs.transerror import ConfusionMatrix, RegressionStatistics
 
-from mvpa.base import warning
+from mvpa.base import warning, profiler
 
 if __debug__:
     from mvpa.base import debug
@@ -390,6 +390,8 @@ class Classifier(Learner):
             debug("CLF", "Predicting classifier %s on ds %s",
                   (self, dataset))
 
+        ptoken = profiler.active and profiler.start(self, 'predict')
+
         # remember the time when started computing predictions
         t0 = time.time()
 
@@ -424,6 +426,9 @@ class Classifier(Learner):
                       "literals: %s" % e
 
         self._postpredict(dataset, result)
+
+        if ptoken:
+            profiler.stop(ptoken)
         return result
 
 
@@ -18,6 +18,7 @@ __docformat__ = 'restructuredtext'
 
 import numpy as np
 from mvpa.base import externals
+from mvpa.base.types import as_precision
 
 if __debug__:
     from mvpa.base import debug, warning
@@ -148,7 +149,12 @@ def squared_euclidean_distance(data1, data2=None, weight=None):
     weight : np.ndarray
         vector of weights, each one associated to each dimension of the
         dataset (Defaults to None)
+
+    The distance matrix is computed in single precision if the precision
+    policy (see :func:`~mvpa.base.types.get_float_dtype`) asks for it.
     """
+    data1, data2, weight = \
+           as_precision(data1), as_precision(data2), as_precision(weight)
     if __debug__:
         # check if both datasets are floating point
         if not np.issubdtype(data1.dtype, 'f') \
@@ -342,9 +348,6 @@ def pnorm_w_python(data1, data2=None, weight=None, p=2,
 
 
 if externals.exists('weave'):
-    from scipy import weave
-    from scipy.weave import converters
-
     def pnorm_w(data1, data2=None, weight=None, p=2):
         """Weighted p-norm between two datasets (scipy.weave implementation)
 
@@ -361,6 +364,9 @@ if externals.exists('weave'):
         p
           Power
         """
+        # weave is slow to import, so do it only when it is really needed
+        from scipy import weave
+        from scipy.weave import converters
 
         if weight == None:
             weight = np.ones(data1.shape[1], 'd')
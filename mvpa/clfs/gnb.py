@@ -147,10 +147,9 @@ class GNB(Classifier):
 
         # get the dataset information into easy vars
         X = dataset.samples
-        labels = targets_sa.value
         self.ulabels = ulabels = targets_sa.unique
         nlabels = len(ulabels)
-        label2index = dict((l, il) for il, l in enumerate(ulabels))
+        groups = targets_sa.groups
 
         # set the feature dimensions
         nsamples = len(X)
@@ -164,10 +163,9 @@ class GNB(Classifier):
         nsamples_per_class = np.zeros((nlabels,) + (1,)*len(s_shape))
 
         # Estimate means and number of samples per each label
-        for s, l in zip(X, labels):
-            il = label2index[l]         # index of the label
-            nsamples_per_class[il] += 1
-            means[il] += s
+        for il, ids in enumerate(groups):
+            nsamples_per_class[il] = len(ids)
+            means[il] = X[ids].sum(axis=0)
 
         # helper function - squash all dimensions but 1
         squash = lambda x: np.atleast_1d(x.squeeze())
@@ -179,10 +177,8 @@ class GNB(Classifier):
         self.priors = self._get_priors(nlabels, nsamples, nsamples_per_class)
 
         # Estimate variances
-        # better loop than repmat! ;)
-        for s, l in zip(X, labels):
-            il = label2index[l]         # index of the label
-            variances[il] += (s - means[il])**2
+        for il, ids in enumerate(groups):
+            variances[il] = ((X[ids] - means[il])**2).sum(axis=0)
 
         ## Actually compute the variances
         if params.common_variance:
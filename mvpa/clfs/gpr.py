@@ -19,6 +19,7 @@ from mvpa.base import externals, warning
 from mvpa.base.state import ConditionalAttribute
 from mvpa.clfs.base import Classifier, accepts_dataset_as_samples
 from mvpa.base.param import Parameter
+from mvpa.kernels.base import NumpyKernel
 from mvpa.kernels.np import SquaredExponentialKernel, GeneralizedLinearKernel, \
      LinearKernel
 from mvpa.measures.base import Sensitivity
@@ -89,6 +90,9 @@ def _SLcholesky_autoreg(C, nsteps=None, **kwargs):
 class GPR(Classifier):
     """Gaussian Process Regression (GPR).
 
+    Cholesky decomposition of the kernel matrix is unstable in single
+    precision, thus kernels are computed in float64 regardless of the
+    precision policy.
     """
 
     predicted_variances = ConditionalAttribute(enabled=False,
@@ -152,6 +156,8 @@ class GPR(Classifier):
             debug("GPR",
                   "No kernel was provided, falling back to default: %s"
                   % kernel)
+        if isinstance(kernel, NumpyKernel):
+            kernel.ignore_precision = True
         self.__kernel = kernel
 
         # append proper clf_internal depending on the kernel
@@ -226,17 +226,11 @@ class kNN(Classifier):
             #
             self.__labels = labels = targets_sa.value
             Nlabels = len(labels)
-            Nuniquelabels = len(uniquelabels)
 
-            # TODO: To get proper speed up for the next line only,
-            #       histogram should be computed
-            #       via sorting + counting "same" elements while reducing.
-            #       Guaranteed complexity is NlogN whenever now it is N^2
             # compute the relative proportion of samples belonging to each
-            # class (do it in one loop to improve speed and reduce readability
+            # class from the (cached) per-class counts
             self.__weights = \
-                [ 1.0 - ((labels == label).sum() / Nlabels) \
-                    for label in uniquelabels ]
+                [ 1.0 - (count / Nlabels) for count in targets_sa.counts ]
             self.__weights = dict(zip(uniquelabels, self.__weights))
 
         labels = self.__labels
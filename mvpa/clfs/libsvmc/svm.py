@@ -37,12 +37,15 @@ from mvpa.clfs.libsvmc._svmc import \
      PRECOMPUTED, ONE_CLASS
 
 def _data2ls(data):
+    # libsvm stores all values as doubles, regardless of the precision policy
     return np.asarray(data).astype(float)
 
 class SVM(_SVM):
     """Support Vector Machine Classifier.
 
-    This is a simple interface to the libSVM package.
+    This is a simple interface to the libSVM package. LibSVM operates on
+    double precision data only, thus data is converted to float64
+    regardless of the precision policy.
     """
 
     # Since this is internal feature of LibSVM, this conditional attribute is present
@@ -29,7 +29,7 @@ from mvpa.base.param import Parameter
 
 from mvpa.generators.splitters import Splitter
 from mvpa.generators.partition import NFoldPartitioner
-from mvpa.datasets.miscfx import get_samples_by_attr
+from mvpa.datasets.base import Dataset
 from mvpa.misc.attrmap import AttributeMap
 from mvpa.base.dochelpers import _str
 from mvpa.base.state import ConditionalAttribute, ClassWithCollections, \
@@ -46,7 +46,7 @@ from mvpa.measures.base import \
     RegressionAsClassifierSensitivityAnalyzer, \
     BinaryClassifierSensitivityAnalyzer
 
-from mvpa.base import warning
+from mvpa.base import warning, externals
 
 if __debug__:
     from mvpa.base import debug
@@ -338,6 +338,68 @@ class ProxyClassifier(Classifier):
 # Various combiners for CombinedClassifier
 #
 
+_UNPICKLABLE_TAGS = set(['swig', 'rpy2'])
+"""Tags of learners which cannot be transferred between processes once
+trained"""
+
+def _get_train_nproc(clf, nproc):
+    """Number of processes to use for training copies of `clf`
+
+    Trained classifiers interfacing external libraries (via SWIG or R)
+    cannot be transferred back from child processes, hence those are always
+    trained in a single process.
+    """
+    nproc = externals.get_nproc(nproc)
+    if nproc > 1 and _UNPICKLABLE_TAGS.intersection(clf.__tags__):
+        warning("Trained %s cannot be transferred between processes. "
+                "Training it in a single process." % clf)
+        nproc = 1
+    return nproc
+
+
+def _train_clf(clf, dataset):
+    """Little helper to train a classifier in a child process"""
+    clf.train(dataset)
+    return clf
+
+
+def _train_split(clf, dataset, train_ids, test_ids, predict=False):
+    """Little helper to train (and test) a classifier on a single split in a
+    child process"""
+    testds = dataset[test_ids]
+    # assign testing dataset if given classifier can digest it
+    hastestdataset = hasattr(clf, 'testdataset')
+    if hastestdataset:
+        clf.testdataset = testds
+    clf.train(dataset[train_ids])
+    # unbind the testdataset from the classifier
+    if hastestdataset:
+        clf.testdataset = None
+    predictions, estimates = None, None
+    if predict:
+        predictions = clf.predict(testds)
+        estimates = clf.ca.get('estimates', None)
+    return clf, predictions, estimates
+
+
+def _train_parallel(clfs, datasets, nproc):
+    """Train each classifier on the corresponding dataset in parallel
+
+    Returns the list of trained classifiers (transferred back from the child
+    processes) in the original order.
+    """
+    import pprocess
+    if __debug__:
+        debug('CLF', "Training %d classifiers with nproc=%i",
+              (len(clfs), nproc))
+    p_results = pprocess.Map(limit=nproc)
+    compute = p_results.manage(pprocess.MakeParallel(_train_clf))
+    for clf, ds in zip(clfs, datasets):
+        compute(clf, ds)
+    # pprocess.Map yields results in the order of submission
+    return [clf for clf in p_results]
+
+
 class PredictionsCombiner(ClassWithCollections):
     """Base class for combining decisions of multiple classifiers"""
 
@@ -371,12 +433,17 @@ class PredictionsCombiner(ClassWithCollections):
 
 
 class MaximalVote(PredictionsCombiner):
-    """Provides a decision using maximal vote rule"""
+    """Provides a decision using maximal vote rule
+
+    Ties between labels with the same maximal number of votes are resolved
+    in favor of the smallest label.
+    """
 
     predictions = ConditionalAttribute(enabled=True,
         doc="Voted predictions")
     estimates = ConditionalAttribute(enabled=False,
-        doc="Estimates keep counts across classifiers for each label/sample")
+        doc="Vote counts across classifiers as an array (nsamples x "
+            "nlabels) with labels in sorted order")
 
     # TODO: Might get a parameter to use raw decision estimates if
     # voting is not unambigous (ie two classes have equal number of
@@ -398,56 +465,62 @@ class MaximalVote(PredictionsCombiner):
         if len(clfs)==0:
             return []                   # to don't even bother
 
-        all_label_counts = None
+        labels = {}
+        """Column in the vote counts for each label"""
+        votes = []
+        """(sample ids, columns) of all votes for each classifier"""
         for clf in clfs:
             # Lets check first if necessary conditional attribute is enabled
             if not clf.ca.is_enabled("predictions"):
                 raise ValueError, "MaximalVote needs classifiers (such as " + \
                       "%s) with state 'predictions' enabled" % clf
             predictions = clf.ca.predictions
-            if all_label_counts is None:
-                all_label_counts = [ {} for i in xrange(len(predictions)) ]
-
-            # for every sample
-            for i in xrange(len(predictions)):
-                prediction = predictions[i]
-                # XXX fishy location due to literal labels,
-                # TODO simplify assumptions and logic
-                if isinstance(prediction, basestring) or \
-                       not operator.isSequenceType(prediction):
-                    prediction = (prediction,)
-                for label in prediction: # for every label
-                    # XXX we might have multiple labels assigned
-                    # but might not -- don't remember now
-                    if not all_label_counts[i].has_key(label):
-                        all_label_counts[i][label] = 0
-                    all_label_counts[i][label] += 1
-
-        predictions = []
+            nsamples = len(predictions)
+            apredictions = np.asanyarray(predictions)
+            if apredictions.ndim == 1 and apredictions.dtype != np.object:
+                # a single label per sample
+                ulabels, ids = np.unique(apredictions, return_inverse=True)
+                cols = np.array([labels.setdefault(l, len(labels))
+                                 for l in ulabels], dtype=int)
+                votes.append((np.arange(nsamples), cols[ids]))
+            else:
+                # `BinaryClassifier` might return a list of possible
+                # predictions (not just a single one)
+                rows, cols = [], []
+                for i, prediction in enumerate(predictions):
+                    # XXX fishy location due to literal labels,
+                    # TODO simplify assumptions and logic
+                    if isinstance(prediction, basestring) or \
+                           not operator.isSequenceType(prediction):
+                        prediction = (prediction,)
+                    for label in prediction: # for every label
+                        rows.append(i)
+                        cols.append(labels.setdefault(label, len(labels)))
+                votes.append((np.array(rows, dtype=int),
+                              np.array(cols, dtype=int)))
+
+        # (nsamples x nlabels) vote counts -- a label is voted at most once
+        # per sample by each classifier
+        counts = np.zeros((nsamples, len(labels)), dtype=int)
+        for rows, cols in votes:
+            counts[rows, cols] += 1
+        # sort labels to resolve ties deterministically
+        ulabels = sorted(labels.keys())
+        counts = counts[:, [labels[l] for l in ulabels]]
+
         # select maximal vote now for each sample
-        for i in xrange(len(all_label_counts)):
-            label_counts = all_label_counts[i]
-            # lets do explicit search for max so we know
-            # if it is unique
-            maxk = []                   # labels of elements with max vote
-            maxv = -1
-            for k, v in label_counts.iteritems():
-                if v > maxv:
-                    maxk = [k]
-                    maxv = v
-                elif v == maxv:
-                    maxk.append(k)
-
-            assert len(maxk) >= 1, \
-                   "We should have obtained at least a single key of max label"
-
-            if len(maxk) > 1:
-                warning("We got multiple labels %s which have the " % maxk +
-                        "same maximal vote %d. XXX disambiguate" % maxv)
-            predictions.append(maxk[0])
+        maxv = counts.max(axis=1)
+        ties = (counts == maxv[:, None]).sum(axis=1) > 1
+        if ties.any():
+            warning("We got multiple labels which have the same maximal "
+                    "vote for %i samples (e.g. %s). XXX disambiguate"
+                    % (ties.sum(),
+                       [l for l, c in zip(ulabels, counts[ties][0])
+                        if c == maxv[ties][0]]))
+        predictions = [ulabels[i] for i in counts.argmax(axis=1)]
 
         ca = self.ca
-        ca.estimates = all_label_counts
+        ca.estimates = counts
         ca.predictions = predictions
         return predictions
 
@@ -831,9 +904,12 @@ class TreeClassifier(ProxyClassifier):
         #      Therefore we need to create a shallow copy of
         #      dataset and provide it with new labels
         ds_group = dataset.copy(deep=False)
-        # assign new labels group samples into groups of labels
-        ds_group.sa[targets_sa_name].value = [label2index[l]
-                                              for l in targets_sa.value]
+        # assign new labels group samples into groups of labels: map only
+        # the unique labels and broadcast the codes back to all samples
+        ulabels, uinverse = np.unique(targets_sa.value, return_inverse=True)
+        group_codes = np.array([label2index[l] for l in ulabels],
+                               dtype=int)[uinverse]
+        ds_group.sa[targets_sa_name].value = group_codes
 
         # train primary classifier
         if __debug__:
@@ -850,7 +926,7 @@ class TreeClassifier(ProxyClassifier):
         #     signal contain all the other categories data? probably not
         #     since then it would lead to undetermined prediction (which
         #     might be not a bad thing altogether...)
-        for gk in groups.iterkeys():
+        for gi, gk in enumerate(index2group):
             clf = clfs[gk]
             group_labels = groups_labels[gk]
             if clf is None: # Trailing node
@@ -861,9 +937,8 @@ class TreeClassifier(ProxyClassifier):
                         "group %r of %s"
                         % (group_labels, gk, self))
             else:
-                # select samples per each group
-                ids = get_samples_by_attr(dataset, targets_sa_name, groups_labels[gk])
-                ds_group = dataset[ids]
+                # select samples per each group using the precomputed codes
+                ds_group = dataset[group_codes == gi]
                 if __debug__:
                     debug('CLFTREE', "Training %s for group %s on %s",
                           (clfs[gk], gk, ds_group))
@@ -890,9 +965,8 @@ class TreeClassifier(ProxyClassifier):
         clf_predictions = clf_predictions.astype(int)
         # now for predictions pointing to specific groups go into
         # corresponding one
-        # defer initialization since dtype would depend on predictions
-        predictions = None
-        for pred_group in set(clf_predictions):
+        group_predictions = []
+        for pred_group in np.unique(clf_predictions):
             gk = index2group[pred_group]
             clf_ = clfs[gk]
             group_indexes = (clf_predictions == pred_group)
@@ -904,10 +978,16 @@ class TreeClassifier(ProxyClassifier):
                 p = groups[gk][0] # our only label
             else:
                 p = clf_.predict(dataset[group_indexes])
-
-            if predictions is None:
-                predictions = np.zeros((len(dataset),),
-                                       dtype=np.asanyarray(p).dtype)
+            group_predictions.append((group_indexes, np.asanyarray(p)))
+
+        # single scatter into the output, whose dtype is deduced from
+        # all the groups' predictions
+        if not len(group_predictions):
+            return np.zeros((0,), dtype=int)
+        predictions = np.zeros((len(dataset),),
+                               dtype=np.result_type(
+                                   *[p for i, p in group_predictions]))
+        for group_indexes, p in group_predictions:
             predictions[group_indexes] = p
         return predictions
 
@@ -985,21 +1065,20 @@ class BinaryClassifier(ProxyClassifier):
         """Train `BinaryClassifier`
         """
         targets_sa_name = self.get_space()
-        idlabels = [(x, +1) for x in get_samples_by_attr(dataset, targets_sa_name,
-                                                         self.__poslabels)] + \
-                    [(x, -1) for x in get_samples_by_attr(dataset, targets_sa_name,
-                                                          self.__neglabels)]
-        # XXX we have to sort ids since at the moment Dataset.select_samples
-        #     doesn't take care about order
-        idlabels.sort()
+        targets = dataset.sa[targets_sa_name].value
+        pos = np.zeros(len(targets), dtype='bool')
+        neg = np.zeros(len(targets), dtype='bool')
+        for label in self.__poslabels:
+            pos |= targets == label
+        for label in self.__neglabels:
+            neg |= targets == label
+        # sorted ids of all selected samples
+        ids = np.where(pos | neg)[0]
 
         # If we need all samples, why simply not perform on original
         # data, an just store/restore labels. But it really should be done
         # within Dataset.select_samples
-        if len(idlabels) == dataset.nsamples \
-            and [x[0] for x in idlabels] == range(dataset.nsamples):
-            # the last condition is not even necessary... just overly
-            # cautious
+        if len(ids) == dataset.nsamples:
             datasetselected = dataset.copy(deep=False)   # no selection is needed
             if __debug__:
                 debug('CLFBIN',
@@ -1007,16 +1086,17 @@ class BinaryClassifier(ProxyClassifier):
                       "classification among labels %s/+1 and %s/-1",
                       (dataset.nsamples, self.__poslabels, self.__neglabels))
         else:
-            datasetselected = dataset[[ x[0] for x in idlabels ]]
+            datasetselected = dataset[ids]
             if __debug__:
                 debug('CLFBIN',
                       "Selected %d samples out of %d samples for binary "
                       "classification among labels %s/+1 and %s/-1. Selected %s",
-                      (len(idlabels), dataset.nsamples,
+                      (len(ids), dataset.nsamples,
                        self.__poslabels, self.__neglabels, datasetselected))
 
         # adjust the labels
-        datasetselected.sa[targets_sa_name].value = [ x[1] for x in idlabels ]
+        datasetselected.sa[targets_sa_name].value = \
+                np.where(pos[ids], 1, -1)
 
         # now we got a dataset with only 2 labels
         if __debug__:
@@ -1051,7 +1131,7 @@ class MulticlassClassifier(CombinedClassifier):
     is yet to think about)
     """
 
-    def __init__(self, clf, bclf_type="1-vs-1", **kwargs):
+    def __init__(self, clf, bclf_type="1-vs-1", nproc=1, **kwargs):
         """Initialize the instance
 
         Parameters
@@ -1062,9 +1142,18 @@ class MulticlassClassifier(CombinedClassifier):
         bclf_type
           "1-vs-1" or "1-vs-all", determines the way to generate binary
           classifiers
+        nproc : None or int
+          How many processes to use for training the binary classifiers.
+          Requires `pprocess` external module.  If None -- all available
+          cores will be used. Classifiers which cannot be transferred
+          between processes once trained (e.g. SWIG-based SVMs) are always
+          trained in a single process.
         """
         CombinedClassifier.__init__(self, **kwargs)
 
+        externals.check_nproc(nproc, 'training')
+        self.nproc = nproc
+
         self.__clf = clf
         """Store sample instance of basic classifier"""
 
@@ -1119,8 +1208,15 @@ class MulticlassClassifier(CombinedClassifier):
         elif self.__bclf_type == "1-vs-all":
             raise NotImplementedError
 
-        # perform actual training
-        CombinedClassifier._train(self, dataset)
+        nproc = _get_train_nproc(self.__clf, self.nproc)
+        if nproc > 1 and len(self.clfs) > 1:
+            self.clfs = _train_parallel(self.clfs, [dataset] * len(self.clfs),
+                                        nproc)
+            # combiner might need to train as well
+            self.combiner.train(self.clfs, dataset)
+        else:
+            # perform actual training
+            CombinedClassifier._train(self, dataset)
 
 
 
@@ -1159,7 +1255,8 @@ class SplitClassifier(CombinedClassifier):
     #    doc="Summary over training confusions acquired at each split")
 
     def __init__(self, clf, partitioner=NFoldPartitioner(),
-                 splitter=Splitter('partitions', count=2), **kwargs):
+                 splitter=Splitter('partitions', count=2), nproc=1,
+                 **kwargs):
         """Initialize the instance
 
         Parameters
@@ -1169,9 +1266,20 @@ class SplitClassifier(CombinedClassifier):
           for multiclass
         splitter : Splitter
           `Splitter` to use to split the dataset prior training
+        nproc : None or int
+          How many processes to use for training the classifiers of all
+          splits. Requires `pprocess` external module.  If None -- all
+          available cores will be used. In this mode the partitioner and
+          splitter are run only once on the sample ids of the dataset, hence
+          they must not alter samples. Classifiers which cannot be
+          transferred between processes once trained (e.g. SWIG-based SVMs)
+          are always trained in a single process.
         """
 
         CombinedClassifier.__init__(self, **kwargs)
+
+        externals.check_nproc(nproc, 'training')
+        self.nproc = nproc
         self.__clf = clf
         """Store sample instance of basic classifier"""
 
@@ -1216,6 +1324,11 @@ class SplitClassifier(CombinedClassifier):
 
         self.ca.splits = []
 
+        nproc = _get_train_nproc(clf_template, self.nproc)
+        if nproc > 1 and len(self.clfs) > 1:
+            self._train_splits_parallel(dataset, nproc)
+            return
+
         for i, pset in enumerate(self.__partitioner.generate(dataset)):
             if __debug__:
                 debug("CLFSPL", "Training classifier for split %d", (i,))
@@ -1257,6 +1370,46 @@ class SplitClassifier(CombinedClassifier):
                 ca.training_stats += clf.ca.training_stats
 
 
+    def _train_splits_parallel(self, dataset, nproc):
+        """Train classifiers of all splits concurrently
+        """
+        # local binding
+        ca = self.ca
+        targets = dataset.sa[self.get_space()].value
+
+        # partition and split only the sample ids
+        ids_ds = Dataset(np.arange(len(dataset)), sa=dataset.sa.copy(deep=False))
+        splits = [[d.samples[:, 0] for d in self.__splitter.generate(pset)][:2]
+                  for pset in self.__partitioner.generate(ids_ds)]
+        if ca.is_enabled("splits"):
+            ca.splits = [[dataset[ids] for ids in split] for split in splits]
+
+        import pprocess
+        if __debug__:
+            debug("CLFSPL", "Training classifiers for %d splits with nproc=%i",
+                  (len(splits), nproc))
+        p_results = pprocess.Map(limit=nproc)
+        compute = p_results.manage(pprocess.MakeParallel(_train_split))
+        for clf, (train_ids, test_ids) in zip(self.clfs, splits):
+            compute(clf, dataset, train_ids, test_ids,
+                    predict=ca.is_enabled("stats"))
+
+        # pprocess.Map yields results in the order of submission, hence stats
+        # get collected in the order of the splits
+        bclfs = []
+        for i, ((clf, predictions, estimates), (train_ids, test_ids)) \
+                in enumerate(zip(p_results, splits)):
+            bclfs.append(clf)
+            if ca.is_enabled("stats"):
+                ca.stats.add(targets[test_ids], predictions, estimates)
+                if __debug__:
+                    debug('CLFSPL', 'Split %d error %.2f%%',
+                          (i, ca.stats.summaries[-1].error))
+            if ca.is_enabled("training_stats"):
+                ca.training_stats += clf.ca.training_stats
+        self.clfs = bclfs
+
+
     @group_kwargs(prefixes=['slave_'], passthrough=True)
     def get_sensitivity_analyzer(self, slave_kwargs, **kwargs):
         """Return an appropriate SensitivityAnalyzer for `SplitClassifier`
@@ -106,3 +106,5 @@ class RidgeReg(Classifier):
         self.ca.estimates = pred
         return pred
 
+    lm = property(fget=lambda self: self.__lm,
+                  doc="Penalty term lambda (None for .05*nfeatures).")
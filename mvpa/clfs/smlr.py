@@ -66,6 +66,9 @@ class SMLR(Classifier):
     :ref:`Krishnapuram et al., 2005 <KCF+05>` (2005, IEEE Transactions
     on Pattern Analysis and Machine Intelligence).  Be sure to cite
     that article if you use this classifier for your work.
+
+    The C implementation operates in double precision only, thus data is
+    converted to float64 regardless of the precision policy.
     """
 
     __tags__ = [ 'smlr', 'linear', 'has_sensitivity', 'binary',
@@ -151,6 +154,8 @@ class SMLR(Classifier):
         """Just the weights, without the biases"""
         self.__biases = None
         """The biases, will remain none if has_bias is False"""
+        self.__init_weights = None
+        """Starting weights for the next training (see `warm_start`)"""
 
 
     ##REF: Name was automagically refactored
@@ -362,10 +367,20 @@ class SMLR(Classifier):
         lambda_over_2_auto_corr = (self.params.lm/2.)/auto_corr
 
         # set starting values
-        w = np.zeros((nd, c_to_fit), dtype=np.double)
-        Xw = np.zeros((ns, c_to_fit), dtype=np.double)
-        E = np.ones((ns, c_to_fit), dtype=np.double)
-        S = M*np.ones(ns, dtype=np.double)
+        w = self.__init_weights
+        self.__init_weights = None
+        if w is not None and w.shape == (nd, c_to_fit):
+            if __debug__:
+                debug('SMLR_', 'Warm start from provided weights')
+            Xw = np.dot(X, w)
+            E = np.exp(Xw)
+            # classes that are not fit contribute exp(0) each
+            S = E.sum(axis=1) + (M - c_to_fit)
+        else:
+            w = np.zeros((nd, c_to_fit), dtype=np.double)
+            Xw = np.zeros((ns, c_to_fit), dtype=np.double)
+            E = np.ones((ns, c_to_fit), dtype=np.double)
+            S = M*np.ones(ns, dtype=np.double)
 
         # set verbosity
         if __debug__:
@@ -469,6 +484,30 @@ class SMLR(Classifier):
         return new_weights
 
 
+    def warm_start(self, weights):
+        """Start the next training from the given weights.
+
+        Useful whenever a sequence of similar problems is solved, e.g. in
+        recursive feature elimination, where the weights of the previous
+        step (restricted to the surviving features) are a good guess for
+        the next one. The biases of the last training are reused. The
+        weights are ignored if their shape does not match the next training
+        dataset.
+
+        Parameters
+        ----------
+        weights : array
+          Weights (features x classes) in the format of `weights`.
+        """
+        weights = np.array(weights, dtype=np.double)
+        if self.params.has_bias:
+            if self.__biases is None:
+                # nothing to start from
+                return
+            weights = np.vstack((weights, self.__biases))
+        self.__init_weights = weights
+
+
     ##REF: Name was automagically refactored
     def _get_feature_ids(self):
         """Return ids of the used features
@@ -12,7 +12,7 @@ __docformat__ = 'restructuredtext'
 
 import numpy as np
 
-from mvpa.base import externals, warning
+from mvpa.base import externals, warning, profiler
 from mvpa.base.state import ClassWithCollections, ConditionalAttribute
 from mvpa.generators.permutation import AttributePermutator
 from mvpa.base.types import is_datasetlike
@@ -299,6 +299,8 @@ class MCNullDist(NullDist):
             measure = self._measure
             measure.untrain()
 
+        ptoken = profiler.active and profiler.start(self, 'fit')
+
         dist_samples = []
         """Holds the values for randomized labels."""
 
@@ -367,6 +369,11 @@ class MCNullDist(NullDist):
             dist.append(self._dist_class(*params))
         self._dist = dist
 
+        if ptoken:
+            profiler.stop(ptoken)
+            profiler.count('%s.permutations' % self.__class__.__name__,
+                           len(dist_samples) + skipped)
+
 
     def cdf(self, x):
         """Return value of the cumulative distribution function at `x`.
@@ -14,7 +14,8 @@ import numpy as np
 from mvpa.datasets import Dataset
 from mvpa.misc.io import DataReader
 
-def eep_dataset(samples, targets=None, chunks=None):
+def eep_dataset(samples, targets=None, chunks=None, mmap=False,
+                trials=None, channels=None, timepoints=None):
     """Create a dataset using an EEP binary file as source.
 
     EEP files are used by *eeprobe* a software for analysing even-related
@@ -31,6 +32,11 @@ def eep_dataset(samples, targets=None, chunks=None):
     targets, chunks : sequence or scalar or None
       Values are pass through to `Dataset.from_wizard()`. See its documentation
       for more information.
+    mmap : bool
+      If True and `samples` is a filename, the file is memory-mapped instead
+      of being read into memory. See `EEPBin`.
+    trials, channels, timepoints
+      Optional selection of the data to be loaded. See `EEPBin.get_data()`.
 
     Returns
     -------
@@ -42,7 +48,7 @@ def eep_dataset(samples, targets=None, chunks=None):
     """
     if isinstance(samples, str):
         # open the eep file
-        eb = EEPBin(samples)
+        eb = EEPBin(samples, mmap=mmap)
     elif isinstance(samples, EEPBin):
         # nothing special
         eb = samples
@@ -50,10 +56,22 @@ def eep_dataset(samples, targets=None, chunks=None):
         raise ValueError("eep_dataset takes the filename of an "
               "EEP file or a EEPBin object as 'samples' argument.")
 
+    if trials is None and channels is None and timepoints is None:
+        data, channelids, t0, dt = eb.data, eb.channels, eb.t0, eb.dt
+    else:
+        data = eb.get_data(trials, channels, timepoints)
+        channelids = eb.channels
+        if not channels is None:
+            channelids = [channelids[i] for i in eb._get_channel_ids(channels)]
+        t0, dt = eb.t0, eb.dt
+        if not timepoints is None:
+            start, stop, step = timepoints.indices(eb.ntimepoints)
+            t0, dt = t0 + start * dt, dt * step
+
     # init dataset
     ds = Dataset.from_channeltimeseries(
-            eb.data, targets=targets, chunks=chunks, t0=eb.t0, dt=eb.dt,
-            channelids=eb.channels)
+            data, targets=targets, chunks=chunks, t0=t0, dt=dt,
+            channelids=channelids)
     return ds
 
 
@@ -84,14 +102,22 @@ class EEPBin(DataReader):
         .
         <trial2,channel1,sample1>,<trial2,channel1,sample2>,...
         <trial2,channel2,sample1>,<trial2,channel2,sample2>,...
+
+    If memory-mapping is requested, only the header is read and the binary
+    block is exposed as a read-only `numpy.memmap`. Selecting subsets of the
+    data (see `get_data()`) then only reads the needed parts from disk, which
+    allows to access EEP files larger than the available memory.
     """
-    def __init__(self, source):
+    def __init__(self, source, mmap=False):
         """Read EEP file and store header and data.
 
         Parameters
         ----------
         source : str
           Filename.
+        mmap : bool
+          If True, the binary data block is memory-mapped instead of being
+          read into memory.
         """
         # init base class
         DataReader.__init__(self)
@@ -135,16 +161,65 @@ class EEPBin(DataReader):
         if hdr.has_key('channels'):
             self._props['channels'] = hdr['channels'].split()
 
-        self._data = \
-            np.reshape(np.fromfile(infile, dtype='f'), \
-                (nsamples,
-                 self._props['nchannels'],
-                 self._props['ntimepoints']))
+        shape = (nsamples, self._props['nchannels'],
+                 self._props['ntimepoints'])
+        if mmap:
+            # the binary block starts right after the header
+            self._data = np.memmap(source, dtype='f', mode='r',
+                                   offset=infile.tell(), shape=shape)
+        else:
+            self._data = np.reshape(np.fromfile(infile, dtype='f'), shape)
 
         # cleanup
         infile.close()
 
 
+    def _get_channel_ids(self, channels):
+        """Translate channel names into ids, ids are passed as is.
+        """
+        ids = []
+        for c in channels:
+            if isinstance(c, basestring):
+                c = self.channels.index(c)
+            ids.append(c)
+        return ids
+
+
+    def get_data(self, trials=None, channels=None, timepoints=None):
+        """Return a selection of the data.
+
+        For memory-mapped files only the selected portions are read from
+        disk.
+
+        Parameters
+        ----------
+        trials : slice or sequence of int or None
+          Trials to select. All if None.
+        channels : sequence of str or int or None
+          Channels to select, either by name or by id. All if None.
+        timepoints : slice or None
+          Time window to select. All timepoints if None.
+
+        Returns
+        -------
+        ndarray
+          (trials x channels x timepoints)
+        """
+        data = self._data
+        # select along one axis at a time, starting with the trials to
+        # touch as few pages as possible
+        if not trials is None:
+            data = data[trials]
+        if not timepoints is None:
+            if not isinstance(timepoints, slice):
+                raise ValueError("Time windows have to be given as a slice. "
+                                 "Got %r" % (timepoints,))
+            data = data[:, :, timepoints]
+        if not channels is None:
+            data = data[:, self._get_channel_ids(channels)]
+        return np.array(data)
+
+
     nchannels = property(fget=lambda self: self._props['nchannels'],
                          doc="Number of channels")
     ntimepoints  = property(fget=lambda self: self._props['ntimepoints'],
@@ -94,7 +94,7 @@ def find_events(**kwargs):
 
 
 def eventrelated_dataset(ds, events=None, time_attr=None, match='prev',
-                         eprefix='event'):
+                         eprefix='event', strided=False):
     """Segment a dataset into a set of events.
 
     This function can be used to extract event-related samples from any
@@ -134,6 +134,10 @@ def eventrelated_dataset(ds, events=None, time_attr=None, match='prev',
       If not None, this prefix is used to name additional attributes generated
       by the underlying `~mvpa.mappers.boxcar.BoxcarMapper`. If it is set to
       None, no additional attributes will be created.
+    strided : bool
+      If True, evenly spaced events are not copied out of the input dataset,
+      but the returned samples are a (read-only) view into the input samples.
+      See `~mvpa.mappers.boxcar.BoxcarMapper` for details.
 
     Returns
     -------
@@ -225,7 +229,8 @@ def eventrelated_dataset(ds, events=None, time_attr=None, match='prev',
                     'provided Events.'% boxlength)
 
     # finally create, train und use the boxcar mapper
-    bcm = BoxcarMapper(evvars['onset'], boxlength, space=eprefix)
+    bcm = BoxcarMapper(evvars['onset'], boxlength, space=eprefix,
+                       strided=strided)
     bcm.train(ds)
     ds = ds.get_mapped(bcm)
     # at last reflatten the dataset
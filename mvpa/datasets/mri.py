@@ -135,7 +135,8 @@ def map2nifti(dataset, data=None, imghdr=None, imgtype=None):
 
 
 def fmri_dataset(samples, targets=None, chunks=None, mask=None,
-                 sprefix='voxel', tprefix='time', add_fa=None,):
+                 sprefix='voxel', tprefix='time', add_fa=None,
+                 slabsize=None, dtype=None):
     """Create a dataset from an fMRI timeseries image.
 
     The timeseries image serves as the samples data, with each volume becoming
@@ -193,14 +194,21 @@ def fmri_dataset(samples, targets=None, chunks=None, mask=None,
       as feature attributes in the dataset. The dictionary key serves as the
       feature attribute name. Each value might be of any type supported by the
       'mask' argument of this function.
+    slabsize : int or None
+      If not None, the timeseries is not loaded into memory as a whole.
+      Instead, image data is read in slabs of (at most) this many volumes
+      (memory-mapped if the image file is uncompressed), the mask is applied
+      immediately, and the selected voxels are written straight into a
+      preallocated samples array. This considerably reduces the peak memory
+      demand for large timeseries and small masks.
+    dtype : dtype or None
+      If not None, the samples array is converted into this datatype (e.g.
+      'float32' to halve the memory demands of float64 data).
 
     Returns
     -------
     Dataset
     """
-    # load the samples
-    imgdata, imghdr, imgtype = _load_anyimg(samples, ensure=True, enforce_dim=4)
-
     # figure out what the mask is, but only handle known cases, the rest
     # goes directly into the mapper which maybe knows more
     maskimg = _load_anyimg(mask)
@@ -210,29 +218,217 @@ def fmri_dataset(samples, targets=None, chunks=None, mask=None,
         # take just data and ignore the header
         mask = maskimg[0]
 
-    # compile the samples attributes
-    sa = {}
-    if not targets is None:
-        sa['targets'] = _expand_attribute(targets, imgdata.shape[0], 'targets')
-    if not chunks is None:
-        sa['chunks'] = _expand_attribute(chunks, imgdata.shape[0], 'chunks')
+    if sprefix is None:
+        space = None
+    else:
+        space = sprefix + '_indices'
+
+    if slabsize is None:
+        # load the samples
+        imgdata, imghdr, imgtype = _load_anyimg(samples, ensure=True,
+                                                enforce_dim=4)
+        if not dtype is None:
+            imgdata = imgdata.astype(dtype)
+        volshape = imgdata.shape[1:]
+
+        # create a dataset
+        ds = Dataset(imgdata)
+        ds = ds.get_mapped(FlattenMapper(shape=volshape, space=space))
+
+        # now apply the mask if any
+        if not mask is None:
+            flatmask = ds.a.mapper.forward1(mask)
+            # direct slicing is possible, and it is potentially more efficient,
+            # so let's use it
+            #mapper = StaticFeatureSelection(flatmask)
+            #ds = ds.get_mapped(StaticFeatureSelection(flatmask))
+            ds = ds[:, flatmask != 0]
+    else:
+        imgs = _load_anyimg_headers(samples)
+        imghdr, imgtype = imgs[0][0].get_header(), imgs[0][0].__class__
+        volshape = imgs[0][1][1:]
+        template, volmask = _get_volume_template(volshape, mask, space)
+        samples = _load_masked_samples(imgs, volmask, slabsize, dtype)
+        ds = Dataset(samples, fa=template.fa, a=template.a)
+
+    ds = _set_fmri_attributes(ds, targets, chunks, add_fa, imghdr, imgtype,
+                              volshape, sprefix)
+    if tprefix is not None:
+        ds.sa[tprefix + '_indices'] = np.arange(len(ds), dtype='int')
+        ds.sa[tprefix + '_coords'] = np.arange(len(ds), dtype='float') \
+                                     * _get_dt(imghdr)
+        # TODO extend with the unit
+
+    return ds
+
+
+def fmri_runs_dataset(runs, targets=None, chunks=None, mask=None,
+                      sprefix='voxel', tprefix='time', add_fa=None,
+                      slabsize=64, dtype=None, nproc=None):
+    """Create a dataset from multiple fMRI timeseries images (runs).
+
+    This function behaves like `fmri_dataset` with ``slabsize`` given, except
+    that it takes a list of runs that are loaded and masked concurrently,
+    and are all written into a single preallocated samples array. It is
+    mostly useful for compressed images (e.g. '.nii.gz'), as decompression is
+    CPU-bound and is done in parallel.
+
+    Temporal attributes (volume index and acquisition time) are computed per
+    run, i.e. start at zero for each run.
+
+    Parameters
+    ----------
+    runs : list
+      Each item is a timeseries specified like the `samples` argument of
+      `fmri_dataset` (filename or image of a 4D timeseries, or a list of 3D
+      volumes).
+    chunks : scalar or sequence or None
+      Chunk attribute for each volume in all runs. If None, the index of the
+      run each sample belongs to is used.
+    slabsize : int
+      Maximum number of volumes read at once.
+    dtype : dtype or None
+      Datatype of the samples array. If None, the common datatype of the
+      (scaled) image data of all runs, as declared by the image headers.
+    nproc : None or int
+      Number of threads to use for loading runs. If None, as many as
+      available CPU cores (but not more than there are runs).
+
+    Returns
+    -------
+    Dataset
+
+    Notes
+    -----
+    For all other arguments, please see the documentation of `fmri_dataset`.
+    """
+    # figure out what the mask is
+    maskimg = _load_anyimg(mask)
+    if not maskimg is None:
+        mask = maskimg[0]
 
-    # create a dataset
-    ds = Dataset(imgdata, sa=sa)
     if sprefix is None:
         space = None
     else:
         space = sprefix + '_indices'
-    ds = ds.get_mapped(FlattenMapper(shape=imgdata.shape[1:], space=space))
 
-    # now apply the mask if any
-    if not mask is None:
-        flatmask = ds.a.mapper.forward1(mask)
-        # direct slicing is possible, and it is potentially more efficient,
-        # so let's use it
-        #mapper = StaticFeatureSelection(flatmask)
-        #ds = ds.get_mapped(StaticFeatureSelection(flatmask))
-        ds = ds[:, flatmask != 0]
+    runimgs = [_load_anyimg_headers(r) for r in runs]
+    imghdr, imgtype = runimgs[0][0][0].get_header(), \
+                      runimgs[0][0][0].__class__
+    volshape = runimgs[0][0][1][1:]
+    for imgs in runimgs:
+        if not imgs[0][1][1:] == volshape:
+            raise ValueError("Runs differ in volume shape: %s"
+                             % ([imgs[0][1][1:] for imgs in runimgs],))
+    nvols = [np.sum([shape[0] for img, shape in imgs]) for imgs in runimgs]
+
+    template, volmask = _get_volume_template(volshape, mask, space)
+
+    if nproc is None:
+        try:
+            import multiprocessing
+            nproc = multiprocessing.cpu_count()
+        except (ImportError, NotImplementedError):
+            nproc = 1
+    nproc = max(1, min(nproc, len(runs)))
+    if __debug__:
+        debug('DS_NIFTI', 'Loading %i runs with %i threads'
+              % (len(runs), nproc))
+
+    offsets = np.cumsum([0] + nvols)
+    if dtype is None:
+        dtype = np.find_common_type([_get_img_dtype(img)
+                                     for imgs in runimgs
+                                     for img, shape in imgs], [])
+    samples = np.empty((offsets[-1], template.nfeatures), dtype=dtype)
+
+    def load_run(i):
+        # every run goes straight into its place
+        _load_masked_samples(runimgs[i], volmask, slabsize,
+                             out=samples[offsets[i]:offsets[i + 1]])
+        # do not keep images of loaded runs alive
+        runimgs[i] = None
+    _map_threaded(load_run, range(len(runs)), nproc)
+
+    ds = Dataset(samples, fa=template.fa, a=template.a)
+    if chunks is None:
+        chunks = np.repeat(np.arange(len(runs)), nvols)
+    ds = _set_fmri_attributes(ds, targets, chunks, add_fa, imghdr, imgtype,
+                              volshape, sprefix)
+    if tprefix is not None:
+        tids = np.concatenate([np.arange(n, dtype='int') for n in nvols])
+        ds.sa[tprefix + '_indices'] = tids
+        ds.sa[tprefix + '_coords'] = tids * float(_get_dt(imghdr))
+    return ds
+
+
+def _map_threaded(fx, args, nproc):
+    """Call `fx` on each item of `args` using a pool of `nproc` threads.
+
+    Results are returned in the order of `args`. The first exception raised
+    in any thread is re-raised.
+    """
+    if nproc < 2:
+        return [fx(a) for a in args]
+
+    import threading
+    from Queue import Queue, Empty
+    todo = Queue()
+    for i, a in enumerate(args):
+        todo.put((i, a))
+    results = [None] * len(args)
+    errors = []
+
+    def worker():
+        while not len(errors):
+            try:
+                i, a = todo.get_nowait()
+            except Empty:
+                return
+            try:
+                results[i] = fx(a)
+            except:
+                errors.append(sys.exc_info())
+
+    threads = [threading.Thread(target=worker) for i in xrange(nproc)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if len(errors):
+        raise errors[0][0], errors[0][1], errors[0][2]
+    return results
+
+
+def _get_volume_template(volshape, mask, space):
+    """Single-volume dataset with mapper and attributes of a masked volume.
+
+    Returns
+    -------
+    tuple
+      (template dataset, boolean mask volume or None)
+    """
+    # a single volume worth of mask to set up mapper and feature
+    # attributes exactly like they would be for a fully loaded image
+    template = Dataset(np.zeros((1,) + volshape, dtype='bool'))
+    template = template.get_mapped(FlattenMapper(shape=volshape, space=space))
+    if mask is None:
+        return template, None
+    flatmask = template.a.mapper.forward1(mask) != 0
+    template = template[:, flatmask]
+    volmask = template.a.mapper.reverse1(
+                    np.ones(template.nfeatures, dtype='bool')) != 0
+    return template, volmask
+
+
+def _set_fmri_attributes(ds, targets, chunks, add_fa, imghdr, imgtype,
+                         volshape, sprefix):
+    """Assign common attributes of fMRI datasets"""
+    # compile the samples attributes
+    if not targets is None:
+        ds.sa['targets'] = _expand_attribute(targets, len(ds), 'targets')
+    if not chunks is None:
+        ds.sa['chunks'] = _expand_attribute(chunks, len(ds), 'chunks')
 
     # load and store additional feature attributes
     if not add_fa is None:
@@ -245,19 +441,137 @@ def fmri_dataset(samples, targets=None, chunks=None, mask=None,
     ds.a['imgtype'] = imgtype
     # If there is a space assigned , store the extent of that space
     if sprefix is not None:
-        ds.a[sprefix + '_dim'] = imgdata.shape[1:]
+        ds.a[sprefix + '_dim'] = volshape
         # 'voxdim' is (x,y,z) while 'samples' are (t,z,y,x)
         ds.a[sprefix + '_eldim'] = _get_voxdim(imghdr)
         # TODO extend with the unit
-    if tprefix is not None:
-        ds.sa[tprefix + '_indices'] = np.arange(len(ds), dtype='int')
-        ds.sa[tprefix + '_coords'] = np.arange(len(ds), dtype='float') \
-                                     * _get_dt(imghdr)
-        # TODO extend with the unit
-
     return ds
 
 
+def _load_anyimg_headers(src):
+    """Open images for volume-wise access without reading their data.
+
+    Parameters
+    ----------
+    src : str or NiftiImage or list
+      Filename or image instance of a 4D timeseries, or a list of filenames
+      or image instances of 3D volumes.
+
+    Returns
+    -------
+    list
+      Tuples of (image, shape), with the shape being t,x,y,z.
+    """
+    import nibabel
+    if isinstance(src, list) or isinstance(src, tuple):
+        srcs, enforce_dim = src, 3
+    else:
+        srcs, enforce_dim = [src], 4
+    imgs = []
+    for s in srcs:
+        if isinstance(s, str):
+            img = nibabel.load(s)
+        else:
+            img = s
+        if not isinstance(img, nibabel.spatialimages.SpatialImage):
+            raise ValueError("Cannot load image data from %s" % (s,))
+        shape = img.get_shape()
+        if len(shape) == 3:
+            shape = (1,) + shape
+        elif len(shape) == 4 and (enforce_dim == 4 or shape[3] == 1):
+            shape = (shape[3],) + shape[:3]
+        else:
+            raise ValueError("Cannot enforce %dD on data with shape %s"
+                             % (enforce_dim, shape))
+        if len(imgs) and not shape[1:] == imgs[0][1][1:]:
+            raise ValueError("Input volumes differ in shape: %s"
+                             % ([i[1] for i in imgs] + [shape],))
+        imgs.append((img, shape))
+    return imgs
+
+
+def _load_masked_samples(imgs, mask, slabsize, dtype=None, out=None):
+    """Read (masked) image data slab-wise into a samples array.
+
+    Parameters
+    ----------
+    imgs : list
+      As returned by `_load_anyimg_headers()`.
+    mask : array or None
+      Boolean volume of voxels to select. If None, all voxels are used.
+    slabsize : int
+      Maximum number of volumes read at once.
+    dtype : dtype or None
+      Datatype of the samples array. By default the datatype of the (scaled)
+      image data, as declared by the image headers.
+    out : array or None
+      If not None, samples are written into this (preallocated) array.
+
+    Returns
+    -------
+    array
+      Samples array (t x voxels).
+    """
+    nsamples = np.sum([shape[0] for img, shape in imgs])
+    samples = out
+    if samples is None:
+        if dtype is None:
+            dtype = np.find_common_type([_get_img_dtype(img)
+                                         for img, shape in imgs], [])
+        if mask is None:
+            nfeatures = np.prod(imgs[0][1][1:])
+        else:
+            nfeatures = mask.sum()
+        samples = np.empty((nsamples, nfeatures), dtype=dtype)
+    offset = 0
+    for img, shape in imgs:
+        fname = img.get_filename()
+        if not hasattr(img, 'dataobj'):
+            # old NiBabel
+            data = img.get_data()
+        elif fname is None or fname.endswith('.gz'):
+            # compressed file which cannot be accessed randomly without
+            # repeated decompression -- read it once, but do not cache the
+            # data in the image
+            data = np.asanyarray(img.dataobj)
+        else:
+            # array proxy that reads only what gets sliced (memory-mapped
+            # if possible)
+            data = img.dataobj
+        if len(data.shape) == 3:
+            # single volume
+            slabs = [(0, np.asanyarray(data)[..., None])]
+        else:
+            slabs = ((start, data[..., start:start + slabsize])
+                     for start in xrange(0, shape[0], slabsize))
+        for start, slab in slabs:
+            slab = np.asanyarray(slab)
+            if mask is None:
+                slab = slab.reshape(-1, slab.shape[-1])
+            else:
+                # x,y,z,t -> voxels,t
+                slab = slab[mask]
+            samples[offset + start:offset + start + slab.shape[-1]] = slab.T
+        data = slabs = None
+        if hasattr(img, 'uncache'):
+            img.uncache()
+        offset += shape[0]
+    return samples
+
+
+def _get_img_dtype(img):
+    """Datatype of the (scaled) image data, determined without reading it.
+    """
+    proxy = getattr(img, 'dataobj', None)
+    if isinstance(proxy, np.ndarray):
+        return proxy.dtype
+    if not (getattr(proxy, 'slope', 1.0) == 1.0
+            and getattr(proxy, 'inter', 0.0) == 0.0):
+        # NiBabel applies the scaling in double precision
+        return np.dtype(np.float64)
+    return np.dtype(img.get_data_dtype())
+
+
 def _get_voxdim(hdr):
     """Get the size of a voxel from some image header format."""
     return hdr.get_zooms()[:-1]
@@ -17,11 +17,12 @@ __docformat__ = 'restructuredtext'
 
 import numpy as np
 from mvpa.support.copy import copy
-from mvpa.featsel.base import StaticFeatureSelection, IterativeFeatureSelection
+from mvpa.featsel.base import IterativeFeatureSelection
 from mvpa.featsel.helpers import NBackHistoryStopCrit, \
                                  FixedNElementTailSelector, \
                                  BestDetector
 
+from mvpa.base import externals
 from mvpa.base.state import ConditionalAttribute
 
 if __debug__:
@@ -44,6 +45,13 @@ class IFS(IterativeFeatureSelection):
     For each feature selection the transfer error on some testdatset is
     computed. This procedure is repeated until a given `StoppingCriterion`
     is reached.
+
+    The input dataset is split into training and testing portion only once.
+    For each selection step the already selected features of the training
+    portion are kept in a contiguous buffer, and candidate features are
+    evaluated by replacing a single additional column of this buffer, hence
+    the `fmeasure` must not modify its input dataset in-place. Candidate
+    evaluation can be distributed across multiple processes (see `nproc`).
     """
     def __init__(self,
                  fmeasure,
@@ -51,6 +59,7 @@ class IFS(IterativeFeatureSelection):
                  splitter,
                  fselector=FixedNElementTailSelector(1, tail='upper',
                                                      mode='select'),
+                 nproc=1,
                  **kwargs):
         """Initialize incremental feature search
 
@@ -66,11 +75,18 @@ class IFS(IterativeFeatureSelection):
           This splitter instance has to generate at least two dataset splits
           when called with the input dataset. The first split serves as the
           training dataset and the second as the evaluation dataset.
+        nproc : None or int
+          How many processes to use for the evaluation of feature candidates.
+          Requires `pprocess` external module.  If None -- all available
+          cores will be used.
         """
         # bases init first
         IterativeFeatureSelection.__init__(self, fmeasure, pmeasure, splitter,
                                            fselector, **kwargs)
 
+        externals.check_nproc(nproc, 'IFS')
+        self.nproc = nproc
+
 
     def _train(self, ds):
         # local binding
@@ -78,6 +94,7 @@ class IFS(IterativeFeatureSelection):
         fselector = self._fselector
         scriterion = self._stopping_criterion
         bestdetector = self._bestdetector
+        nproc = externals.get_nproc(self.nproc)
 
         # init
         # Computed error for each tested features set.
@@ -89,33 +106,26 @@ class IFS(IterativeFeatureSelection):
         # results in here please
         results = None
 
+        # split only once -- all candidate and performance datasets are
+        # derived from the same training and testing portions
+        trainds, testds = self._get_traintest_ds(ds)
+
         # as long as there are candidates left
         # the loop will most likely get broken earlier if the stopping
         # criterion is reached
         while len(candidates):
+            # a single slicing per step: the selected features plus a last
+            # column that is taken by the candidate under evaluation
+            candidate_ds = trainds[:, selected + [candidates[0]]]
+
             # measures for all candidates
-            measures = []
-
-            # for all possible candidates
-            for i, candidate in enumerate(candidates):
-                if __debug__:
-                    debug('IFSC', "Tested %i" % i, cr=True)
-
-                # take the new candidate and all already selected features
-                # select a new temporay feature subset from the dataset
-                # slice the full dataset, because for the initial iteration
-                # steps this will be much mure effecient than splitting the
-                # full ds into train and test at first
-                fslm = StaticFeatureSelection(selected + [candidate])
-                fslm.train(ds)
-                candidate_ds = fslm(ds)
-                # activate the dataset splitter
-                dsgen = self._splitter.generate(candidate_ds)
-                # and derived the dataset part that is used for computing the selection
-                # criterion
-                trainds = dsgen.next()
-                # compute data measure on the training part of this feature set
-                measures.append(fmeasure(trainds))
+            if nproc > 1 and len(candidates) > 1:
+                measures = self._proc_candidates_parallel(
+                                candidate_ds, trainds, candidates, nproc)
+            else:
+                measures = self._proc_candidates(
+                                candidate_ds, trainds, candidates, fmeasure)
+            del candidate_ds
 
             # relies on ds.item() to work properly
             measures = [np.asscalar(m) for m in measures]
@@ -134,18 +144,9 @@ class IFS(IterativeFeatureSelection):
 
             # actually run the performance measure to estimate "quality" of
             # selection
-            fslm = StaticFeatureSelection(selected)
-            fslm.train(ds)
-            selectedds = fslm(ds)
-            # split into train and test part
-            trainds, testds = self._get_traintest_ds(selectedds)
-            # evaluate and store
-            error = self._evaluate_pmeasure(trainds, testds)
+            error = self._evaluate_pmeasure(trainds[:, selected],
+                                            testds[:, selected])
             errors.append(np.asscalar(error))
-            # intermediate cleanup, so the datasets do not hand around while
-            # the next candidate evaluation is computed
-            del trainds
-            del testds
 
             # Check if it is time to stop and if we got
             # the best result
@@ -170,3 +171,48 @@ class IFS(IterativeFeatureSelection):
 
         # charge state
         self.ca.errors = errors
+
+
+    def _proc_candidates(self, candidate_ds, trainds, candidates, fmeasure):
+        """Compute the feature measure for a list of candidates
+
+        The last feature of `candidate_ds` gets replaced by each candidate
+        feature of `trainds` in turn.
+        """
+        measures = []
+        samples = candidate_ds.samples
+        fattrs = [(a.value, trainds.fa[a.name].value)
+                  for a in candidate_ds.fa.values()]
+        for i, candidate in enumerate(candidates):
+            if __debug__:
+                debug('IFSC', "Tested %i" % i, cr=True)
+            samples[:, -1] = trainds.samples[:, candidate]
+            for cvalue, tvalue in fattrs:
+                cvalue[-1] = tvalue[candidate]
+            # compute data measure on the training part of this feature set
+            measures.append(fmeasure(candidate_ds))
+        return measures
+
+
+    def _proc_candidates_parallel(self, candidate_ds, trainds, candidates,
+                                  nproc):
+        """Distribute candidate evaluation across `nproc` processes
+        """
+        import pprocess
+        blocks = [list(b) for b in
+                  np.array_split(candidates, min(nproc, len(candidates)))]
+        p_results = pprocess.Map(limit=len(blocks))
+        if __debug__:
+            debug('IFSC', "Starting off child processes for nproc=%i"
+                  % len(blocks))
+        compute = p_results.manage(
+                    pprocess.MakeParallel(self._proc_candidates))
+        for block in blocks:
+            # every process gets its own buffer and measure
+            compute(candidate_ds.copy(deep=True), trainds, block,
+                    copy(self._fmeasure))
+        # pprocess.Map yields results in the order of submission
+        measures = []
+        for r in p_results:
+            measures += r
+        return measures
@@ -23,6 +23,25 @@ from mvpa.base.state import ConditionalAttribute
 if __debug__:
     from mvpa.base import debug
 
+def _compact(a, ids, blocksize=1024):
+    """Move the elements `ids` to the front of `a` (along the first axis).
+
+    This is done in-place and block-wise, so only a temporary copy of a single
+    block is needed. `ids` has to be sorted in ascending order.
+
+    Returns
+    -------
+    array
+      View of the first ``len(ids)`` elements of `a`.
+    """
+    for start in xrange(0, len(ids), blocksize):
+        block = ids[start:start + blocksize]
+        # ids are sorted, hence a target position is never behind its source
+        # and no later block source gets overwritten
+        a[start:start + len(block)] = a[block]
+    return a[:len(ids)]
+
+
 # TODO: Abs value of sensitivity should be able to rule RFE
 # Often it is what abs value of the sensitivity is what matters.
 # So we should either provide a simple decorator around arbitrary
@@ -101,6 +120,8 @@ class RFE(IterativeFeatureSelection):
                  splitter,
                  fselector=FractionTailSelector(0.05),
                  update_sensitivity=True,
+                 inplace=False,
+                 warm_start=False,
                  **kwargs):
         # XXX Allow for multiple stopping criterions, e.g. error not decreasing
         # anymore OR number of features less than threshold
@@ -127,6 +148,17 @@ class RFE(IterativeFeatureSelection):
           If False the sensitivity map is only computed once and reused
           for each iteration. Otherwise the senstitivities are
           recomputed at each selection step.
+        inplace : bool
+          If True, RFE operates on a single working copy of the training and
+          testing data. Eliminating features then compacts the surviving
+          features to the front of this working copy and truncates it to a
+          view, instead of slicing new datasets at each step. Measures must
+          not hold on to datasets of previous steps.
+        warm_start : bool
+          If True and the classifier of the sensitivity analyzer supports it
+          (i.e. has a `warm_start()` method, as `SMLR`), it gets trained
+          starting with the weights of the previous step for the surviving
+          features.
         """
         # bases init first
         IterativeFeatureSelection.__init__(self, fmeasure, pmeasure, splitter,
@@ -134,6 +166,8 @@ class RFE(IterativeFeatureSelection):
 
         self.__update_sensitivity = update_sensitivity
         """Flag whether sensitivity map is recomputed for each step."""
+        self.__inplace = inplace
+        self.__warm_start = warm_start
 
 
     def _train(self, ds):
@@ -157,6 +191,15 @@ class RFE(IterativeFeatureSelection):
         """
         # get the initial split into train and test
         dataset, testdataset = self._get_traintest_ds(ds)
+        inplace = self.__inplace
+
+        if self.__warm_start:
+            clf = getattr(self._fmeasure, 'clf', None)
+            if not hasattr(clf, 'warm_start'):
+                clf = None
+        else:
+            clf = None
+        """Classifier to warm-start at each step."""
 
         if __debug__:
             debug('RFEC',
@@ -189,6 +232,12 @@ class RFE(IterativeFeatureSelection):
         """Same feature selection has to be performs on test dataset as well.
         This will hold the current testdataset."""
 
+        if inplace:
+            # single working copy to be compacted at each step
+            wdataset = wdataset.copy(deep=True)
+            if not testdataset is None:
+                wtestdataset = wtestdataset.copy(deep=True)
+
         step = 0
         """Counter how many selection step where done."""
 
@@ -259,15 +308,24 @@ class RFE(IterativeFeatureSelection):
 
             # Select features to preserve
             selected_ids = self._fselector(sensitivity)
+            if inplace:
+                # compacting requires ascending order
+                selected_ids = np.sort(selected_ids)
 
             if __debug__:
                 debug('RFEC_',
                       "Sensitivity: %s, nfeatures_selected=%d, selected_ids: %s" %
                       (sensitivity, len(selected_ids), selected_ids))
 
+            if not clf is None and clf.is_trained:
+                # start the next training from current weights
+                clf.warm_start(clf.weights[selected_ids])
 
             # Create a dataset only with selected features
-            wdataset = wdataset[:, selected_ids]
+            if inplace:
+                wdataset = self._compact_dataset(wdataset, selected_ids)
+            else:
+                wdataset = wdataset[:, selected_ids]
 
             # select corresponding sensitivity values if they are not
             # recomputed
@@ -281,7 +339,12 @@ class RFE(IterativeFeatureSelection):
             #      in lightsvm. Or for god's sake leave-one-out
             #      on a wdataset
             # TODO: document these cases in this class
-            if not testdataset is None:
+            if testdataset is None:
+                pass
+            elif inplace:
+                wtestdataset = self._compact_dataset(wtestdataset,
+                                                     selected_ids)
+            else:
                 wtestdataset = wtestdataset[:, selected_ids]
 
             step += 1
@@ -306,3 +369,18 @@ class RFE(IterativeFeatureSelection):
         # announce desired features to the underlying slice mapper
         # do copy to survive later selections
         self._safe_assign_slicearg(copy(result_selected_ids))
+
+
+    def _compact_dataset(self, ds, ids):
+        """Compact selected features of a working dataset in-place"""
+        # transposed view to compact features along the first axis
+        _compact(ds.samples.T, ids)
+        for attr in ds.fa.values():
+            _compact(attr.value, ids)
+        # truncation by slicing yields views only
+        return ds[:, :len(ids)]
+
+
+    update_sensitivity = property(fget=lambda self: self.__update_sensitivity)
+    inplace = property(fget=lambda self: self.__inplace)
+    warm_start = property(fget=lambda self: self.__warm_start)
@@ -22,7 +22,7 @@ __docformat__ = 'restructuredtext'
 
 import numpy as np
 
-from mvpa.base.types import is_datasetlike
+from mvpa.base.types import is_datasetlike, as_precision
 from mvpa.base.state import ClassWithCollections
 from mvpa.base.param import Parameter
 from mvpa.misc.sampleslookup import SamplesLookup # required for CachedKernel
@@ -184,11 +184,30 @@ class Kernel(ClassWithCollections):
         setattr(cls, 'as_raw_%s'%typename, methodraw)
 
 class NumpyKernel(Kernel):
-    """A Kernel object with internal representation as a 2d numpy array"""
+    """A Kernel object with internal representation as a 2d numpy array
+
+    Kernel matrices are computed in single precision if the precision
+    policy (see :func:`~mvpa.base.types.get_float_dtype`) asks for it,
+    unless `ignore_precision` is set by an algorithm that requires double
+    precision kernels (e.g. `GPR`).
+    """
 
     _ATTRIBUTE_COLLECTIONS = Kernel._ATTRIBUTE_COLLECTIONS + ['ca']
     # enforce presence of params AND ca collections for gradients etc
 
+    ignore_precision = False
+    """Whether to compute in the precision of the data regardless of the
+    precision policy"""
+
+    def compute(self, ds1, ds2=None):
+        if is_datasetlike(ds1):
+            ds1 = ds1.samples
+        if is_datasetlike(ds2):
+            ds2 = ds2.samples
+        if not self.ignore_precision:
+            ds1, ds2 = as_precision(ds1), as_precision(ds2)
+        Kernel.compute(self, ds1, ds2)
+
     def __array__(self):
         # By definintion, a NumpyKernel's internal representation is an array
         return self._k
@@ -259,7 +278,7 @@ class PrecomputedKernel(NumpyKernel):
         """
         NumpyKernel.__init__(self, *args, **kwargs)
 
-        self._k = np.array(matrix)
+        self._k = as_precision(np.array(matrix))
 
     def compute(self, *args, **kwargs):
         pass
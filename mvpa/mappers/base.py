@@ -13,6 +13,7 @@ __docformat__ = 'restructuredtext'
 import numpy as np
 import copy
 
+from mvpa.base import profiler
 from mvpa.base.learner import Learner
 from mvpa.base.node import ChainNode
 from mvpa.base.types import is_datasetlike, accepts_dataset_as_samples
@@ -167,7 +168,8 @@ class Mapper(Learner):
             if __debug__:
                 debug('MAP', "Forward-map %s-shaped dataset through '%s'."
                         % (data.shape, self))
-            return self._forward_dataset(data)
+            ptoken = profiler.active and profiler.start(self, 'forward')
+            result = self._forward_dataset(data)
         else:
             if hasattr(data, 'ndim') and data.ndim < 2:
                 raise ValueError(
@@ -177,7 +179,11 @@ class Mapper(Learner):
                     'Mapper.forward1() instead.')
             if __debug__:
                 debug('MAP', "Forward-map data through '%s'." % (self))
-            return self._forward_data(data)
+            ptoken = profiler.active and profiler.start(self, 'forward')
+            result = self._forward_data(data)
+        if ptoken:
+            profiler.stop(ptoken)
+        return result
 
 
     def forward1(self, data):
@@ -11,6 +11,7 @@
 __docformat__ = 'restructuredtext'
 
 import numpy as np
+from numpy.lib.stride_tricks import as_strided
 
 from mvpa.mappers.base import Mapper
 from mvpa.clfs.base import accepts_dataset_as_samples
@@ -35,7 +36,8 @@ class BoxcarMapper(Mapper):
     #       utility functionality (outside BoxcarMapper) could be used to merge
     #       arbitrary sample attributes into the samples matrix (with
     #       appropriate mapper adjustment, e.g. CombinedMapper).
-    def __init__(self, startpoints, boxlength, offset=0, **kwargs):
+    def __init__(self, startpoints, boxlength, offset=0, strided=False,
+                 **kwargs):
         """
         Parameters
         ----------
@@ -47,6 +49,13 @@ class BoxcarMapper(Mapper):
         offset : int
           The offset between the provided starting point and the actual start
           of the boxcar.
+        strided : bool
+          If True and the startpoints are evenly spaced (and ascending), the
+          boxcars are not copied out of the input data, but are returned as
+          a strided view into it. This avoids duplicating data by the overlap
+          factor of overlapping boxcars (e.g. for many epochs of a continuous
+          recording). A subsequent `FlattenMapper` preserves the view. As
+          overlapping boxcars share memory, such views are read-only.
         """
         Mapper.__init__(self, **kwargs)
         self._outshape = None
@@ -68,6 +77,7 @@ class BoxcarMapper(Mapper):
 
         self.boxlength = int(boxlength)
         self.offset = offset
+        self.strided = strided
         self.__selectors = None
 
         # build a list of list where each sublist contains the indexes of to be
@@ -85,7 +95,8 @@ class BoxcarMapper(Mapper):
         if badguy in state:
             del state[badguy]
         return (self.__class__,
-                    (self.startpoints, self.boxlength, self.offset),
+                    (self.startpoints, self.boxlength, self.offset,
+                     self.strided),
                     state)
 
 
@@ -106,6 +117,8 @@ class BoxcarMapper(Mapper):
 
     def __repr__(self):
         s = super(BoxcarMapper, self).__repr__()
+        if self.strided:
+            s = s.replace("(", "(strided=True, ", 1)
         return s.replace("(", "(boxlength=%d, offset=%d, startpoints=%s, " %
                          (self.boxlength, self.offset, str(self.startpoints)),
                          1)
@@ -145,7 +158,46 @@ class BoxcarMapper(Mapper):
         """
         # NOTE: _forward_dataset() relies on the assumption that the following
         # also works with 1D arrays and still yields sane results
-        return np.vstack([data[box][np.newaxis] for box in self.__selectors])
+        startpoints = self.startpoints
+        if not isinstance(data, np.ndarray) or not len(startpoints):
+            return np.vstack([data[box][np.newaxis]
+                              for box in self.__selectors])
+        if self.strided and data.dtype != np.object:
+            steps = np.unique(np.diff(startpoints))
+            if len(steps) < 2 and (not len(steps) or steps[0] > 0):
+                if len(steps):
+                    step = steps[0]
+                else:
+                    # a single boxcar
+                    step = self.boxlength
+                return self.__get_strided_view(data, step)
+        # a single fancy-indexing step with a 2D index array (boxcars x box
+        # elements) yields all boxcars at once
+        idx = startpoints[:, None] + self.offset \
+              + np.arange(self.boxlength)[None]
+        return data[idx]
+
+
+    def __get_strided_view(self, data, step):
+        """Boxcars as a view into the data"""
+        # make sure data is not prematurely cut, as negative indexing
+        # would not fail for a view
+        start = self.startpoints[0] + self.offset
+        stop = self.startpoints[-1] + self.offset + self.boxlength
+        if start < 0 or stop > len(data):
+            raise ValueError('Illegal box (start: %i, stop: %i) with total '
+                             'input sample being %i.'
+                             % (start, stop, len(data)))
+        strides = data.strides
+        view = as_strided(data[start:],
+                          shape=(len(self.startpoints), self.boxlength)
+                                 + data.shape[1:],
+                          strides=(strides[0] * step,) + strides)
+        if step < self.boxlength:
+            # overlapping boxcars would share memory, which makes in-place
+            # modifications dangerous
+            view.flags.writeable = False
+        return view
 
 
     def _forward_dataset(self, dataset):
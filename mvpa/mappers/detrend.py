@@ -33,6 +33,7 @@ if externals.exists('scipy', raise_=True):
 
 from mvpa.base.dochelpers import _str, borrowkwargs
 from mvpa.mappers.base import Mapper
+from mvpa.misc.support import get_design_svd
 
 
 class PolyDetrendMapper(Mapper):
@@ -84,7 +85,8 @@ class PolyDetrendMapper(Mapper):
     >>> np.sum(np.abs(mds)) < 0.00001
     True
     """
-    def __init__(self, polyord=1, chunks_attr=None, opt_regs=None, **kwargs):
+    def __init__(self, polyord=1, chunks_attr=None, opt_regs=None,
+                 blocksize=None, **kwargs):
         """
         Parameters
         ----------
@@ -117,10 +119,15 @@ class PolyDetrendMapper(Mapper):
           name is already present in the input dataset its values are interpreted
           as sample coordinates in the space that should be spanned by the
           polynomials.
+        blocksize : int or None
+          If not None, the data is detrended in blocks of this many features
+          at a time. This limits the size of temporary arrays for very wide
+          datasets.
         """
         self.__chunks_attr = chunks_attr
         self.__polyord = polyord
         self.__opt_reg = opt_regs
+        self.__blocksize = blocksize
 
         # things that come from train()
         self._polycoords = None
@@ -135,6 +142,8 @@ class PolyDetrendMapper(Mapper):
 
     def __repr__(self):
         s = super(PolyDetrendMapper, self).__repr__()
+        if not self.__blocksize is None:
+            s = s.replace("(", "(blocksize=%i, " % self.__blocksize, 1)
         return s.replace("(",
                          "(polyord=%i, chunks_attr=%s, opt_regs=%s, "
                           % (self.__polyord,
@@ -314,11 +323,17 @@ class PolyDetrendMapper(Mapper):
                 # let's put that information into the output dataset
                 mds.sa[inspace] = self._polycoords
 
-        # regression for each feature
-        fit = np.linalg.lstsq(regs, ds.samples)
-        # actually we are only interested in the solution
-        # res[0] is (nregr x nfeatures)
-        y = fit[0]
+        # regression for each feature: projecting the data onto an
+        # orthonormal basis of the regressors' column space is equivalent to a
+        # least squares fit, but the factorization can be reused for any
+        # dataset with the same design (e.g. same chunk layout and polyord)
+        basis = get_design_svd(regs)[0]
+        samples = ds.samples
+        nfeatures = samples.shape[1]
+        blocksize = self.__blocksize
+        if blocksize is None:
+            blocksize = nfeatures
+
         # remove all and keep only the residuals
         if self._secret_inplace_detrend:
             # if we are in evil mode do evil
@@ -328,10 +343,23 @@ class PolyDetrendMapper(Mapper):
             if np.issubdtype(mds.samples.dtype, np.integer):
                 mds.samples = mds.samples.astype('float')
 
-            mds.samples -= np.dot(regs, y)
-        else:
+            samples = mds.samples
+            for start in xrange(0, nfeatures, blocksize):
+                # a view, hence detrending happens in-place
+                block = samples[:, start:start + blocksize]
+                block -= np.dot(basis, np.dot(basis.T, block))
+        elif blocksize >= nfeatures:
             # important to assign to ensure COW behavior
-            mds.samples = ds.samples - np.dot(regs, y)
+            mds.samples = samples - np.dot(basis, np.dot(basis.T, samples))
+        else:
+            residuals = np.empty(samples.shape,
+                                 dtype=np.find_common_type(
+                                        [samples.dtype, basis.dtype], []))
+            for start in xrange(0, nfeatures, blocksize):
+                block = samples[:, start:start + blocksize]
+                residuals[:, start:start + blocksize] = \
+                        block - np.dot(basis, np.dot(basis.T, block))
+            mds.samples = residuals
 
         return mds
 
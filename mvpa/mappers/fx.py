@@ -18,7 +18,6 @@ from mvpa.base.node import Node
 from mvpa.datasets import Dataset
 from mvpa.base.dochelpers import _str, _repr_attrs
 from mvpa.mappers.base import Mapper
-from mvpa.misc.support import array_whereequal
 from mvpa.base.dochelpers import borrowdoc
 
 from mvpa.misc.transformers import sum_of_abs, max_of_abs
@@ -169,11 +168,17 @@ class FxMapper(Mapper):
         # mapper should operate on
         self.__attrcombs = dict(zip(self.__uattrs,
                                 [col[attr].unique for attr in self.__uattrs]))
-        # let it generate all combinations of unique elements in any attr
-        for comb in _orthogonal_permutations(self.__attrcombs):
+        # let it generate all combinations of unique elements in any attr --
+        # by their index among the unique values, so the selection can be
+        # done on the (cached) integer codes of the attributes
+        for icomb in _orthogonal_permutations(
+                dict([(attr, range(len(u)))
+                      for attr, u in self.__attrcombs.iteritems()])):
             selector = reduce(np.multiply,
-                                [array_whereequal(col[attr].value, value)
-                                 for attr, value in comb.iteritems()])
+                                [col[attr].codes == i
+                                 for attr, i in icomb.iteritems()])
+            comb = dict([(attr, self.__attrcombs[attr][i])
+                         for attr, i in icomb.iteritems()])
             # process the samples
             if axis == 0:
                 samples = ds.samples[selector]
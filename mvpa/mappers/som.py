@@ -30,7 +30,7 @@ class SimpleSOMMapper(Mapper):
     kernel.
     """
     def __init__(self, kshape, niter, learning_rate=0.005,
-                 iradius=None):
+                 iradius=None, batchsize=None, dtype='float'):
         """
         Parameters
         ----------
@@ -48,6 +48,17 @@ class SimpleSOMMapper(Mapper):
           will continuously decreased during network training. If `None`
           (default) the radius is set equal to the longest edge of the
           Kohonen layer.
+        batchsize : int or None
+          Number of samples for which best matching units and unit weight
+          updates are computed at once. Updates of all batches are
+          accumulated and applied once per iteration, hence the result does
+          not depend on this setting -- it only limits memory consumption,
+          which is proportional to `batchsize` times the number of Kohonen
+          units. If `None` (default) all samples are processed at once.
+        dtype : str or dtype
+          Data type of the Kohonen layer and of all computations during
+          training and mapping. 'float32' halves the memory footprint for
+          large datasets at the cost of precision.
         """
         # init base class
         Mapper.__init__(self)
@@ -65,6 +76,12 @@ class SimpleSOMMapper(Mapper):
         # number of training iterations
         self.niter = niter
 
+        # number of samples to process at once
+        self.batchsize = batchsize
+
+        # precision of the Kohonen layer
+        self.dtype = np.dtype(dtype)
+
         # precompute whatever can be done
         # scalar for decay of learning rate and radius across all iterations
         self.iter_scale = self.niter / np.log(self.radius)
@@ -82,13 +99,11 @@ class SimpleSOMMapper(Mapper):
         samples : array-like
           Used for unsupervised training of the SOM.
         """
+        samples = np.asanyarray(samples, dtype=self.dtype)
         # XXX initialize with clever default, e.g. plain of first two PCA
         # components
-        self._K = np.random.standard_normal(tuple(self.kshape) + (samples.shape[1],))
-
-        # units weight vector deltas for batch training
-        # (height x width x #features)
-        unit_deltas = np.zeros(self._K.shape, dtype='float')
+        self._K = np.random.standard_normal(
+                    tuple(self.kshape) + (samples.shape[1],)).astype(self.dtype)
 
         # precompute distance kernel between elements in the Kohonen layer
         # that will remain constant throughout the training
@@ -97,44 +112,66 @@ class SimpleSOMMapper(Mapper):
         dqd = np.fromfunction(lambda x, y: (x**2 + y**2)**0.5,
                              self.kshape, dtype='float')
 
+        # coordinates of all units, to unfold the kernel quadrant into the
+        # influence of any best matching unit on all units
+        nunits = np.prod(self.kshape)
+        uids = np.arange(nunits)
+        urows, ucols = uids // self.kshape[1], uids % self.kshape[1]
+
         # for all iterations
         for it in xrange(1, self.niter + 1):
             # compute the neighborhood impact kernel for this iteration
             # has to be recomputed since kernel shrinks over time
-            k = self._compute_influence_kernel(it, dqd)
-
-            # for all training vectors
-            for s in samples:
-                # determine closest unit (as element coordinate)
-                b = self._get_bmu(s)
-
-                # train all units at once by unfolding the kernel (from the
-                # single quadrant that is precomputed), cutting it to the
-                # right shape and simply multiply it to the difference of target
-                # and all unit weights....
-                infl = np.vstack((
-                        np.hstack((
-                            # upper left
-                            k[b[0]:0:-1, b[1]:0:-1],
-                            # upper right
-                            k[b[0]:0:-1, :self.kshape[1] - b[1]])),
-                        np.hstack((
-                            # lower left
-                            k[:self.kshape[0] - b[0], b[1]:0:-1],
-                            # lower right
-                            k[:self.kshape[0] - b[0], :self.kshape[1] - b[1]]))
-                               ))
-                unit_deltas += infl[:,:,np.newaxis] * (s - self._K)
+            k = self._compute_influence_kernel(it, dqd).astype(self.dtype)
+
+            # flat view of the units as (#units x #features)
+            K = self._K.reshape(nunits, -1)
+            # units weight vector deltas for batch training
+            unit_deltas = np.zeros(K.shape, dtype=self.dtype)
+            # total influence on each unit
+            total_infl = np.zeros(nunits, dtype=self.dtype)
+
+            for start, batch in self._iter_batches(samples):
+                # determine closest units for all training vectors at once
+                bmus = self._get_bmus(batch)
+                # influence of each sample on all units (#samples x #units)
+                # obtained by unfolding the kernel around the sample's unit
+                infl = k[np.abs(urows[None] - urows[bmus][:, None]),
+                         np.abs(ucols[None] - ucols[bmus][:, None])]
+                # sum over samples of infl * (s - K)
+                unit_deltas += np.dot(infl.T, batch)
+                total_infl += infl.sum(axis=0)
+
+            unit_deltas -= total_infl[:, None] * K
 
             # apply cumulative unit deltas
-            self._K += unit_deltas
+            K += unit_deltas
 
             if __debug__:
                 debug("SOM", "Iteration %d/%d done: ||unit_deltas||=%g" %
                       (it, self.niter, np.sqrt(np.sum(unit_deltas **2))))
 
-            # reset unit deltas
-            unit_deltas.fill(0.)
+
+    def _iter_batches(self, samples):
+        """Generate batches of samples according to `batchsize`.
+        """
+        batchsize = self.batchsize
+        if batchsize is None:
+            batchsize = len(samples)
+        for start in xrange(0, len(samples), max(batchsize, 1)):
+            yield start, samples[start:start + batchsize]
+
+
+    def _get_bmus(self, samples):
+        """Returns flat IDs of the best matching units for all samples.
+
+        Squared Euclidean distances between all samples and all units are
+        obtained with a single matrix product.
+        """
+        K = self.K.reshape(-1, self.K.shape[-1])
+        # constant ||sample||**2 does not affect the minimum
+        dists = (K ** 2).sum(axis=1)[None] - 2 * np.dot(samples, K.T)
+        return np.argmin(dists, axis=1)
 
 
     ##REF: Name was automagically refactored
@@ -166,36 +203,18 @@ class SimpleSOMMapper(Mapper):
         return infl
 
 
-    ##REF: Name was automagically refactored
-    def _get_bmu(self, sample):
-        """Returns the ID of the best matching unit.
-
-        'best' is determined as minimal squared Euclidean distance between
-        any units weight vector and some given target `sample`
-
-        Parameters
-        ----------
-        sample : array
-          Target sample.
-
-        Returns
-        -------
-        tuple: (row, column)
-        """
-        # TODO expose distance function as parameter
-        loc = np.argmin(((self.K - sample) ** 2).sum(axis=2))
-
-        # assumes 2D Kohonen layer
-        return (np.divide(loc, self.kshape[1]), loc % self.kshape[1])
-
-
     def _forward_data(self, data):
         """Map data from the IN dataspace into OUT space.
 
         Mapping is performs by simple determining the best matching Kohonen
         unit for each data sample.
         """
-        return np.array([self._get_bmu(d) for d in data])
+        data = np.asanyarray(data, dtype=self.dtype)
+        bmus = np.empty(len(data), dtype='int')
+        for start, batch in self._iter_batches(data):
+            bmus[start:start + len(batch)] = self._get_bmus(batch)
+        # assumes 2D Kohonen layer
+        return np.transpose((bmus // self.kshape[1], bmus % self.kshape[1]))
 
 
     def _reverse_data(self, data):
@@ -214,6 +233,10 @@ class SimpleSOMMapper(Mapper):
         s += 'kshape=%s, niter=%i, learning_rate=%f, iradius=%f)' \
                 % (str(tuple(self.kshape)), self.niter, self.lrate,
                    self.radius)
+        if self.batchsize is not None:
+            s = s[:-1] + ', batchsize=%i)' % self.batchsize
+        if self.dtype != np.dtype('float'):
+            s = s[:-1] + ', dtype=%r)' % self.dtype.name
         return s
 
 
@@ -13,6 +13,7 @@ __docformat__ = 'restructuredtext'
 import numpy as np
 
 from mvpa.base import warning
+from mvpa.base.types import get_float_dtype, as_precision
 from mvpa.base.dochelpers import _str, borrowkwargs, _repr_attrs
 from mvpa.mappers.base import accepts_dataset_as_samples, Mapper
 from mvpa.datasets.base import Dataset
@@ -49,7 +50,7 @@ class ZScoreMapper(Mapper):
     Reverse-mapping is currently not implemented.
     """
     def __init__(self, params=None, param_est=None, chunks_attr='chunks',
-                 dtype='float64', **kwargs):
+                 dtype=None, **kwargs):
         """
         Parameters
         ----------
@@ -72,7 +73,9 @@ class ZScoreMapper(Mapper):
           samples, and to perform individual Z-scoring within them.
         dtype : Numpy dtype, optional
           Target dtype that is used for upcasting, in case integer data is to be
-          Z-scored.
+          Z-scored. If None, the dtype of the precision policy (see
+          :func:`~mvpa.base.types.get_float_dtype`) is used, and in single
+          precision mode all data gets converted into float32.
         """
         Mapper.__init__(self, **kwargs)
 
@@ -80,6 +83,9 @@ class ZScoreMapper(Mapper):
         self.__params = params
         self.__param_est = param_est
         self.__params_dict = None
+        # (count, mean, sum of squared deviations) per chunk to allow for
+        # incremental training
+        self.__stats = None
         self.__dtype = dtype
 
         # secret switch to perform in-place z-scoring
@@ -90,7 +96,7 @@ class ZScoreMapper(Mapper):
         return super(ZScoreMapper, self).__repr__(
             prefixes=prefixes
             + _repr_attrs(self, ['params', 'param_est', 'chunks_attr'])
-            + _repr_attrs(self, ['dtype'], default='float64'))
+            + _repr_attrs(self, ['dtype']))
 
 
     def __str__(self):
@@ -99,9 +105,7 @@ class ZScoreMapper(Mapper):
 
     def _train(self, ds):
         # local binding
-        chunks_attr = self.__chunks_attr
         params = self.__params
-        param_est = self.__param_est
 
         # populate a dictionary with tuples of (mean,std) for all chunks, or
         # a global value that is is used for the whole data
@@ -111,37 +115,106 @@ class ZScoreMapper(Mapper):
                 # turn into dict, otherwise assume that we have parameters per
                 # chunk
                 params = {'__all__': params}
+            self.__params_dict = params
         else:
-            # no parameters given, need to estimate
-            if not param_est is None:
-                est_attr, est_attr_values = param_est
-                # which samples to use for estimation
-                est_ids = set(get_samples_by_attr(ds, est_attr,
-                                                  est_attr_values))
-            else:
-                est_ids = slice(None)
-
-            # now we can either do it one for all, or per chunk
-            if not chunks_attr is None:
-                # per chunk estimate
-                params = {}
-                for c in ds.sa[chunks_attr].unique:
-                    slicer = np.where(ds.sa[chunks_attr].value == c)[0]
-                    if not isinstance(est_ids, slice):
-                        slicer = list(est_ids.intersection(set(slicer)))
-                    params[c] = self._compute_params(ds.samples[slicer])
-            else:
-                # global estimate
-                params = {'__all__': self._compute_params(ds.samples[est_ids])}
+            # no parameters given, need to estimate -- all chunks at once
+            self.__stats = None
+            self.__update_stats(ds)
+
+
+    def partial_train(self, ds):
+        """Update Z-scoring parameters with an additional portion of data.
+
+        In contrast to `train()` previously estimated statistics are not
+        discarded, but are combined with those of the new samples (using
+        the pairwise update of Chan et al., i.e. a batched variant of
+        Welford's algorithm). This allows for estimating parameters from
+        data that arrives run by run, or that does not fit into memory as
+        a whole. The resulting parameters are identical (up to numerical
+        precision) to those obtained by training on the concatenation of
+        all portions.
+
+        Parameters
+        ----------
+        ds : Dataset
+          Portion of the training data.
+        """
+        if not self.__params is None:
+            raise RuntimeError("%s was given fixed parameters and cannot be "
+                               "trained incrementally." % self)
+        if not self.is_trained:
+            self.__stats = None
+        self.__update_stats(ds)
+        self._set_trained()
 
 
+    def _untrain(self):
+        self.__params_dict = None
+        self.__stats = None
+
+
+    def __update_stats(self, ds):
+        """Merge group statistics of `ds` into the current estimates"""
+        # local binding
+        chunks_attr = self.__chunks_attr
+        param_est = self.__param_est
+
+        samples = ds.samples
+        if not param_est is None:
+            est_attr, est_attr_values = param_est
+            # which samples to use for estimation
+            est_ids = get_samples_by_attr(ds, est_attr, est_attr_values)
+        else:
+            est_ids = None
+
+        # now we can either do it one for all, or per chunk
+        if not chunks_attr is None:
+            groups = ds.sa[chunks_attr].unique
+            codes = ds.sa[chunks_attr].codes
+            if not est_ids is None:
+                samples = samples[est_ids]
+                codes = codes[est_ids]
+            counts, means, sqdevs = _group_stats(samples, codes, len(groups))
+        else:
+            # global estimate
+            groups = ['__all__']
+            if not est_ids is None:
+                samples = samples[est_ids]
+            if est_ids is None:
+                counts = [len(ds)]
+            else:
+                counts = [len(est_ids)]
+            means = [np.mean(samples, axis=0)]
+            sqdevs = [np.var(samples, axis=0) * counts[0]]
+
+        stats = self.__stats
+        if stats is None:
+            stats = self.__stats = {}
+        for i, g in enumerate(groups):
+            if not g in stats or stats[g][0] == 0:
+                stats[g] = (counts[i], means[i], sqdevs[i])
+                continue
+            n_b = counts[i]
+            if n_b == 0:
+                continue
+            # merge with what we have seen so far
+            n_a, mean_a, sqdev_a = stats[g]
+            n = n_a + n_b
+            delta = means[i] - mean_a
+            stats[g] = (n,
+                        mean_a + delta * (float(n_b) / n),
+                        sqdev_a + sqdevs[i] + delta ** 2 * (float(n_a) * n_b / n))
+
+        # mean and (biased) std as computed by np.mean and np.std
+        params = {}
+        for g, (n, mean, sqdev) in stats.iteritems():
+            params[g] = (mean, np.sqrt(sqdev / n))
         self.__params_dict = params
 
 
     def _forward_dataset(self, ds):
         # local binding
         chunks_attr = self.__chunks_attr
-        dtype = self.__dtype
 
         if __debug__ and not chunks_attr is None \
           and np.array(get_nsamples_per_attr(ds, chunks_attr).values()).min() <= 2:
@@ -161,24 +234,30 @@ class ZScoreMapper(Mapper):
             # shallow copy to put the new stuff in
             mds = ds.copy(deep=False)
 
-        # cast the data to float, since in-place operations below do not upcast!
-        if np.issubdtype(mds.samples.dtype, np.integer):
-            mds.samples = mds.samples.astype(dtype)
+        samples = self._astarget(mds.samples,
+                                 inplace=self._secret_inplace_zscore)
+        if samples is mds.samples and not self._secret_inplace_zscore:
+            # samples are shared with the source dataset, which must not be
+            # modified
+            samples = samples.copy()
+        mds.samples = samples
 
         if '__all__' in params:
             # we have a global parameter set
             mds.samples = self._zscore(mds.samples, *params['__all__'])
         else:
-            # per chunk z-scoring
-            for c in mds.sa[chunks_attr].unique:
+            # per chunk z-scoring -- all chunks at once
+            chunks = mds.sa[chunks_attr]
+            uniques = chunks.unique
+            for c in uniques:
                 if not c in params:
                     raise RuntimeError(
                         "%s has no parameters for chunk '%s'. It probably "
                         "wasn't present in the training dataset!?"
                         % (self.__class__.__name__, c))
-                slicer = np.where(mds.sa[chunks_attr].value == c)[0]
-                mds.samples[slicer] = self._zscore(mds.samples[slicer],
-                                                   *params[c])
+            codes = chunks.codes
+            mds.samples = self._zscore_groups(
+                            mds.samples, codes, [params[c] for c in uniques])
 
         return mds
 
@@ -199,25 +278,37 @@ class ZScoreMapper(Mapper):
                   "ZScoreMapper needs to be trained before call to forward"
 
         # mappers should not modify the input data
-        # cast the data to float, since in-place operations below to not upcast!
-        if np.issubdtype(data.dtype, np.integer):
-            if self._secret_inplace_zscore:
+        if self._secret_inplace_zscore:
+            if np.issubdtype(data.dtype, np.integer):
                 raise TypeError(
                     "Cannot perform inplace z-scoring since data is of integer "
                     "type. Please convert to float before calling zscore")
-            mdata = data.astype(self.__dtype)
-        elif self._secret_inplace_zscore:
             mdata = data
         else:
-            # do not call .copy() directly, since it might not be an array
-            mdata = copy.deepcopy(data)
+            mdata = self._astarget(data)
+            if mdata is data:
+                # do not call .copy() directly, since it might not be an array
+                mdata = copy.deepcopy(data)
 
         self._zscore(mdata, *params['__all__'])
         return mdata
 
 
-    def _compute_params(self, samples):
-        return (np.mean(samples, axis=0), np.std(samples, axis=0))
+    def _astarget(self, data, inplace=False):
+        """Convert data into the dtype to perform Z-scoring in.
+
+        Returns `data` itself if no conversion is necessary. For in-place
+        Z-scoring floating point data is kept as is.
+        """
+        dtype = self.__dtype
+        if dtype is None:
+            dtype = get_float_dtype()
+            if not inplace:
+                data = as_precision(data)
+        # cast the data to float, since in-place operations do not upcast!
+        if np.issubdtype(data.dtype, np.integer):
+            data = data.astype(dtype)
+        return data
 
 
     def _zscore(self, samples, mean, std):
@@ -243,12 +334,81 @@ class ZScoreMapper(Mapper):
                 samples[:, std_nz] /= np.asanyarray(std)[std_nz]
         return samples
 
+    def _zscore_groups(self, samples, codes, params):
+        """Z-score all groups of samples at once.
+
+        Parameters
+        ----------
+        samples : array
+          Samples to be z-scored in-place.
+        codes : array
+          Integer group index for each sample.
+        params : list
+          (mean, std) tuple for each group.
+        """
+        nfeatures = samples.shape[1]
+        means = np.empty((len(params), nfeatures))
+        stds = np.empty((len(params), nfeatures))
+        zeroed = np.zeros(len(params), dtype='bool')
+        for i, (mean, std) in enumerate(params):
+            if not np.isscalar(mean) and not len(mean) == nfeatures:
+                raise RuntimeError("mean should be a per-feature vector. "
+                                   "Got: %r" % (mean,))
+            if np.isscalar(std):
+                # scalar zero std zeros out all samples of a group
+                zeroed[i] = std == 0
+            elif len(std) != nfeatures:
+                raise RuntimeError("std should be a per-feature vector.")
+            means[i] = mean
+            stds[i] = std
+        # invariant features are only de-meaned
+        stds[stds == 0] = 1.0
+
+        samples -= means[codes]
+        samples /= stds[codes]
+        if zeroed.any():
+            samples[zeroed[codes]] = 0
+        return samples
+
+
     params = property(fget=lambda self:self.__params)
     param_est = property(fget=lambda self:self.__param_est)
     chunks_attr = property(fget=lambda self:self.__chunks_attr)
     dtype = property(fget=lambda self:self.__dtype)
 
 
+def _group_stats(samples, codes, ngroups):
+    """Compute count, mean and sum of squared deviations for sample groups.
+
+    Parameters
+    ----------
+    samples : array
+      2D samples array.
+    codes : array
+      Integer group index (0 <= code < ngroups) for each sample.
+    ngroups : int
+      Number of groups.
+
+    Returns
+    -------
+    counts, means, sqdevs
+      Arrays with one row per group.
+    """
+    # indicator matrix (groups x samples) turns per-group summation into a
+    # single matrix product
+    indicator = np.zeros((ngroups, len(codes)))
+    indicator[codes, np.arange(len(codes))] = 1
+    counts = indicator.sum(axis=1)
+    # empty groups result in NaN parameters, just like np.mean would do
+    norm = np.where(counts > 0, counts, np.nan)[:, None]
+    means = np.dot(indicator, samples) / norm
+    # two-pass for numerical stability
+    devs = samples - means[codes]
+    sqdevs = np.dot(indicator, devs * devs)
+    return counts, means, sqdevs
+
+
+
 @borrowkwargs(ZScoreMapper, '__init__')
 def zscore(ds, **kwargs):
     """In-place Z-scoring of a `Dataset` or `ndarray`.
@@ -14,7 +14,6 @@ import numpy as np
 
 from mvpa.base import externals
 from mvpa.measures.base import FeaturewiseMeasure
-from mvpa.base.dataset import vstack
 from mvpa.datasets.base import Dataset
 
 # TODO: Extend with access to functionality from scipy.stats?
@@ -28,6 +27,102 @@ from mvpa.datasets.base import Dataset
 #
 # and may be some others
 
+def _fscores(samples, labels):
+    """F-scores for any number of labelings of the same samples.
+
+    Group sums of all labelings are obtained at once as products of the
+    samples with the stacked group indicator matrices.
+
+    Parameters
+    ----------
+    samples : array (nsamples x nfeatures)
+    labels : array (nlabelings x nsamples)
+      Each row assigns the samples to groups.
+
+    Returns
+    -------
+    f : array (nlabelings x nfeatures)
+    dfbn, dfwn : array (nlabelings)
+      Degrees of freedom between and within groups.
+    """
+    # This code is based on SciPy's stats.f_oneway()
+    # Copyright (c) Gary Strangman.  All rights reserved
+    # License: BSD
+    #
+    # However, it got tweaked and optimized to better fit into PyMVPA.
+    labels = np.asanyarray(labels)
+    samples = np.asanyarray(samples)
+    if not np.issubdtype(samples.dtype, np.floating):
+        # in-place divisions below need floating point sums
+        samples = samples.astype(float)
+    nlabelings, nsamples = labels.shape
+    bign = float(nsamples)
+    ul = np.unique(labels)
+    ngroups = len(ul)
+
+    # total squares of sums
+    sostot = np.sum(samples, axis=0)
+    sostot *= sostot
+    sostot /= bign
+
+    # total sum of squares
+    sstot = np.sum(samples * samples, axis=0) - sostot
+
+    # group indicators of all labelings stacked into a single
+    # (nlabelings * ngroups x nsamples) matrix, so a single BLAS product
+    # yields the group sums of all labelings
+    groups = (labels[:, None, :] == ul[None, :, None]).astype(samples.dtype)
+    groups = groups.reshape((nlabelings * ngroups, nsamples))
+    counts = groups.sum(axis=1).reshape((nlabelings, ngroups))
+    # group sums (nlabelings x ngroups x nfeatures)
+    sos = np.dot(groups, samples).reshape((nlabelings, ngroups, -1))
+    sos *= sos
+    # groups absent from some labeling do not contribute
+    present = counts > 0
+    counts[~present] = 1
+
+    # between group sum of squares
+    ssbn = (sos / counts[:, :, None]).sum(axis=1)
+    ssbn -= sostot
+    # within
+    sswn = sstot - ssbn
+
+    # degrees of freedom
+    na = present.sum(axis=1)
+    dfbn = na - 1
+    dfwn = bign - na
+
+    # mean sums of squares
+    msb = ssbn / dfbn[:, None].astype(float)
+    msw = sswn / dfwn[:, None].astype(float)
+    f = msb / msw
+    # assure no NaNs -- otherwise it leads instead of
+    # sane unittest failure (check of NaNs) to crazy
+    #   File "mtrand.pyx", line 1661, in mtrand.shuffle
+    #  TypeError: object of type 'numpy.int64' has no len()
+    # without any sane backtrace
+    f[np.isnan(f)] = 0
+    return f, dfbn, dfwn
+
+
+def f_pvalues(f, dfbn, dfwn):
+    """Parametric p-values of F-scores from the F distribution.
+
+    Requires SciPy.
+
+    Parameters
+    ----------
+    f : array
+      F-scores.
+    dfbn, dfwn : int or array
+      Degrees of freedom between and within groups, broadcastable against
+      `f`.
+    """
+    externals.exists('scipy', raise_=True)
+    from scipy.stats import f as fdist
+    return fdist.sf(f, dfbn, dfwn)
+
+
 class OneWayAnova(FeaturewiseMeasure):
     """`FeaturewiseMeasure` that performs a univariate ANOVA.
 
@@ -44,6 +139,9 @@ class OneWayAnova(FeaturewiseMeasure):
     from the 'fprob' feature attribute.
     """
 
+    is_univariate = True
+    """Features are processed independently of each other."""
+
     def __init__(self, space='targets', **kwargs):
         """
         Parameters
@@ -67,62 +165,64 @@ class OneWayAnova(FeaturewiseMeasure):
 
 
     def _call(self, dataset):
-        # This code is based on SciPy's stats.f_oneway()
-        # Copyright (c) Gary Strangman.  All rights reserved
-        # License: BSD
-        #
-        # However, it got tweaked and optimized to better fit into PyMVPA.
-
-        # number of groups
-        targets_sa = dataset.sa[self.get_space()]
-        labels = targets_sa.value
-        ul = targets_sa.unique
-
-        na = len(ul)
-        bign = float(dataset.nsamples)
-        alldata = dataset.samples
-
-        # total squares of sums
-        sostot = np.sum(alldata, axis=0)
-        sostot *= sostot
-        sostot /= bign
-
-        # total sum of squares
-        sstot = np.sum(alldata * alldata, axis=0) - sostot
-
-        # between group sum of squares
-        ssbn = 0
-        for l in ul:
-            # all samples for the respective label
-            d = alldata[labels == l]
-            sos = np.sum(d, axis=0)
-            sos *= sos
-            ssbn += sos / float(len(d))
-
-        ssbn -= sostot
-        # within
-        sswn = sstot - ssbn
-
-        # degrees of freedom
-        dfbn = na-1
-        dfwn = bign - na
-
-        # mean sums of squares
-        msb = ssbn / float(dfbn)
-        msw = sswn / float(dfwn)
-        f = msb / msw
-        # assure no NaNs -- otherwise it leads instead of
-        # sane unittest failure (check of NaNs) to crazy
-        #   File "mtrand.pyx", line 1661, in mtrand.shuffle
-        #  TypeError: object of type 'numpy.int64' has no len()
-        # without any sane backtrace
-        f[np.isnan(f)] = 0
+        labels = dataset.sa[self.get_space()].value
+        f, dfbn, dfwn = _fscores(dataset.samples, labels[None])
 
         if externals.exists('scipy'):
-            from scipy.stats import fprob
-            return Dataset(f[np.newaxis], fa={'fprob': fprob(dfbn, dfwn, f)})
+            return Dataset(f, fa={'fprob': f_pvalues(f[0], dfbn[0], dfwn[0])})
         else:
-            return Dataset(f[np.newaxis])
+            return Dataset(f)
+
+
+    def batch_call(self, dataset, labels, fprob=False, blocksize=None):
+        """Compute F-scores for many labelings of a dataset at once.
+
+        This is a fast alternative to calling the measure on each of a
+        number of datasets with permuted targets, e.g. to estimate a
+        null-distribution of F-scores in a single pass.
+
+        Parameters
+        ----------
+        dataset : Dataset
+          Samples to compute F-scores for. Its targets are ignored.
+        labels : array (nlabelings x nsamples)
+          Each row provides the targets of one labeling of the samples.
+        fprob : bool
+          If True, parametric p-values of all F-scores are computed from the
+          F distribution and stored in the 'fprob' sample attribute (requires
+          SciPy).
+        blocksize : int or None
+          Number of labelings to process at once. Memory consumption is
+          proportional to `blocksize` times the number of groups times the
+          number of features (or samples, whichever is larger). By default
+          it is chosen so that roughly 32MB are used.
+
+        Returns
+        -------
+        Dataset
+          With one sample of F-scores per labeling.
+        """
+        labels = np.asanyarray(labels)
+        if not labels.ndim == 2 or labels.shape[1] != dataset.nsamples:
+            raise ValueError, \
+                  "Labels must be a (nlabelings x nsamples) array. Got " \
+                  "shape %s for %i samples." % (labels.shape, dataset.nsamples)
+        nlabelings = len(labels)
+        if blocksize is None:
+            ngroups = len(np.unique(labels))
+            blocksize = max(1, 2 ** 22 / (ngroups * max(dataset.nfeatures,
+                                                        dataset.nsamples)))
+        f = np.empty((nlabelings, dataset.nfeatures))
+        dfbn = np.empty(nlabelings, dtype=int)
+        dfwn = np.empty(nlabelings)
+        for start in xrange(0, nlabelings, blocksize):
+            block = slice(start, start + blocksize)
+            f[block], dfbn[block], dfwn[block] = \
+                      _fscores(dataset.samples, labels[block])
+        res = Dataset(f)
+        if fprob:
+            res.sa['fprob'] = f_pvalues(f, dfbn[:, None], dfwn[:, None])
+        return res
 
 
 class CompoundOneWayAnova(OneWayAnova):
@@ -142,25 +242,15 @@ class CompoundOneWayAnova(OneWayAnova):
         """Computes featurewise f-scores using compound comparisons."""
 
         targets_sa = dataset.sa[self.get_space()]
-        orig_labels = targets_sa.value
-        labels = orig_labels.copy()
-
-        # Lets create a very shallow copy of a dataset with just
-        # samples and targets_attr
-        dataset_mod = Dataset(dataset.samples,
-                              sa={self.get_space() : labels})
-        results = []
-        for ul in targets_sa.unique:
-            labels[orig_labels == ul] = 1
-            labels[orig_labels != ul] = 2
-            f_ds = OneWayAnova._call(self, dataset_mod)
-            if 'fprob' in f_ds.fa:
-                # rename the fprob attribute to something label specific
-                # to survive final aggregation stage
-                f_ds.fa['fprob_' + str(ul)] = f_ds.fa.fprob
-                del f_ds.fa['fprob']
-            results.append(f_ds)
-
-        results = vstack(results)
-        results.sa[self.get_space()] = targets_sa.unique
+        ul = targets_sa.unique
+
+        # all one-vs-rest comparisons at once
+        labels = np.where(targets_sa.value[None] == ul[:, None], 1, 2)
+        f, dfbn, dfwn = _fscores(dataset.samples, labels)
+
+        results = Dataset(f, sa={self.get_space(): ul})
+        if externals.exists('scipy'):
+            fp = f_pvalues(f, dfbn[:, None], dfwn[:, None])
+            for i, l in enumerate(ul):
+                results.fa['fprob_' + str(l)] = fp[i]
         return results
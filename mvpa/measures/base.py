@@ -31,8 +31,9 @@ from mvpa.misc.errorfx import mean_mismatch_error
 from mvpa.base.types import asobjarray
 
 from mvpa.base.dochelpers import enhanced_doc_string, _str, _repr_attrs
-from mvpa.base import externals, warning
+from mvpa.base import externals, warning, profiler
 from mvpa.clfs.stats import auto_null_dist
+from mvpa.clfs.transerror import ConfusionMatrix
 from mvpa.base.dataset import AttrDataset
 from mvpa.datasets import Dataset, vstack, hstack
 from mvpa.mappers.fx import BinaryFxNode
@@ -76,6 +77,10 @@ class Measure(Learner):
     """Stores the t-score corresponding to null_prob under assumption
     of Normal distribution"""
 
+    is_univariate = False
+    """Indicate whether each feature of the result only depends on the
+    respective feature of the input dataset."""
+
     def __init__(self, null_dist=None, **kwargs):
         """
         Parameters
@@ -219,7 +224,8 @@ class RepeatedMeasure(Measure):
     """Repeatedly run a measure on generated dataset.
 
     A measure is ran multiple times on datasets yielded by a custom generator.
-    Results of all measure runs are stacked and returned as a dataset upon call.
+    Results of all measure runs are stacked and returned as a dataset upon call,
+    or reduced into a single result as they are produced (see `reduce_as`).
     """
 
     repetition_results = ConditionalAttribute(enabled=False, doc=
@@ -234,11 +240,16 @@ class RepeatedMeasure(Measure):
     is_trained = True
     """Indicate that this measure is always trained."""
 
+    _REDUCE_MODES = ('sum', 'mean')
+    """Supported values of `reduce_as` (besides None)."""
+
     def __init__(self,
                  node,
                  generator,
                  callback=None,
                  concat_as='samples',
+                 reduce_as=None,
+                 nproc=1,
                  **kwargs):
         """
         Parameters
@@ -260,19 +271,43 @@ class RepeatedMeasure(Measure):
           By default, results are 'vstacked' as multiple samples in the output
           dataset. Setting this argument to 'features' will change this to
           'hstacking' along the feature axis.
+        reduce_as : {None, 'sum', 'mean'}
+          If not None, results are not stacked, but folded into a single
+          result as soon as they are produced, so only a single repetition's
+          result is kept in memory at a time (unless 'repetition_results' is
+          enabled). Results of all repetitions must have the same shape and
+          are summed, or averaged, elementwise. Attributes of the returned
+          dataset are those of the first result.
+        nproc : None or int
+          How many processes to use for running the node on the generated
+          datasets in parallel. Requires `pprocess` external module.  If None
+          -- all available cores will be used. Each repetition runs in a
+          separate process on a copy of the node, hence afterwards the node
+          (as passed to the callback) is not trained, but only carries the
+          'stats' and 'training_stats' conditional attributes of the
+          respective repetition.
         """
         Measure.__init__(self, **kwargs)
 
+        if not reduce_as is None and not reduce_as in self._REDUCE_MODES:
+            raise ValueError("Unknown reduction mode '%s'. Known are: %s"
+                             % (reduce_as, ', '.join(self._REDUCE_MODES)))
+        externals.check_nproc(nproc, 'repeated measures')
+
         self._node = node
         self._generator = generator
         self._callback = callback
         self._concat_as = concat_as
+        self._reduce_as = reduce_as
+        self.nproc = nproc
 
     def __repr__(self, prefixes=[]):
         return super(RepeatedMeasure, self).__repr__(
             prefixes=prefixes
             + _repr_attrs(self, ['node', 'generator', 'callback'])
             + _repr_attrs(self, ['concat_as'], default='samples')
+            + _repr_attrs(self, ['reduce_as'])
+            + _repr_attrs(self, ['nproc'], default=1)
             )
 
 
@@ -283,6 +318,9 @@ class RepeatedMeasure(Measure):
         ca = self.ca
         space = self.get_space()
         concat_as = self._concat_as
+        reduce_as = self._reduce_as
+        nproc = externals.get_nproc(self.nproc)
+        ptoken = profiler.active and profiler.start(self, '_call')
 
         if self.ca.is_enabled("stats") and (not node.ca.has_key("stats") or
                                             not node.ca.is_enabled("stats")):
@@ -292,22 +330,33 @@ class RepeatedMeasure(Measure):
         # precharge conditional attributes
         ca.datasets = []
 
+        if nproc > 1:
+            repetitions = self._run_parallel(generator.generate(ds), nproc)
+        else:
+            repetitions = ((sds, node(sds)) for sds in generator.generate(ds))
+
         # run the node an all generated datasets
         results = []
-        for i, sds in enumerate(generator.generate(ds)):
+        keep_results = reduce_as is None \
+                       or ca.is_enabled("repetition_results")
+        acc = None
+        nrepetitions = 0
+        for i, (sds, result) in enumerate(repetitions):
             if __debug__:
                 debug('REPM', "%d-th iteration of %s on %s",
                       (i, self, sds))
             if ca.is_enabled("datasets"):
                 # store dataset in ca
                 ca.datasets.append(sds)
-            # run the beast
-            result = node(sds)
             # callback
             if not self._callback is None:
                 self._callback(data=sds, node=node, result=result)
             # subclass postprocessing
             result = self._repetition_postcall(sds, node, result)
+            if not reduce_as is None:
+                # fold into the accumulator before the result is labeled
+                acc = self._accumulate(acc, result)
+            nrepetitions += 1
             if space:
                 # XXX maybe try to get something more informative from the
                 # processing node (e.g. in 0.5 it used to be 'chunks'->'chunks'
@@ -315,7 +364,8 @@ class RepeatedMeasure(Measure):
                 # more tricky, because `node` could be anything
                 result.set_attr(space, (i,))
             # store
-            results.append(result)
+            if keep_results:
+                results.append(result)
 
             if ca.is_enabled("stats") and node.ca.has_key("stats") \
                and node.ca.is_enabled("stats"):
@@ -325,21 +375,106 @@ class RepeatedMeasure(Measure):
                 # harvest summary stats
                 ca['stats'].value.__iadd__(node.ca['stats'].value)
 
+        if ptoken:
+            profiler.count('%s.repetitions' % self.__class__.__name__,
+                           nrepetitions)
         # charge condition attribute
         self.ca.repetition_results = results
 
         # stack all results into a single Dataset
-        if concat_as == 'samples':
+        if not reduce_as is None:
+            if acc is None:
+                raise ValueError("%s cannot reduce results, since %s did not "
+                                 "generate any dataset" % (self, generator))
+            results = self._reduce(acc, nrepetitions)
+        elif concat_as == 'samples':
             results = vstack(results)
         elif concat_as == 'features':
             results = hstack(results)
         else:
             raise ValueError("Unkown concatenation mode '%s'" % concat_as)
+
+        if ptoken:
+            profiler.stop(ptoken)
         # no need to store the raw results, since the Measure class will
         # automatically store them in a CA
         return results
 
 
+    def _accumulate(self, acc, result):
+        """Fold the result of a single repetition into the accumulator.
+
+        Parameters
+        ----------
+        acc : object or None
+          Accumulator as returned by a previous call, or None for the first
+          repetition.
+        result : Dataset
+          Output dataset of the node for this repetition.
+
+        Returns
+        -------
+        object
+          The updated accumulator.
+        """
+        if acc is None:
+            # shallow copy to keep the attributes of the first result
+            acc = result.copy(deep=False)
+            # sums of integer (e.g. count) results have to be able to turn
+            # into fractions later on, while float32 results are kept as is
+            acc.samples = np.array(result.samples,
+                                   dtype=np.find_common_type(
+                                       [result.samples.dtype],
+                                       [np.dtype(float)]))
+        elif acc.shape != result.shape:
+            raise ValueError("%s cannot reduce results of different shapes "
+                             "(got %s and %s)" % (self, acc.shape, result.shape))
+        else:
+            acc.samples += result.samples
+        return acc
+
+
+    def _reduce(self, acc, nrepetitions):
+        """Turn the accumulator into the final result of the measure."""
+        if self._reduce_as == 'mean':
+            acc.samples = acc.samples / float(nrepetitions)
+        return acc
+
+
+    def _run_parallel(self, dsgen, nproc):
+        """Run the node on all generated datasets in `nproc` processes
+
+        Yields (dataset, result) tuples in the order of the generated
+        datasets.
+        """
+        import pprocess
+        node = self._node
+        p_results = pprocess.Map(limit=nproc)
+        if __debug__:
+            debug('REPM', "Starting off child processes for nproc=%i" % nproc)
+        compute = p_results.manage(pprocess.MakeParallel(self._proc_repetition))
+        datasets = []
+        for sds in dsgen:
+            datasets.append(sds)
+            compute(sds)
+        # pprocess.Map yields results in the order of submission
+        for sds, (result, ca_values) in zip(datasets, p_results):
+            # expose per-repetition stats of the node, as if it was run here
+            for key, value in ca_values:
+                node.ca[key].value = value
+            yield sds, result
+
+
+    def _proc_repetition(self, ds):
+        """Little helper to run the node in a child process"""
+        node = self._node
+        result = node(ds)
+        ca_values = [(key, node.ca[key].value)
+                     for key in ('stats', 'training_stats')
+                     if node.ca.has_key(key) and node.ca.is_set(key)]
+        return result, ca_values
+
+
     def _repetition_postcall(self, ds, node, result):
         """Post-processing handler for each repetition.
 
@@ -372,6 +507,7 @@ class RepeatedMeasure(Measure):
     generator = property(fget=lambda self: self._generator)
     callback = property(fget=lambda self: self._callback)
     concat_as = property(fget=lambda self: self._concat_as)
+    reduce_as = property(fget=lambda self: self._reduce_as)
 
 
 class CrossValidation(RepeatedMeasure):
@@ -384,8 +520,16 @@ class CrossValidation(RepeatedMeasure):
     custom learner on the first part and run it on the next. An arbitray error
     function can by used to determine the learner's error when prediction the
     dataset part that has been unseen during training.
+
+    Besides the reduction modes of `RepeatedMeasure`, ``reduce_as='confusion'``
+    can be used with ``errorfx=None`` to accumulate the predictions of all
+    folds into a `ConfusionMatrix` instead of stacking them. The result is a
+    dataset with the matrix of counts (predictions x targets) and the labels
+    in the ``predictions`` sample and ``targets`` feature attributes.
     """
 
+    _REDUCE_MODES = RepeatedMeasure._REDUCE_MODES + ('confusion',)
+
     training_stats = ConditionalAttribute(enabled=False, doc=
        """Summary statistics about the training status of the learner
        across all cross-validation fold.""")
@@ -420,6 +564,9 @@ class CrossValidation(RepeatedMeasure):
           Partitioners that label the taken-out portion ``2`` and the remainder
           with ``1``.
         """
+        if kwargs.get('reduce_as', None) == 'confusion' and not errorfx is None:
+            raise ValueError("reduce_as='confusion' requires the predictions "
+                             "of the learner, i.e. errorfx=None")
         # compile the appropriate repeated measure to do cross-validation from
         # pieces
         if not errorfx is None:
@@ -485,6 +632,23 @@ class CrossValidation(RepeatedMeasure):
         return result
 
 
+    def _accumulate(self, acc, result):
+        if self.reduce_as != 'confusion':
+            return super(CrossValidation, self)._accumulate(acc, result)
+        if acc is None:
+            acc = ConfusionMatrix()
+        acc.add(result.sa[self.learner.get_space()].value, result.samples[:, 0])
+        return acc
+
+
+    def _reduce(self, acc, nrepetitions):
+        if self.reduce_as != 'confusion':
+            return super(CrossValidation, self)._reduce(acc, nrepetitions)
+        labels = acc.labels
+        return Dataset(acc.matrix, sa={'predictions': labels},
+                       fa={'targets': labels})
+
+
     transfermeasure = property(fget=lambda self:self._node)
 
     # XXX Well, those properties are defined to match available
@@ -29,6 +29,9 @@ class CorrCoef(FeaturewiseMeasure):
     is_trained = True
     """Indicate that this measure is always trained."""
 
+    is_univariate = True
+    """Features are processed independently of each other."""
+
     def __init__(self, pvalue=False, attr='targets', **kwargs):
         """Initialize
 
@@ -15,6 +15,7 @@ import numpy as np
 from mvpa.measures.base import FeaturewiseMeasure
 from mvpa.base.state import ConditionalAttribute
 from mvpa.datasets.base import Dataset
+from mvpa.misc.support import get_design_svd
 
 class GLM(FeaturewiseMeasure):
     """General linear model (GLM).
@@ -38,6 +39,9 @@ class GLM(FeaturewiseMeasure):
     is_trained = True
     """Indicate that this measure is always trained."""
 
+    is_univariate = True
+    """Features are processed independently of each other."""
+
     def __init__(self, design, voi='pe', **kwargs):
         """
         Parameters
@@ -51,7 +55,7 @@ class GLM(FeaturewiseMeasure):
         """
         FeaturewiseMeasure.__init__(self, **kwargs)
         # store the design matrix as a such (no copying if already array)
-        self._design = np.asmatrix(design)
+        self._design = np.asarray(design)
 
         # what should be computed ('variable of interest')
         if not voi in ['pe', 'zstat']:
@@ -62,9 +66,9 @@ class GLM(FeaturewiseMeasure):
         # will store the precomputed Moore-Penrose pseudo-inverse of the
         # design matrix (lazy calculation)
         self._inv_design = None
-        # also store the inverse of the inner product for beta variance
-        # estimation
-        self._inv_ip = None
+        # also store the diagonal of the inverse of the inner product for beta
+        # variance estimation
+        self._inv_ip_diag = None
 
 
     def _call(self, dataset):
@@ -73,20 +77,22 @@ class GLM(FeaturewiseMeasure):
 
         # precompute transformation is not yet done
         if self._inv_design is None:
-            self._inv_ip = (X.T * X).I
-            self._inv_design = self._inv_ip * X.T
+            # the factorization is shared among all GLMs with the same design
+            U, s, Vt = get_design_svd(X)
+            self._inv_design = np.dot(Vt.T / s, U.T)
+            self._inv_ip_diag = np.sum((Vt / s[:, None]) ** 2, axis=0)
 
         # get parameter estimations for all features at once
         # (betas x features)
-        betas = self._inv_design * dataset.samples
+        betas = np.dot(self._inv_design, dataset.samples)
 
         # charge state
-        self.ca.pe = pe = betas.T.A
+        self.ca.pe = pe = betas.T
 
         # if betas and no z-stats are desired return them right away
         if not self._voi == 'pe' or self.ca.is_enabled('zstat'):
             # compute residuals
-            residuals = X * betas
+            residuals = np.dot(X, betas)
             residuals -= dataset.samples
 
             # estimates of the parameter variance and compute zstats
@@ -94,9 +100,9 @@ class GLM(FeaturewiseMeasure):
             # XXX next lines ignore off-diagonal elements and hence covariance
             # between regressors. The humble being writing these lines asks the
             # god of statistics for forgives, because it knows not what it does
-            diag_ip = np.diag(self._inv_ip)
+            diag_ip = self._inv_ip_diag
             # (features x betas)
-            beta_vars = np.array([ r.var() * diag_ip for r in residuals.T ])
+            beta_vars = residuals.var(axis=0)[:, None] * diag_ip
             # (parameter x feature)
             zstat = pe / np.sqrt(beta_vars)
 
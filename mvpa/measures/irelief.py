@@ -21,12 +21,78 @@ import numpy as np
 from mvpa.datasets import Dataset
 from mvpa.measures.base import FeaturewiseMeasure
 from mvpa.kernels.np import ExponentialKernel
-from mvpa.clfs.distance import pnorm_w
 
 if __debug__:
     from mvpa.base import debug
 
 
+def _irelief_margin(samples, labels, kernel_rows, blocksize=None):
+    """Average margin vector of all samples for batch I-RELIEF.
+
+    For every sample the probabilities of all other samples to be its
+    nearest miss or nearest hit are obtained by normalizing the kernel
+    values row-wise over the misses and hits, which are selected by
+    boolean masks.  Margins of all samples are then accumulated with a
+    single reduction over the absolute sample differences.  The latter
+    take (#samples x #features) memory per sample, hence samples are
+    processed in blocks.
+
+    Parameters
+    ----------
+    samples : array (#samples x #features)
+    labels : array
+      Class labels of the samples.
+    kernel_rows : callable
+      Called with the ids of a block of samples and the absolute differences
+      between those and all samples (#block x #samples x #features). Has to
+      return the kernel values for the block (#block x #samples) with zeros
+      for zero distances.
+    blocksize : int or None
+      Number of samples to process at once. By default it is chosen so that
+      the absolute differences of a block occupy roughly 32MB.
+
+    Returns
+    -------
+    array (#features)
+    """
+    NS, NF = samples.shape[:2]
+    labels = np.asanyarray(labels)
+    if blocksize is None:
+        blocksize = max(1, 2 ** 22 / (NS * NF))
+
+    ni = np.zeros(NF, 'd')
+    olderr = np.seterr(divide='ignore', invalid='ignore')
+    try:
+        for start in xrange(0, NS, blocksize):
+            ids = np.arange(start, min(start + blocksize, NS))
+            nids = len(ids)
+            absdiff = np.abs(samples[ids, None, :] - samples[None])
+            d_w_k = kernel_rows(ids, absdiff)
+
+            misses = labels[ids, None] != labels[None]
+            hits = ~misses
+            hits[np.arange(nids), ids] = False
+            # There must be at least two examples for each class label
+            assert(hits.any(axis=1).all())
+
+            d_w_k_M = d_w_k * misses
+            d_w_k_H = d_w_k * hits
+            d_w_k_M_sum = d_w_k_M.sum(axis=1)
+            # d_w_k[n, n] could be omitted since == 0.0
+            gamma = 1.0 - np.nan_to_num(
+                d_w_k_M_sum / (d_w_k.sum(axis=1) - d_w_k[np.arange(nids), ids]))
+            alpha = np.nan_to_num(d_w_k_M / d_w_k_M_sum[:, None])
+            beta = np.nan_to_num(d_w_k_H / d_w_k_H.sum(axis=1)[:, None])
+
+            # sum over n of gamma_n * (m_n - h_n)
+            coef = gamma[:, None] * (alpha - beta)
+            ni += np.dot(coef.ravel(), absdiff.reshape(-1, NF))
+    finally:
+        np.seterr(**olderr)
+
+    return ni / NS
+
+
 class IterativeRelief_Devel(FeaturewiseMeasure):
     """`FeaturewiseMeasure` that performs multivariate I-RELIEF
     algorithm. Batch version allowing various kernels.
@@ -102,8 +168,6 @@ class IterativeRelief_Devel(FeaturewiseMeasure):
         # do normalization in all cases to be safe :)
         self.w = self.w/(self.w**2).sum()
 
-        M, H = self.compute_M_H(dataset.targets)
-
         while True:
             self.k = self.kernel(length_scale = self.kernel_width/self.w)
             d_w_k = self.k.computed(samples).as_raw_np()
@@ -112,20 +176,8 @@ class IterativeRelief_Devel(FeaturewiseMeasure):
             # XXX Note that kernel==1 for distance=0 only for
             # exponential kernels!!  IMPROVE
             d_w_k[np.abs(d_w_k-1.0) < 1.0e-15] = 0.0
-            ni = np.zeros(NF, 'd')
-            for n in range(NS):
-                # d_w_k[n,n] could be omitted since == 0.0
-                gamma_n = 1.0 - np.nan_to_num(d_w_k[n, M[n]].sum() \
-                                / (d_w_k[n, :].sum()-d_w_k[n, n]))
-                alpha_n = np.nan_to_num(d_w_k[n, M[n]]/(d_w_k[n, M[n]].sum()))
-                beta_n = np.nan_to_num(d_w_k[n, H[n]]/(d_w_k[n, H[n]].sum()))
-
-                m_n = (np.abs(samples[n, :] - samples[M[n], :]) \
-                        * alpha_n[:, None]).sum(0)
-                h_n = (np.abs(samples[n, :] - samples[H[n], :]) \
-                        * beta_n[:, None]).sum(0)
-                ni += gamma_n*(m_n-h_n)
-            ni = ni/NS
+            ni = _irelief_margin(samples, dataset.targets,
+                                 lambda ids, absdiff: d_w_k[ids])
 
             ni_plus = np.clip(ni, 0.0, np.inf) # set all negative elements to zero
             w_new = np.nan_to_num(ni_plus/(np.sqrt((ni_plus**2).sum())))
@@ -280,9 +332,16 @@ class IterativeRelief(FeaturewiseMeasure):
     """Indicate that this measure doesn't have to be trained"""
 
     def __init__(self, threshold=1.0e-2, kernel_width=1.0,
-                 w_guess=None, **kwargs):
+                 w_guess=None, blocksize=None, **kwargs):
         """Constructor of the IRELIEF class.
 
+        Parameters
+        ----------
+        blocksize : int or None
+          Number of samples whose margins are computed at once. Memory
+          consumption is proportional to `blocksize` times the number of
+          samples times the number of features. By default it is chosen so
+          that roughly 32MB are used.
         """
         # init base classes first
         FeaturewiseMeasure.__init__(self, **kwargs)
@@ -292,6 +351,7 @@ class IterativeRelief(FeaturewiseMeasure):
         self.w_guess = w_guess
         self.w = None
         self.kernel_width = kernel_width
+        self.blocksize = blocksize
 
 
     def compute_M_H(self, label):
@@ -337,25 +397,13 @@ class IterativeRelief(FeaturewiseMeasure):
 
         w /= (w ** 2).sum() # do normalization in all cases to be safe :)
 
-        M, H = self.compute_M_H(dataset.targets)
-
         while True:
-            d_w_k = self.k(pnorm_w(data1=samples, weight=w, p=1))
-            ni = np.zeros(NF, 'd')
-            for n in range(NS):
-                 # d_w_k[n, n] could be omitted since == 0.0
-                gamma_n = 1.0 - np.nan_to_num(d_w_k[n, M[n]].sum() \
-                                / (d_w_k[n, :].sum() - d_w_k[n, n]))
-                alpha_n = np.nan_to_num(d_w_k[n, M[n]] / (d_w_k[n, M[n]].sum()))
-                beta_n = np.nan_to_num(d_w_k[n, H[n]] / (d_w_k[n, H[n]].sum()))
-
-                m_n = (np.abs(samples[n, :] - samples[M[n], :]) \
-                       * alpha_n[:, None]).sum(0)
-                h_n = (np.abs(samples[n, :] - samples[H[n], :]) \
-                       * beta_n[:, None]).sum(0)
-                ni += gamma_n*(m_n - h_n)
-
-            ni = ni / NS
+            # weighted 1-norm distances are computed from the same absolute
+            # differences that are needed for the margins
+            ni = _irelief_margin(
+                    samples, dataset.targets,
+                    lambda ids, absdiff: self.k(np.dot(absdiff, w)),
+                    blocksize=self.blocksize)
 
             ni_plus = np.clip(ni, 0.0, np.inf) # set all negative elements to zero
             w_new = np.nan_to_num(ni_plus / (np.sqrt((ni_plus**2).sum())))
@@ -15,10 +15,10 @@ __docformat__ = 'restructuredtext'
 if __debug__:
     from mvpa.base import debug
 
-from mvpa.support.copy import deepcopy
-
 import numpy as np
 
+from mvpa.base import externals
+
 from mvpa.measures.base import FeaturewiseMeasure
 from mvpa.datasets.base import Dataset
 
@@ -44,7 +44,11 @@ class NoisePerturbationSensitivity(FeaturewiseMeasure):
     """Indicate that this measure is always trained."""
 
     def __init__(self, datameasure,
-                 noise=np.random.normal):
+                 noise=np.random.normal,
+                 groupsize=1,
+                 nrepetitions=1,
+                 univariate=False,
+                 nproc=1):
         """
         Parameters
         ----------
@@ -55,15 +59,53 @@ class NoisePerturbationSensitivity(FeaturewiseMeasure):
           of n values when called the `size=n` keyword argument. This is the
           default interface of the random number generators in NumPy's
           `random` module.
+        groupsize : int
+          Number of features that are perturbed simultaneously. If larger
+          than one, features are randomly assigned to groups, and the
+          sensitivity of a feature is the mean effect of perturbing the
+          groups it was part of. This reduces the number of measure
+          evaluations by this factor.
+        nrepetitions : int
+          Number of random group assignments to average across. Only
+          meaningful if `groupsize` is larger than one.
+        univariate : bool
+          If True, all features are perturbed at once and the measure is
+          evaluated only a single time. This requires a univariate measure
+          (see `Measure.is_univariate`) without a postproc. Note, that in
+          this case only the effect of each feature on its own value of the
+          measure is returned, hence the sensitivity map has the shape of the
+          measure's output, instead of containing the effects on all its
+          values.
+        nproc : None or int
+          How many processes to use for evaluating the perturbed datasets.
+          Requires `pprocess` external module.  If None -- all available
+          cores will be used.
         """
         # init base classes first
         FeaturewiseMeasure.__init__(self)
 
+        if groupsize < 1:
+            raise ValueError("groupsize must be at least 1 (got %s)"
+                             % groupsize)
+        if univariate and not (datameasure.is_univariate
+                               and datameasure.get_postproc() is None):
+            raise ValueError("univariate perturbation requires a univariate "
+                             "measure without postproc (got %s)"
+                             % datameasure)
+        externals.check_nproc(nproc, 'noise perturbation')
+
         self.__datameasure = datameasure
         self.__noise = noise
+        self.__groupsize = groupsize
+        self.__nrepetitions = nrepetitions
+        self.__univariate = univariate
+        self.nproc = nproc
 
 
     def _call(self, dataset):
+        # local binding
+        datameasure = self.__datameasure
+
         # first cast to floating point dtype, because noise is most likely
         # floating point as well and '+=' on int would not do the right thing
         if not np.issubdtype(dataset.samples.dtype, np.float):
@@ -71,47 +113,119 @@ class NoisePerturbationSensitivity(FeaturewiseMeasure):
             ds.samples = dataset.samples.astype('float32')
             dataset = ds
 
-        if __debug__:
-            nfeatures = dataset.nfeatures
-
-        # using a list here, to be able to handle output of unknown
-        # dimensionality
-        sens_map = []
+        nfeatures = dataset.nfeatures
 
         # compute the datameasure on the original dataset
         # this is used as a baseline
-        orig_measure = self.__datameasure(dataset)
+        orig_measure = datameasure(dataset)
 
-        # do for every _single_ feature in the dataset
-        for feature in xrange(dataset.nfeatures):
+        if self.__univariate:
+            # perturbing a feature has an effect on the respective feature of
+            # the result only -- a single evaluation with all features
+            # perturbed at once yields the full sensitivity map
             if __debug__:
-                debug('PSA', "Analyzing %i features: %i [%i%%]" \
-                    % (nfeatures,
-                       feature+1,
-                       float(feature+1)/nfeatures*100,), cr=True)
+                debug('PSA', "Perturbing all %i features at once for "
+                             "univariate %s" % (nfeatures, datameasure))
+            perturbed = dataset.copy(deep=False)
+            perturbed.samples = dataset.samples \
+                    + self._get_noise((len(dataset), nfeatures))
+            perturbed_measure = datameasure(perturbed)
+            return Dataset(perturbed_measure.samples - orig_measure.samples)
+
+        # feature groups to be perturbed together
+        if self.__groupsize == 1:
+            groups = [[f] for f in xrange(nfeatures)]
+        else:
+            groups = []
+            for r in xrange(self.__nrepetitions):
+                perm = np.random.permutation(nfeatures)
+                groups += [perm[i:i + self.__groupsize]
+                           for i in xrange(0, nfeatures, self.__groupsize)]
+
+        nproc = externals.get_nproc(self.nproc)
+        if nproc > 1 and len(groups) > 1:
+            import pprocess
+            blocks = np.array_split(np.arange(len(groups)),
+                                    min(nproc, len(groups)))
+            p_results = pprocess.Map(limit=len(blocks))
+            compute = p_results.manage(pprocess.MakeParallel(self._proc_block))
+            for block in blocks:
+                # every process needs its own random seed, otherwise all would
+                # generate identical noise
+                compute([groups[i] for i in block], dataset,
+                        np.random.randint(2 ** 30))
+            # pprocess.Map yields results in the order of submission
+            perturbed_measures = []
+            for r in p_results:
+                perturbed_measures += r
+        else:
+            perturbed_measures = self._proc_block(groups, dataset)
+
+        # difference from original datameasure is sensitivity, averaged across
+        # all groups a feature was part of
+        sens_map = np.zeros((nfeatures,) + orig_measure.shape)
+        counts = np.zeros(nfeatures)
+        for group, perturbed in zip(groups, perturbed_measures):
+            sens_map[group] += perturbed - orig_measure.samples
+            counts[group] += 1
+        sens_map /= counts.reshape((-1,) + (1,) * len(orig_measure.shape))
+
+        if sens_map.shape[-1] == 1:
+            # scalar measure (per sample): as many sensitivity maps as there
+            # are samples in the measure
+            sens_map = sens_map[..., 0].T
+        else:
+            # get rid of unnecessary axes -- ideally yielding 2D array
+            sens_map = sens_map.squeeze()
+            # swap first to axis: we have nfeatures on first but want it as
+            # second in a dataset
+            sens_map = np.swapaxes(sens_map, 0, 1)
+        return Dataset(sens_map)
+
+
+    def _get_noise(self, shape):
+        """Noise of a particular shape using the 1d noise generator"""
+        return np.reshape(self.__noise(size=np.prod(shape)), shape)
 
-            # store current feature to restore it later on
-            current_feature = dataset.samples[:, feature].copy()
 
-            # add noise to current feature
-            dataset.samples[:, feature] += self.__noise(size=len(dataset))
+    def _proc_block(self, groups, dataset, seed=None):
+        """Compute the datameasure for each group of features perturbed
+
+        Returns the list of samples of the perturbed measures.
+        """
+        if seed is not None:
+            np.random.seed(seed)
+        samples = dataset.samples
+        ngroups = len(groups)
+        results = []
+        for i, group in enumerate(groups):
+            if __debug__:
+                debug('PSA', "Analyzing %i feature groups: %i [%i%%]" \
+                    % (ngroups, i + 1, float(i + 1) / ngroups * 100,),
+                      cr=True)
+
+            # store current features to restore them later on
+            current_features = samples[:, group]
+
+            # add noise to current features
+            samples[:, group] = current_features \
+                    + self._get_noise((len(samples), len(group)))
 
             # compute the datameasure on the perturbed dataset
             perturbed_measure = self.__datameasure(dataset)
 
-            # restore the current feature
-            dataset.samples[:, feature] = current_feature
+            # restore the current features
+            samples[:, group] = current_features
 
-            # difference from original datameasure is sensitivity
-            sens_map.append(perturbed_measure.samples - orig_measure.samples)
+            results.append(perturbed_measure.samples)
 
         if __debug__:
             debug('PSA', '')
 
-        # turn into an array and get rid of unnecessary axes -- ideally yielding
-        # 2D array
-        sens_map = np.array(sens_map).squeeze()
-        # swap first to axis: we have nfeatures on first but want it as second
-        # in a dataset
-        sens_map = np.swapaxes(sens_map, 0, 1)
-        return Dataset(sens_map)
+        return results
+
+
+    datameasure = property(fget=lambda self: self.__datameasure)
+    noise = property(fget=lambda self: self.__noise)
+    groupsize = property(fget=lambda self: self.__groupsize)
+    nrepetitions = property(fget=lambda self: self.__nrepetitions)
@@ -0,0 +1,254 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the PyMVPA package for the
+#   copyright and license terms.
+#
+### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""An efficient implementation of searchlight for ridge regression.
+"""
+
+__docformat__ = 'restructuredtext'
+
+import numpy as np
+
+from mvpa.datasets.base import Dataset
+from mvpa.misc.errorfx import rms_error
+from mvpa.measures.searchlight import BaseSearchlight
+from mvpa.base import externals
+from mvpa.base.dochelpers import borrowkwargs, _repr_attrs
+from mvpa.generators.splitters import Splitter
+
+from mvpa.misc.neighborhood import IndexQueryEngine, Sphere
+
+if __debug__:
+    from mvpa.base import debug
+    import time as time
+
+__all__ = [ "RidgeSearchlight", 'sphere_ridgesearchlight' ]
+
+
+def _stacked_solve(a, b):
+    """Solve a stack of linear systems a[i] x[i] = b[i]
+    """
+    if externals.versions['numpy'] >= '1.8.0':
+        # solve() operates on stacks of matrices
+        return np.linalg.solve(a, b[..., None])[..., 0]
+    return np.array([np.linalg.solve(a_, b_) for a_, b_ in zip(a, b)])
+
+
+class RidgeSearchlight(BaseSearchlight):
+    """Efficient implementation of ridge regression `Searchlight`.
+
+    Ridge regression has a closed-form solution that, in its dual
+    formulation, depends on the data only via the Gram matrix of the
+    samples, i.e. the sum of per-feature outer products of the samples.
+    Instead of training and testing a fresh
+    :class:`~mvpa.clfs.ridge.RidgeReg` for every single ROI and every split,
+    this implementation computes the Gram matrices of a whole block of ROIs
+    at once, and then solves all of them for every split with batched linear
+    algebra.
+
+    Results are identical to those of a generic
+    :class:`~mvpa.measures.searchlight.Searchlight` running a
+    `CrossValidation` of `RidgeReg` with the same generator and error
+    function.
+    """
+
+    _ATTRIBUTE_COLLECTIONS = ['params', 'ca']
+
+    @borrowkwargs(BaseSearchlight, '__init__')
+    def __init__(self, ridge, generator, qe, errorfx=rms_error,
+                 roi_blocksize=None, **kwargs):
+        """Initialize a RidgeSearchlight
+
+        Parameters
+        ----------
+        ridge : `RidgeReg`
+          `RidgeReg` regression as the specification of what parameters
+          (penalty and target attribute) to use. Instance itself isn't used.
+        generator : `Generator`
+          Some `Generator` to prepare partitions for cross-validation.
+        errorfx : func, optional
+          Functor that computes a scalar error value from the vectors of
+          desired and predicted values (e.g. subclass of `ErrorFunction`).
+        roi_blocksize : int or None, optional
+          Number of ROIs to process at once. By default it is chosen so that
+          the Gram matrices of a block occupy roughly 32MB.
+        """
+        # init base class first
+        BaseSearchlight.__init__(self, qe, **kwargs)
+
+        self._errorfx = errorfx
+        self._generator = generator
+        self._ridge = ridge
+        self._roi_blocksize = roi_blocksize
+
+        if not self.nproc in (None, 1):
+            raise NotImplementedError, "For now only nproc=1 (or None for " \
+                  "autodetection) is supported by RidgeSearchlight"
+
+    def __repr__(self, prefixes=[]):
+        return super(RidgeSearchlight, self).__repr__(
+            prefixes=prefixes
+            + _repr_attrs(self, ['ridge', 'generator'])
+            + _repr_attrs(self, ['errorfx'], default=rms_error)
+            + _repr_attrs(self, ['roi_blocksize'])
+            )
+
+    def _sl_call(self, dataset, roi_ids, nproc):
+        """Call to RidgeSearchlight
+        """
+        # Local bindings
+        ridge = self.ridge
+        generator = self.generator
+        errorfx = self.errorfx
+        qe = self.queryengine
+        lm = ridge.lm
+
+        if __debug__:
+            time_start = time.time()
+
+        X = dataset.samples
+        if len(X.shape) != 2:
+            raise ValueError, \
+                  'RidgeSearchlight (for now) operates on already ' \
+                  'flattened datasets'
+        targets = np.asanyarray(dataset.sa[ridge.get_space()].value,
+                                dtype='float')
+        nsamples, nfeatures = X.shape
+        nrois = len(roi_ids)
+
+        # 1. Query generator for the splits we will have
+        if __debug__:
+            debug('SLC',
+                  'Phase 1. Initializing partitions using %s on %s'
+                  % (generator, dataset))
+        dataset_indicies = Dataset(np.arange(nsamples), sa=dataset.sa)
+        splitter = Splitter(attr=generator.get_space())
+        splits = [[s.samples[:, 0] for s in splitter.generate(ds_)][:2]
+                  for ds_ in generator.generate(dataset_indicies)]
+        nsplits = len(splits)
+
+        # 2. Deduce all neighbors
+        if __debug__:
+            debug('SLC',
+                  'Phase 2. Deducing neighbors information for %i ROIs'
+                  % (nrois,))
+        roi_fids = [qe.query_byid(f) for f in roi_ids]
+        roi_nfids = np.array([len(x) for x in roi_fids])
+        # makes sense to waste precious ms only if ca is enabled
+        if self.ca.is_enabled('roi_sizes'):
+            roi_sizes = list(roi_nfids)
+        else:
+            roi_sizes = []
+
+        # zero feature to pad ROIs of unequal size with
+        Xpad = np.hstack((X, np.zeros((nsamples, 1), dtype=X.dtype)))
+
+        blocksize = self._roi_blocksize
+        if blocksize is None:
+            blocksize = max(1, 2 ** 22 / (nsamples * nsamples))
+
+        results = np.zeros((nsplits, nrois))
+
+        # 3. Major loop over blocks of ROIs
+        if __debug__:
+            debug('SLC', 'Phase 3. Major loop over blocks of %i ROIs'
+                  % blocksize)
+        for start in xrange(0, nrois, blocksize):
+            block = slice(start, start + blocksize)
+            block_fids = roi_fids[block]
+            nblock = len(block_fids)
+            maxsize = roi_nfids[block].max()
+            # padded feature ids (nblock x maxsize)
+            fids = np.empty((nblock, maxsize), dtype='int')
+            fids.fill(nfeatures)
+            for i, f in enumerate(block_fids):
+                fids[i, :len(f)] = f
+            # Gram matrices of all ROIs in the block (nblock x nsamples x
+            # nsamples), i.e. sums of outer products of each ROI feature
+            Xr = Xpad[:, fids]
+            K = np.einsum('ibf,jbf->bij', Xr, Xr)
+            del Xr
+            # same penalty as RidgeReg, which appends lambda*I to the data,
+            # hence penalizes with the squared lambda
+            if lm is None:
+                lms = (.05 * roi_nfids[block]) ** 2
+            else:
+                lms = np.repeat(float(lm) ** 2, nblock)
+
+            for isplit, (train, test) in enumerate(splits):
+                # RidgeReg has an intercept that is not penalized, which
+                # amounts to centering the data within the training portion
+                Ktt = K[:, train][:, :, train]
+                Ket = K[:, test][:, :, train]
+                mt = Ktt.mean(axis=2)
+                mgrand = mt.mean(axis=1)[:, None, None]
+                Ktt -= mt[:, :, None]
+                Ktt -= mt[:, None, :]
+                Ktt += mgrand
+                Ket -= Ket.mean(axis=2)[:, :, None]
+                Ket -= mt[:, None, :]
+                Ket += mgrand
+
+                ttargets = targets[train]
+                tmean = ttargets.mean()
+                diag = np.arange(len(train))
+                Ktt[:, diag, diag] += lms[:, None]
+                alpha = _stacked_solve(
+                            Ktt, np.repeat((ttargets - tmean)[None],
+                                           nblock, axis=0))
+                # predictions for the testing portion (nblock x ntest)
+                predictions = (Ket * alpha[:, None, :]).sum(axis=2) + tmean
+
+                ptargets = targets[test]
+                for i, p in enumerate(predictions):
+                    results[isplit, start + i] = errorfx(p, ptargets)
+
+            if __debug__:
+                debug('SLC', "Doing %i ROIs: %i [%i%%]" \
+                      % (nrois, start + nblock,
+                         float(start + nblock) / nrois * 100,), cr=True)
+
+        if __debug__:
+            debug('SLC', "RidgeSearchlight is done in %.3g sec" %
+                  (time.time() - time_start))
+
+        return Dataset(results), roi_sizes
+
+    ridge = property(fget=lambda self: self._ridge)
+    generator = property(fget=lambda self: self._generator)
+    errorfx = property(fget=lambda self: self._errorfx)
+    roi_blocksize = property(fget=lambda self: self._roi_blocksize)
+
+@borrowkwargs(RidgeSearchlight, '__init__', exclude=['roi_ids'])
+def sphere_ridgesearchlight(ridge, generator, radius=1, center_ids=None,
+                            space='voxel_indices', *args, **kwargs):
+    """Creates a `RidgeSearchlight` to assess :term:`cross-validation`
+    regression performance of ridge regression on all possible spheres of a
+    certain size within a dataset.
+
+    Parameters
+    ----------
+    radius : float
+      All features within this radius around the center will be part
+      of a sphere.
+    center_ids : list of int
+      List of feature ids (not coordinates) the shall serve as sphere
+      centers. By default all features will be used (it is passed
+      roi_ids argument for Searchlight).
+    space : str
+      Name of a feature attribute of the input dataset that defines the spatial
+      coordinates of all features.
+    **kwargs
+      In addition this class supports all keyword arguments of
+      :class:`~mvpa.measures.ridgesearchlight.RidgeSearchlight`.
+    """
+    # build a matching query engine from the arguments
+    kwa = {space: Sphere(radius)}
+    qe = IndexQueryEngine(**kwa)
+    # init the searchlight with the queryengine
+    return RidgeSearchlight(ridge, generator, qe,
+                            roi_ids=center_ids, *args, **kwargs)
@@ -15,7 +15,7 @@ if __debug__:
 
 import numpy as np
 
-from mvpa.base import externals, warning
+from mvpa.base import externals, profiler
 from mvpa.base.dochelpers import borrowkwargs, _repr_attrs
 
 from mvpa.datasets import hstack
@@ -62,11 +62,7 @@ class BaseSearchlight(Measure):
       """
         Measure.__init__(self, **kwargs)
 
-        if nproc > 1 and not externals.exists('pprocess'):
-            raise RuntimeError("The 'pprocess' module is required for "
-                               "multiprocess searchlights. Please either "
-                               "install python-pprocess, or reduce `nproc` "
-                               "to 1 (got nproc=%i)" % nproc)
+        externals.check_nproc(nproc, 'searchlights')
 
         self._queryengine = queryengine
         if roi_ids is not None and not isinstance(roi_ids, str) \
@@ -91,17 +87,7 @@ class BaseSearchlight(Measure):
         """Perform the ROI search.
         """
         # local binding
-        nproc = self.nproc
-
-        if nproc is None and externals.exists('pprocess'):
-            import pprocess
-            try:
-                nproc = pprocess.get_number_of_cores() or 1
-            except AttributeError:
-                warning("pprocess version %s has no API to figure out maximal "
-                        "number of cores. Using 1"
-                        % externals.versions['pprocess'])
-                nproc = 1
+        nproc = externals.get_nproc(self.nproc)
         # train the queryengine
         self._queryengine.train(dataset)
 
@@ -265,6 +251,7 @@ class Searchlight(BaseSearchlight):
             debug_slc_ = 'SLC_' in debug.active
             debug('SLC',
                   "Starting computing block for %i elements" % len(block))
+        ptoken = profiler.active and profiler.start(self, '_proc_block')
         if self.ca.is_enabled('roi_sizes'):
             roi_sizes = []
         else:
@@ -303,6 +290,9 @@ class Searchlight(BaseSearchlight):
                        roi.nfeatures,
                        float(i+1)/len(block)*100,), cr=True)
 
+        if ptoken:
+            profiler.stop(ptoken)
+            profiler.count('%s.rois' % self.__class__.__name__, len(block))
         return results, roi_sizes
 
     datameasure = property(fget=lambda self: self.__datameasure)
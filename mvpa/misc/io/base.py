@@ -11,6 +11,7 @@ disk."""
 
 __docformat__ = 'restructuredtext'
 
+import os
 import numpy as np
 import mvpa.support.copy as copy
 from mvpa.base.dochelpers import enhanced_doc_string
@@ -27,6 +28,94 @@ __all__ = ['DataReader', 'ColumnData', 'SampleAttributes',
            'TuebingenMEGSensorLocations',
            'labels2chunks', 'design2labels']
 
+def _load_cache(source, key):
+    """Load arrays from the binary sidecar cache of a source file.
+
+    Parameters
+    ----------
+    source : str
+      Filename of the source.
+    key : str
+      Description of how the source was parsed. The cache is only used if
+      it matches.
+
+    Returns
+    -------
+    dict or None
+      Arrays stored in the cache, or None if there is no cache or it is
+      outdated, i.e. size or modification time of the source have changed.
+    """
+    cachefile = source + '.npz'
+    if not os.path.exists(cachefile):
+        return None
+    stat = os.stat(source)
+    try:
+        cache = np.load(cachefile)
+        arrays = dict([(k, cache[k]) for k in cache.files])
+        cache.close()
+    except Exception, e:
+        warning("Failed to read cache file %s (%s). Ignoring it."
+                % (cachefile, e))
+        return None
+    if not list(arrays.pop('__stamp__', [])) \
+           == [repr(stat.st_mtime), str(stat.st_size), key]:
+        if __debug__:
+            debug("IOH", "Cache file %s is outdated" % cachefile)
+        return None
+    if __debug__:
+        debug("IOH", "Loaded %s from cache file %s" % (source, cachefile))
+    return arrays
+
+
+def _save_cache(source, key, **arrays):
+    """Store arrays in the binary sidecar cache of a source file.
+
+    Failures to write the cache (e.g. read-only location) only cause a
+    warning.
+
+    Parameters
+    ----------
+    source : str
+      Filename of the source.
+    key : str
+      Description of how the source was parsed.
+    **arrays
+      Arrays to be stored.
+    """
+    cachefile = source + '.npz'
+    stat = os.stat(source)
+    arrays['__stamp__'] = np.array([repr(stat.st_mtime),
+                                    str(stat.st_size), key])
+    try:
+        np.savez(cachefile, **arrays)
+    except (IOError, OSError), e:
+        warning("Failed to write cache file %s (%s)." % (cachefile, e))
+
+
+def _convert_column(values, dtype):
+    """Convert a sequence of strings into a list of values of some type.
+
+    Values that cannot be converted are left as they are.
+    """
+    if dtype is None or dtype is str:
+        # nothing to convert
+        return list(values)
+    try:
+        return map(dtype, values)
+    except ValueError:
+        # handle them one by one below to keep what can't be converted
+        pass
+    converted = []
+    for v in values:
+        try:
+            v = dtype(v)
+        except ValueError:
+            warning("Can't convert %r to desired datatype %r." %
+                    (v, dtype) + " Leaving original type")
+        converted.append(v)
+    return converted
+
+
 class DataReader(object):
     """Base class for data readers.
 
@@ -78,7 +167,7 @@ class ColumnData(dict):
     name in the header! Each column is stored as a list in the dictionary.
     """
     def __init__(self, source, header=True, sep=None, headersep=None,
-                 dtype=float, skiplines=0):
+                 dtype=float, skiplines=0, cache=False):
         """Read data from file into a dictionary.
 
         Parameters
@@ -106,6 +195,11 @@ class ColumnData(dict):
           passing a list of types.
         skiplines : int
           Number of lines to skip at the beginning of the file.
+        cache : bool
+          If True, the parsed data is stored in a binary sidecar file
+          (source filename with '.npz' suffix) on first load, and read from
+          it as long as size and modification time of the source file do
+          not change.
         """
         # init base class
         dict.__init__(self)
@@ -115,7 +209,7 @@ class ColumnData(dict):
 
         if isinstance(source, str):
             self._from_file(source, header=header, sep=sep, headersep=headersep,
-                           dtype=dtype, skiplines=skiplines)
+                           dtype=dtype, skiplines=skiplines, cache=cache)
 
         elif isinstance(source, dict):
             for k, v in source.iteritems():
@@ -205,16 +299,27 @@ class ColumnData(dict):
 
 
     def _from_file(self, filename, header, sep, headersep,
-                   dtype, skiplines):
+                   dtype, skiplines, cache=False):
         """Loads column data from file -- clears object first.
         """
         # make a clean table
         self.clear()
 
-        file_ = open(filename, 'r')
-
         self._header_order = None
 
+        if cache:
+            key = repr((header, sep, headersep, dtype, skiplines))
+            cached = _load_cache(filename, key)
+            if not cached is None:
+                hdr = cached['header'].tolist()
+                if header == True:
+                    self._header_order = hdr
+                for i, v in enumerate(hdr):
+                    self[v] = cached['column%i' % i].tolist()
+                return
+
+        file_ = open(filename, 'r')
+
         [ file_.readline() for x in range(skiplines) ]
         """Simply skip some lines"""
         # make column names, either take header or generate
@@ -232,46 +337,59 @@ class ColumnData(dict):
             file_.seek(0)
             [ file_.readline() for x in range(skiplines) ]
 
-
-        # string in lists: one per column
-        tbl = [ [] for i in xrange(len(hdr)) ]
-
         # do per column dtypes
         if not isinstance(dtype, list):
             dtype = [dtype] * len(hdr)
 
-        # parse line by line and feed into the lists
-        for line in file_:
-            # get rid of leading and trailing whitespace
-            line = line.strip()
-            # ignore empty lines and comment lines
-            if not line or line.startswith('#'):
+        ncols = len(hdr)
+        tbl = [[] for i in xrange(ncols)]
+        # read and convert the remaining lines in chunks of roughly 1MB, so
+        # the raw text of a large file is never held in memory at once
+        while True:
+            lines = file_.readlines(2 ** 20)
+            if not len(lines):
+                break
+            # get rid of leading and trailing whitespace, and ignore empty
+            # lines and comment lines
+            lines = [l.strip() for l in lines]
+            lines = [l for l in lines if l and not l.startswith('#')]
+            if not len(lines):
                 continue
-            l = line.split(sep)
-
-            if not len(l) == len(hdr):
-                raise RuntimeError, \
-                      "Number of entries in line [%i] does not match number " \
-                      "of columns in header [%i]." % (len(l), len(hdr))
-
-            for i, v in enumerate(l):
-                if not dtype[i] is None:
-                    try:
-                        v = dtype[i](v)
-                    except ValueError:
-                        warning("Can't convert %r to desired datatype %r." %
-                                (v, dtype) + " Leaving original type")
-                tbl[i].append(v)
-
-        # check
-        if not len(tbl) == len(hdr):
-            raise RuntimeError, "Number of columns read from file does not " \
-                                "match the number of header entries."
+
+            # split all lines at once -- as long as all have the same number
+            # of entries, columns are just strided slices of all entries
+            if sep is None:
+                entries = ' '.join(lines).split()
+            else:
+                entries = sep.join(lines).split(sep)
+            if len(entries) != ncols * len(lines):
+                # find the offending line
+                for l in lines:
+                    nentries = len(l.split(sep))
+                    if nentries != ncols:
+                        file_.close()
+                        raise RuntimeError, \
+                              "Number of entries in line [%i] does not " \
+                              "match number of columns in header [%i]." \
+                              % (nentries, ncols)
+            for i in xrange(ncols):
+                tbl[i] += _convert_column(entries[i::ncols], dtype[i])
+        file_.close()
 
         # fill dict
         for i, v in enumerate(hdr):
             self[v] = tbl[i]
 
+        if cache:
+            columns = {}
+            for i, c in enumerate(tbl):
+                # columns with values of various types have to stay as they are
+                if len(set(map(type, c))) > 1:
+                    columns['column%i' % i] = np.array(c, dtype=object)
+                else:
+                    columns['column%i' % i] = np.array(c)
+            _save_cache(filename, key, header=np.array(hdr), **columns)
+
 
     def __iadd__(self, other):
         """Merge column data.
@@ -13,6 +13,7 @@ __docformat__ = 'restructuredtext'
 import numpy as np
 
 from mvpa.base import externals
+from mvpa.misc.io.base import _load_cache, _save_cache
 
 class TuebingenMEG(object):
     """Reader for MEG data from line-based textfile format.
@@ -42,10 +43,11 @@ class TuebingenMEG(object):
     'Time') in a NumPy array (nsamples x nchannels x ntimepoints).
 
     The reader supports uncompressed as well as gzipped input files (or other
-    file-like objects).
+    file-like objects). Parsing large files takes a while, hence the parsed
+    data can be cached in a binary sidecar file.
     """
 
-    def __init__(self, source):
+    def __init__(self, source, cache=False):
         """Reader MEG data from texfiles or file-like objects.
 
         Parameters
@@ -54,6 +56,11 @@ class TuebingenMEG(object):
           Strings are assumed to be filenames (with `.gz` suffix
           compressed), while all other object types are treated as file-like
           objects.
+        cache : bool
+          If True and `source` is a filename, the parsed data is stored in a
+          binary sidecar file (filename with '.npz' suffix) on first load,
+          and read from it as long as size and modification time of the
+          source file do not change.
         """
         self.ntimepoints = None
         self.timepoints = None
@@ -62,6 +69,15 @@ class TuebingenMEG(object):
         self.data = []
         self.samplingrate = None
 
+        cache = cache and isinstance(source, str)
+        if cache:
+            cached = _load_cache(source, self.__class__.__name__)
+            if not cached is None:
+                self._set_data(cached['data'], cached['timepoints'],
+                               cached['channelids'].tolist())
+                return
+            filename = source
+
         # open textfiles
         if isinstance(source, str):
             if source.endswith('.gz'):
@@ -92,8 +108,6 @@ class TuebingenMEG(object):
                                                dtype=float,
                                                count=self.ntimepoints,
                                                sep='\t')
-                self.samplingrate = self.ntimepoints \
-                    / (self.timepoints[-1] - self.timepoints[0])
             else:
                 # load data
                 self.data.append(
@@ -104,7 +118,24 @@ class TuebingenMEG(object):
 
         # reshape data from (channels x samples x timepoints) to
         # (samples x chanels x timepoints)
-        self.data = np.swapaxes(np.array(self.data), 0, 1)
+        self._set_data(np.swapaxes(np.array(self.data), 0, 1),
+                       self.timepoints, self.channelids)
+
+        if cache:
+            _save_cache(filename, self.__class__.__name__, data=self.data,
+                        timepoints=self.timepoints,
+                        channelids=np.array(self.channelids))
+
+
+    def _set_data(self, data, timepoints, channelids):
+        """Assign data and derive dataset properties from it.
+        """
+        self.data = data
+        self.timepoints = timepoints
+        self.channelids = channelids
+        self.nsamples, nchannels, self.ntimepoints = data.shape
+        self.samplingrate = self.ntimepoints \
+            / (self.timepoints[-1] - self.timepoints[0])
 
 
     def __str__(self):
@@ -12,6 +12,10 @@ import numpy as np
 from numpy import array
 import operator
 import sys
+try:
+    from hashlib import md5
+except ImportError:
+    from md5 import new as md5
 
 from mvpa.base import warning
 from mvpa.base.dochelpers import borrowkwargs, borrowdoc, _repr_attrs, _repr
@@ -551,8 +555,9 @@ class CachedQueryEngine(QueryEngineInterface):
     :func:`query_byid` should be working reliably and without
     surprises.
 
-    :func:`query` relies on hashid of the queries, so there might be a
-    collision! Thus consider it EXPERIMENTAL for now.
+    :func:`query` relies on the content of the queries, so their
+    arguments must be hashable, sequences, or arrays.  Thus consider it
+    EXPERIMENTAL for now.
     """
 
     def __init__(self, queryengine):
@@ -616,9 +621,28 @@ class CachedQueryEngine(QueryEngineInterface):
             self._lookup_ids[fid] = v = self._queryengine.query_byid(fid)
         return v
 
+    @staticmethod
+    def _get_query_key(value):
+        """Stable hashable key for (an argument of) a query
+
+        Sequences are turned into tuples, and arrays are represented by
+        their shape, dtype and a digest of their content.  Ids of the
+        (temporary) arguments cannot be used, since they get reused, and
+        repr() of large arrays is abbreviated.
+        """
+        if isinstance(value, np.ndarray):
+            value = np.ascontiguousarray(value)
+            return (value.shape, value.dtype.str,
+                    md5(value.tostring()).hexdigest())
+        if isinstance(value, list) or isinstance(value, tuple):
+            return tuple([CachedQueryEngine._get_query_key(v)
+                          for v in value])
+        return value
+
+
     @borrowdoc(QueryEngineInterface)
     def query(self, **kwargs):
-        k = idhash_(kwargs.items())
+        k = self._get_query_key(sorted(kwargs.items()))
         v = self._lookup.get(k, None)
         if v is None:
             self._lookup[k] = v = self._queryengine.query(**kwargs)
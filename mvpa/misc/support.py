@@ -159,6 +159,56 @@ def idhash(val):
         pass
     return res
 
+__design_svd_cache = {}
+__design_svd_cache_size = 32
+
+def get_design_svd(design, cache=True):
+    """Cached, rank-revealing SVD of a design matrix.
+
+    Detrending or GLM-fitting many datasets that share the same design (e.g.
+    runs with identical chunk structure) would otherwise repeat the very same
+    factorization over and over again. Results are cached based on the
+    content of the design matrix.
+
+    Parameters
+    ----------
+    design : array (nsamples x nregressors)
+      Design matrix.
+    cache : bool
+      Whether to store/look up the factorization in the cache.
+
+    Returns
+    -------
+    tuple
+      (U, s, Vt) with only those singular values (and vectors) that are
+      non-negligible, i.e. U is an orthonormal basis of the design's column
+      space.
+    """
+    design = np.asarray(design, dtype='float')
+    if cache:
+        key = (design.shape, hash(design.tostring()))
+        if key in __design_svd_cache:
+            cached_design, res = __design_svd_cache[key]
+            # guard against hash collisions
+            if np.all(cached_design == design):
+                return res
+
+    U, s, Vt = np.linalg.svd(design, full_matrices=False)
+    # same tolerance as np.linalg.lstsq (rcond=-1) would use
+    if len(s):
+        nonzero = s > s.max() * max(design.shape) \
+                      * np.finfo(design.dtype).eps
+        U, s, Vt = U[:, nonzero], s[nonzero], Vt[nonzero]
+    res = (U, s, Vt)
+
+    if cache:
+        if len(__design_svd_cache) >= __design_svd_cache_size:
+            # no fancy eviction strategy -- designs rarely change
+            __design_svd_cache.clear()
+        __design_svd_cache[key] = (design.copy(), res)
+    return res
+
+
 ##REF: Name was automagically refactored
 def is_sorted(items):
     """Check if listed items are in sorted order.
@@ -652,9 +702,11 @@ def get_nelements_per_value(data):
     dict with the number of elements (value) per unique value (key) in the
     sequence.
     """
-    if hasattr(data, 'unique'):
-        # if this is an ArrayAttribute save some time by using pre-cached unique
-        # values
+    if hasattr(data, 'counts'):
+        # if this is an ArrayCollectable save some time by using pre-cached
+        # counts of unique values
+        return dict(zip(data.unique, data.counts.tolist()))
+    elif hasattr(data, 'unique'):
         uniquevalues = data.unique
         values = data.value
     else:
@@ -22,6 +22,74 @@ or
 __docformat__ = 'restructuredtext'
 
 
+class _LazyImport(object):
+    """Placeholder for an object provided by a heavy optional module
+
+    The module gets imported only upon the first use (call or attribute
+    access) of the placeholder, which then forwards everything to the
+    actual object.  Since placeholders are not the objects themselves,
+    they cannot be used for subclassing or in `isinstance()` checks --
+    import from the original module for that.
+    """
+
+    def __init__(self, module, name=None, alias=None, deps=None):
+        """
+        Parameters
+        ----------
+        module : str
+          Name of the module to import.
+        name : str, optional
+          Name of the object within the module.  If None, the placeholder
+          stands for the module itself.
+        alias : str, optional
+          Name under which the placeholder is available in mvpa.suite.
+        deps : str or list of str, optional
+          Externals required by the module.  They are verified (see
+          `externals.exists()`) only upon first use as well, as some of
+          the checks are expensive themselves.
+        """
+        self.__module = module
+        self.__name = name
+        self.__alias = alias or name
+        self.__deps = deps
+        self.__obj = None
+
+
+    def _resolve(self):
+        """Import the module and return the actual object"""
+        if self.__obj is None:
+            if self.__deps is not None:
+                externals.exists(self.__deps, raise_=True)
+            obj = __import__(self.__module, globals(), locals(), ['__name__'])
+            if self.__name is not None:
+                obj = getattr(obj, self.__name)
+            self.__obj = obj
+            # subsequent lookups within the suite get the actual object
+            globals()[self.__alias] = obj
+        return self.__obj
+
+
+    def __getattr__(self, key):
+        return getattr(self._resolve(), key)
+
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+
+    def __repr__(self):
+        if self.__obj is not None:
+            return repr(self.__obj)
+        return "<lazy %s>" % '.'.join([x for x in (self.__module, self.__name)
+                                       if x is not None])
+
+
+def _lazy_import(module, names, deps=None):
+    """Bind placeholders for `names` provided by the `module`"""
+    for name in names:
+        globals()[name] = _LazyImport(module, name, deps=deps)
+
+
 from mvpa import *
 
 from mvpa.base import *
@@ -53,15 +121,14 @@ from mvpa.clfs.distance import *
 from mvpa.clfs.base import *
 from mvpa.clfs.meta import *
 from mvpa.clfs.knn import *
-if externals.exists('lars'):
-    from mvpa.clfs.lars import *
-if externals.exists('elasticnet'):
-    from mvpa.clfs.enet import *
-if externals.exists('glmnet'):
-    from mvpa.clfs.glmnet import *
-if externals.exists('skl'):
-    import scikits.learn as skl
-    from mvpa.clfs.skl import *
+# R-based and scikits.learn classifiers are slow to import (and to check
+# for), so they are imported only upon first use
+_lazy_import('mvpa.clfs.lars', ['LARS', 'LARSWeights'], deps='lars')
+_lazy_import('mvpa.clfs.enet', ['ENET', 'ENETWeights'], deps='elasticnet')
+_lazy_import('mvpa.clfs.glmnet', ['GLMNET_R', 'GLMNET_C', 'GLMNETWeights'],
+             deps='glmnet')
+skl = _LazyImport('scikits.learn', alias='skl', deps='skl')
+_lazy_import('mvpa.clfs.skl', ['SKLLearnerAdapter'], deps='skl')
 from mvpa.clfs.smlr import *
 from mvpa.clfs.blr import *
 from mvpa.clfs.gnb import *
@@ -88,8 +155,8 @@ from mvpa.datasets.formats import *
 from mvpa.datasets.miscfx import *
 from mvpa.datasets.eep import *
 from mvpa.datasets.eventrelated import *
-if externals.exists('nibabel') :
-    from mvpa.datasets.mri import *
+_lazy_import('mvpa.datasets.mri', ['fmri_dataset', 'fmri_runs_dataset',
+                                   'map2nifti'], deps='nibabel')
 
 from mvpa.generators.base import *
 from mvpa.generators.partition import *
@@ -119,10 +186,10 @@ from mvpa.mappers.zscore import *
 if externals.exists('scipy'):
     from mvpa.mappers.detrend import *
     from mvpa.mappers.filters import *
-if externals.exists('mdp'):
-    from mvpa.mappers.mdp_adaptor import *
-if externals.exists('mdp ge 2.4'):
-    from mvpa.mappers.lle import *
+_lazy_import('mvpa.mappers.mdp_adaptor', ['MDPNodeMapper', 'PCAMapper',
+                                          'ICAMapper', 'MDPFlowMapper'],
+             deps='mdp')
+_lazy_import('mvpa.mappers.lle', ['LLEMapper'], deps='mdp ge 2.4')
 
 from mvpa import measures
 from mvpa.measures.anova import *
@@ -133,6 +200,7 @@ from mvpa.measures.noiseperturbation import *
 from mvpa.misc.neighborhood import *
 from mvpa.measures.searchlight import *
 from mvpa.measures.gnbsearchlight import *
+from mvpa.measures.ridgesearchlight import *
 from mvpa.measures.corrstability import *
 
 from mvpa.support.copy import *
@@ -154,15 +222,18 @@ from mvpa.misc.bv.base import *
 from mvpa.misc.support import *
 from mvpa.misc.transformers import *
 
-if externals.exists("nibabel"):
-    from mvpa.misc.fsl.melodic import *
+_lazy_import('mvpa.misc.fsl.melodic', ['MelodicResults'], deps='nibabel')
 
-if externals.exists("pylab"):
-    from mvpa.misc.plot import *
-    from mvpa.misc.plot.erp import *
-    if externals.exists(['griddata', 'scipy']):
-        from mvpa.misc.plot.topo import *
-    from mvpa.misc.plot.lightbox import plot_lightbox
+_lazy_import('mvpa.misc.plot',
+             ['plot_err_line', 'plot_feature_hist',
+              'plot_samples_distance', 'plot_decision_boundary_2d',
+              'plot_bars', 'inverse_cmap', 'plot_dataset_chunks',
+              'Pion', 'Pioff'], deps='pylab')
+_lazy_import('mvpa.misc.plot.erp', ['plot_erp', 'plot_erps'], deps='pylab')
+_lazy_import('mvpa.misc.plot.topo', ['plot_head_topography',
+                                     'plot_head_outline'],
+             deps=['pylab', 'griddata', 'scipy'])
+_lazy_import('mvpa.misc.plot.lightbox', ['plot_lightbox'], deps='pylab')
 
 if externals.exists("scipy"):
     from mvpa.support.stats import scipy
@@ -174,14 +245,21 @@ if externals.exists("scipy"):
     from mvpa.clfs.gpr import *
     from mvpa.support.nipy import *
 
-if externals.exists("pywt"):
-    from mvpa.mappers.wavelet import *
-
-if externals.exists("pylab"):
-    import pylab as pl
-
-if externals.exists("lxml") and externals.exists("nibabel"):
-    from mvpa.atlases import *
+_lazy_import('mvpa.mappers.wavelet', ['WaveletPacketMapper',
+                                      'WaveletTransformationMapper'],
+             deps='pywt')
+
+pl = _LazyImport('pylab', alias='pl', deps='pylab')
+
+atlases = _LazyImport('mvpa.atlases', alias='atlases',
+                      deps=['lxml', 'nibabel'])
+_lazy_import('mvpa.atlases', ['Atlas', 'LabelsAtlas', 'ReferencesAtlas',
+                              'FSLProbabilisticAtlas'],
+             deps=['lxml', 'nibabel'])
+# constants and exceptions cannot be provided lazily
+if externals.exists('lxml') and externals.exists('nibabel'):
+    from mvpa.atlases.base import XMLAtlasException
+    from mvpa.atlases.warehouse import KNOWN_ATLASES, KNOWN_ATLAS_FAMILIES
 
 
 if externals.exists("running ipython env"):
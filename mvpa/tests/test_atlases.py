@@ -189,3 +189,111 @@ def test_pymvpa_talairach():
 
     assert_equal(pl['labels'][4]['label'].text, 'None')
     assert_equal(pld['labels'][4]['label'].text, 'Caudate Tail')
+
+
+def test_pymvpa_talairach_bulk():
+    skip_if_no_external('atlas_pymvpa')
+
+    atl = Atlas(name='talairach')
+    atld = Atlas(name='talairach-dist',
+                 reference_level='Closest Gray',
+                 distance=10)
+
+    points = [[-22, -40, 8], [0, -7, 20], [-63, -12, 22]]
+    for a in atl, atld:
+        bulk = a.label_points(points)
+        assert_equal(bulk['labels'].shape, (a.nlevels, len(points)))
+        for i, p in enumerate(points):
+            single = a.label_point(p)
+            assert_array_equal(bulk['voxel_queried'][i],
+                               single['voxel_queried'])
+            for level, index in zip(bulk['levels'], bulk['labels'][:, i]):
+                assert_equal(a.levels[level][index].text,
+                             single['labels'][level]['label'].text)
+            if 'distance' in single:
+                assert_almost_equal(bulk['distance'][i], single['distance'])
+
+    # and voxels directly
+    voxels = atld.label_points(points)['voxel_atlas']
+    assert_array_equal(atld.label_voxels(voxels)['labels'],
+                       atld.label_points(points)['labels'])
+
+
+_SYNTHETIC_ATLAS_HEADER = """<?xml version="1.0" encoding="ISO-8859-1"?>
+<atlas version="pymvpa-1.0">
+  <header>
+    <name>%(name)s</name>
+    <type>%(type)s</type>
+    <space>Talairach</space>
+    <space-flavor>Talairach</space-flavor>
+    %(extra)s
+    <images>
+      <imagefile offset="2,1,1">%(name)s.nii.gz</imagefile>
+    </images>
+  </header>
+  <data>
+%(levels)s
+  </data>
+</atlas>
+"""
+
+def test_synthetic_atlases_bulk():
+    import shutil, tempfile
+    import nibabel
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        shape = (6, 5, 4)
+        # two levels of labels
+        labels = np.random.randint(3, size=shape + (2,)).astype('int16')
+        nibabel.Nifti1Image(labels, np.eye(4)).to_filename(
+            os.path.join(tmpdir, 'labels.nii.gz'))
+        levels = '\n'.join([
+            '<level description="Level %i" index="%i" type="label">' % (l, l)
+            + ''.join(['<label index="%i">L%i-%i</label>' % (i, l, i)
+                       for i in xrange(3)])
+            + '</level>' for l in xrange(2)])
+        open(os.path.join(tmpdir, 'labels.xml'), 'w').write(
+            _SYNTHETIC_ATLAS_HEADER % dict(name='labels', type='Label',
+                                           extra='', levels=levels))
+        # closest referenced voxel for every voxel
+        refs = np.concatenate(
+            [np.random.randint(s, size=shape + (1,)) for s in shape],
+            axis=-1).astype('int16')
+        nibabel.Nifti1Image(refs, np.eye(4)).to_filename(
+            os.path.join(tmpdir, 'refs.nii.gz'))
+        open(os.path.join(tmpdir, 'refs.xml'), 'w').write(
+            _SYNTHETIC_ATLAS_HEADER % dict(
+                name='refs', type='Reference',
+                extra='<reference-atlas>labels.xml</reference-atlas>',
+                levels='<level description="Closest" type="reference" '
+                       'x="0" y="1" z="2"/>'))
+
+        atl = Atlas(filename=os.path.join(tmpdir, 'labels.xml'))
+        atld = Atlas(filename=os.path.join(tmpdir, 'refs.xml'),
+                     reference_level='Closest', distance=2)
+        ok_(isinstance(atl, LabelsAtlas))
+        ok_(isinstance(atld, ReferencesAtlas))
+
+        # points all over the volume and outside of it, also on half-voxels
+        points = np.random.randint(-3, 8, size=(40, 3)) \
+                 + np.random.randint(2, size=(40, 3)) * 0.5
+        for a in atl, atld:
+            bulk = a.label_points(points)
+            assert_equal(bulk['labels'].shape, (a.nlevels, len(points)))
+            for i, p in enumerate(points):
+                single = a.label_point(p)
+                assert_array_equal(bulk['voxel_atlas'][i],
+                                   single['voxel_atlas'])
+                # bulk labeling reports range-checked voxels
+                assert_array_equal(bulk['voxel_queried'][i],
+                                   a._check_range(single['voxel_queried']))
+                for level, index in zip(bulk['levels'],
+                                        bulk['labels'][:, i]):
+                    assert_equal(a.levels[level][index].text,
+                                 single['labels'][level]['label'].text)
+                if 'distance' in single:
+                    assert_almost_equal(bulk['distance'][i],
+                                        single['distance'])
+    finally:
+        shutil.rmtree(tmpdir)
@@ -169,3 +169,38 @@ def test_datasetmapping():
     # feature axis should match
     assert_equal(ds.shape[1:], bflatrev.shape[1:])
 
+
+
+def test_strided_boxcar():
+    data = np.arange(480).reshape(20, 3, 4, 2)
+    ds = Dataset(data, sa={'timepoints': np.arange(20)})
+    # overlapping, non-overlapping, single box, and uneven spacing
+    for sp, bl in (([2, 4, 6, 8], 3), ([0, 5, 10], 5), ([7], 4),
+                   ([2, 4, 3, 5], 2)):
+        bcm = BoxcarMapper(sp, bl)
+        sbcm = BoxcarMapper(sp, bl, strided=True)
+        ok_('strided=True' in repr(sbcm))
+        bcm.train(ds)
+        sbcm.train(ds)
+        mds = bcm.forward(ds)
+        smds = sbcm.forward(ds)
+        assert_array_equal(mds.samples, smds.samples)
+        assert_array_equal(mds.sa.timepoints, smds.sa.timepoints)
+        evenly = len(np.unique(np.diff(sp))) < 2
+        assert_equal(np.may_share_memory(smds.samples, ds.samples), evenly)
+        # default mode always copies
+        assert_false(np.may_share_memory(mds.samples, ds.samples))
+        if evenly:
+            # overlapping boxcars cannot be modified in-place
+            assert_equal(smds.samples.flags.writeable,
+                         len(sp) == 1 or np.diff(sp)[0] >= bl)
+            # flattening is still a view
+            fm = FlattenMapper()
+            fm.train(smds)
+            fds = fm.forward(smds)
+            assert_array_equal(fds.samples,
+                               mds.samples.reshape(len(mds), -1))
+            ok_(np.may_share_memory(fds.samples, ds.samples))
+        # reverse is not affected
+        assert_array_equal(bcm.reverse(mds).samples,
+                           sbcm.reverse(smds).samples)
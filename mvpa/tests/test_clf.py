@@ -32,7 +32,7 @@ from mvpa.base.learner import DegenerateInputError, FailedToTrainError, \
 from mvpa.clfs.meta import CombinedClassifier, \
      BinaryClassifier, MulticlassClassifier, \
      SplitClassifier, MappedClassifier, FeatureSelectionClassifier, \
-     TreeClassifier, RegressionAsClassifier, MaximalVote
+     TreeClassifier, RegressionAsClassifier, MaximalVote, _get_train_nproc
 from mvpa.measures.base import TransferMeasure, ProxyMeasure, CrossValidation
 from mvpa.mappers.flatten import mask_mapper
 from mvpa.misc.attrmap import AttributeMap
@@ -401,6 +401,44 @@ class ClassifiersTests(unittest.TestCase):
         summary = clf.summary()
 
 
+    def test_split_classifier_nproc(self):
+        ds = datasets['uni2small']
+        if not externals.exists('pprocess'):
+            assert_raises(RuntimeError, SplitClassifier, sample_clf_nl,
+                          nproc=2)
+            return
+        clfs = [SplitClassifier(clf=sample_clf_nl.clone(), nproc=nproc,
+                                enable_ca=['stats', 'training_stats',
+                                           'splits'])
+                for nproc in (1, 2)]
+        for clf in clfs:
+            clf.train(ds)
+        # same results, with stats in the order of the splits
+        assert_equal([str(s) for s in clfs[0].ca.stats.sets],
+                      [str(s) for s in clfs[1].ca.stats.sets])
+        assert_equal(str(clfs[0].ca.training_stats),
+                     str(clfs[1].ca.training_stats))
+        for s1, s2 in zip(clfs[0].ca.splits, clfs[1].ca.splits):
+            for d1, d2 in zip(s1, s2):
+                assert_array_equal(d1.samples, d2.samples)
+        assert_true(np.all([c.trained for c in clfs[1].clfs]))
+        assert_array_equal(clfs[0].predict(ds), clfs[1].predict(ds))
+
+        # trained SWIG-based classifiers cannot be transferred between
+        # processes -- these get trained in a single process
+        svms = clfswh['swig', 'svm', '!meta']
+        if not len(svms):
+            raise SkipTest("SWIG-based SVMs are required")
+        clfs = [SplitClassifier(clf=svms[0].clone(), nproc=nproc,
+                                enable_ca=['stats'])
+                for nproc in (1, 2)]
+        for clf in clfs:
+            clf.train(ds)
+        assert_true(np.all([c.trained for c in clfs[1].clfs]))
+        assert_equal(str(clfs[0].ca.stats), str(clfs[1].ca.stats))
+        assert_array_equal(clfs[0].predict(ds), clfs[1].predict(ds))
+
+
     @sweepargs(clf_=clfswh['binary', '!meta'])
     def test_split_classifier_extended(self, clf_):
         clf2 = clf_.clone()
@@ -628,6 +666,42 @@ class ClassifiersTests(unittest.TestCase):
                             % (cverror, tclf))
 
 
+    def test_tree_classifier_routing(self):
+        """TreeClassifier must match training and routing by hand
+        """
+        ds = datasets['uni4medium']
+        ds = ds[:, ds.fa.nonbogus_targets != [None]]
+        # labels of different length within different groups
+        ds.targets = [{'L2': 'Long2', 'L3': 'Long3'}.get(l, l)
+                      for l in ds.targets]
+        groups = {'g0': (('L0',), None),
+                  'g1': (('L1', 'Long2', 'Long3'), sample_clf_nl.clone())}
+        tclf = TreeClassifier(sample_clf_nl.clone(), groups)
+        tclf.train(ds)
+        predictions = tclf.predict(ds)
+
+        # now do the same manually
+        index2group = groups.keys()
+        gds = ds.copy()
+        gds.targets = [[gk for gk in index2group if l in groups[gk][0]][0]
+                       for l in ds.targets]
+        gds.targets = [index2group.index(gk) for gk in gds.targets]
+        top = sample_clf_nl.clone()
+        top.train(gds)
+        inner = sample_clf_nl.clone()
+        inner.train(ds[ds.targets != 'L0'])
+        gpred = np.asarray(top.predict(ds))
+        expected = []
+        for i, gi in enumerate(gpred):
+            if index2group[gi] == 'g0':
+                expected.append('L0')
+            else:
+                expected.append(inner.predict(ds[[i]])[0])
+        # no truncation of the longer labels
+        assert_array_equal(predictions, expected)
+        assert_true('Long2' in predictions)
+
+
     @sweepargs(clf=clfswh[:])
     def test_values(self, clf):
         if isinstance(clf, MulticlassClassifier):
@@ -714,6 +788,63 @@ class ClassifiersTests(unittest.TestCase):
         # TODO: test combiners, e.g. MaximalVote and ca they store
 
 
+    def test_multiclass_maximal_vote(self):
+        ds = datasets['uni4small']
+        ulabels = sorted(ds.sa['targets'].unique)
+        mclf = MulticlassClassifier(clf=sample_clf_nl,
+                                    combiner=MaximalVote(
+                                        enable_ca=['estimates', 'predictions']))
+        mclf.train(ds)
+        assert_equal(len(mclf.clfs), len(ulabels) * (len(ulabels) - 1) / 2)
+        predictions = mclf.predict(ds)
+        votes = mclf.combiner.ca.estimates
+        # vote counts matrix: each binary classifier votes once per sample
+        assert_equal(votes.shape, (len(ds), len(ulabels)))
+        assert_array_equal(votes.sum(axis=1), len(mclf.clfs))
+        # and the winner is predicted
+        assert_array_equal(votes[np.arange(len(ds)),
+                                 [ulabels.index(p) for p in predictions]],
+                           votes.max(axis=1))
+
+        # multiple labels per sample from a single classifier
+        bclf = BinaryClassifier(sample_clf_nl.clone(),
+                                poslabels=ulabels[:2], neglabels=ulabels[2:])
+        bclf.train(ds)
+        bclf.predict(ds)
+        mv = MaximalVote(enable_ca=['estimates'])
+        mv([bclf], ds)
+        assert_array_equal(mv.ca.estimates.sum(axis=1), 2)
+
+        if not externals.exists('pprocess'):
+            assert_raises(RuntimeError, MulticlassClassifier, sample_clf_nl,
+                          nproc=2)
+            return
+        pmclf = MulticlassClassifier(clf=sample_clf_nl, nproc=2)
+        pmclf.train(ds)
+        assert_true(np.all([c.trained for c in pmclf.clfs]))
+        assert_array_equal(pmclf.predict(ds), predictions)
+
+
+    def test_multiclass_nproc_unpicklable(self):
+        # trained SWIG-based classifiers cannot be transferred between
+        # processes -- these get trained in a single process
+        clf = sample_clf_nl.clone()
+        clf.__tags__ = clf.__tags__ + ['swig']
+        assert_equal(_get_train_nproc(clf, 2), 1)
+        assert_equal(_get_train_nproc(sample_clf_nl, 2), 2)
+
+        svms = clfswh['swig', 'svm', '!meta']
+        if not externals.exists('pprocess') or not len(svms):
+            raise SkipTest("pprocess and SWIG-based SVMs are required")
+        ds = datasets['uni4small']
+        mclf = MulticlassClassifier(clf=svms[0].clone())
+        mclf.train(ds)
+        pmclf = MulticlassClassifier(clf=svms[0].clone(), nproc=2)
+        pmclf.train(ds)
+        assert_true(np.all([c.trained for c in pmclf.clfs]))
+        assert_array_equal(pmclf.predict(ds), mclf.predict(ds))
+
+
     # XXX meta should also work but TODO
     @sweepargs(clf=clfswh['svm', '!meta'])
     def test_svms(self, clf):
@@ -80,6 +80,36 @@ class CrossValidationTests(unittest.TestCase):
         self.failUnless( pmean < 0.58 and pmean > 0.42 )
 
 
+    def test_streaming_reduction(self):
+        data = get_mv_pattern(3)
+        results = CrossValidation(sample_clf_nl, NFoldPartitioner())(data)
+        for reduce_as, target in (('mean', np.mean(results.samples, axis=0)),
+                                  ('sum', np.sum(results.samples, axis=0))):
+            cv = CrossValidation(sample_clf_nl, NFoldPartitioner(),
+                                 reduce_as=reduce_as)
+            res = cv(data)
+            assert_equal(res.shape, (1, 1))
+            assert_array_almost_equal(res.samples[0], target)
+            # per-fold results are not kept around
+            ok_(not cv.ca.is_set('repetition_results'))
+            ok_(not 'cvfolds' in res.sa)
+
+        # predictions get folded into a confusion matrix
+        cv = CrossValidation(sample_clf_nl, NFoldPartitioner(), errorfx=None,
+                             reduce_as='confusion', enable_ca=['stats'])
+        res = cv(data)
+        assert_array_equal(res.samples, cv.ca.stats.matrix)
+        assert_array_equal(res.sa.predictions, cv.ca.stats.labels)
+        assert_array_equal(res.fa.targets, cv.ca.stats.labels)
+        assert_equal(res.samples.sum(), data.nsamples)
+
+        # confusion requires predictions, unknown modes are refused
+        assert_raises(ValueError, CrossValidation, sample_clf_nl,
+                      NFoldPartitioner(), reduce_as='confusion')
+        assert_raises(ValueError, CrossValidation, sample_clf_nl,
+                      NFoldPartitioner(), reduce_as='median')
+
+
 
 def suite():
     return unittest.makeSuite(CrossValidationTests)
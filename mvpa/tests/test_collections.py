@@ -99,6 +99,44 @@ def test_array_collectable():
     assert_raises(ValueError, c._set_name, "_underscore")
 
 
+def test_array_collectable_factorization():
+    c = ArrayCollectable()
+    assert_equal(c.codes, None)
+    assert_equal(c.counts, None)
+    assert_equal(c.groups, None)
+
+    c.value = ['b', 'a', 'c', 'a', 'b', 'a']
+    assert_array_equal(c.unique, ['a', 'b', 'c'])
+    assert_array_equal(c.codes, [1, 0, 2, 0, 1, 0])
+    assert_array_equal(c.counts, [3, 2, 1])
+    assert_equal(len(c.groups), 3)
+    # groups preserve the original order of elements
+    for g, v in zip(c.groups, c.unique):
+        assert_array_equal(g, np.where(c.value == v)[0])
+    # computed only once
+    assert_true(c.codes is c.codes)
+    assert_true(c.groups is c.groups)
+
+    # and invalidated on assignment
+    c.value = np.array([3, 3, 1])
+    assert_array_equal(c.unique, [1, 3])
+    assert_array_equal(c.codes, [1, 1, 0])
+    assert_array_equal(c.counts, [1, 2])
+    assert_array_equal(c.groups[1], [0, 1])
+
+    # copies do not share the cache
+    d = copy.copy(c)
+    d.value = np.array([0, 0, 0])
+    assert_array_equal(d.counts, [3])
+    assert_array_equal(c.counts, [1, 2])
+
+    # empty
+    c.value = np.array([], dtype=int)
+    assert_equal(len(c.unique), 0)
+    assert_equal(len(c.codes), 0)
+    assert_equal(c.groups, [])
+
+
 def test_collections():
     sa = SampleAttributesCollection()
     assert_equal(len(sa), 0)
@@ -472,6 +472,72 @@ class SensitivityAnalysersTests(unittest.TestCase):
         self.failUnless(np.allclose(r_custom.samples, r_custom2.samples))
 
 
+    def test_anova_batch(self):
+        ds = datasets['uni4large']
+        oa = OneWayAnova()
+        perms = np.array([np.random.permutation(ds.targets)
+                          for i in xrange(10)])
+        res = oa.batch_call(ds, perms)
+        assert_equal(res.shape, (10, ds.nfeatures))
+        for p, f in zip(perms, res.samples):
+            pds = ds.copy(deep=False)
+            pds.targets = p
+            assert_array_almost_equal(oa(pds).samples[0], f)
+        # processing labelings in blocks does not change the results
+        assert_array_almost_equal(oa.batch_call(ds, perms, blocksize=3).samples,
+                                  res.samples)
+        # wrong shape of the labels
+        assert_raises(ValueError, oa.batch_call, ds, ds.targets)
+        # integer samples
+        ids = Dataset(np.round(ds.samples * 10).astype(int), sa=ds.sa)
+        assert_array_almost_equal(oa(ids).samples,
+                                  oa(Dataset(ids.samples.astype(float),
+                                             sa=ds.sa)).samples)
+
+        if externals.exists('scipy'):
+            from scipy.stats import f_oneway
+            fp = [f_oneway(*[ds.samples[ds.targets == l, 0]
+                             for l in ds.sa['targets'].unique])[1]]
+            assert_array_almost_equal(oa(ds).fa.fprob[:1], fp)
+            res = oa.batch_call(ds, ds.targets[None], fprob=True)
+            assert_array_almost_equal(res.sa.fprob, oa(ds).fa.fprob[None])
+
+        # compound comparisons are batched as well
+        coa = CompoundOneWayAnova()(ds)
+        for i, l in enumerate(ds.sa['targets'].unique):
+            ovr = ds.copy(deep=False)
+            ovr.targets = ds.targets == l
+            assert_array_almost_equal(coa.samples[i], oa(ovr).samples[0])
+
+
+    def test_irelief_margin(self):
+        from mvpa.measures.irelief import _irelief_margin
+        ds = datasets['uni3small']
+        samples, labels = ds.samples, ds.targets
+        w = np.random.uniform(size=ds.nfeatures)
+        ir = IterativeRelief()
+        kernel_rows = lambda ids, absdiff: ir.k(np.dot(absdiff, w))
+        # reference margins computed sample by sample
+        ni = np.zeros(ds.nfeatures)
+        for n in xrange(len(ds)):
+            d = np.abs(samples[n] - samples)
+            k = ir.k(np.dot(d, w))
+            M = labels != labels[n]
+            H = labels == labels[n]
+            H[n] = False
+            gamma = 1.0 - k[M].sum() / k.sum()
+            ni += gamma * ((d[M] * (k[M] / k[M].sum())[:, None]).sum(0)
+                           - (d[H] * (k[H] / k[H].sum())[:, None]).sum(0))
+        ni /= len(ds)
+        for blocksize in (None, 1, 7):
+            assert_array_almost_equal(
+                _irelief_margin(samples, labels, kernel_rows,
+                                blocksize=blocksize), ni)
+        # and block-wise processing has no effect on the weights
+        assert_array_almost_equal(IterativeRelief(blocksize=5)(ds).samples,
+                                  IterativeRelief()(ds).samples)
+
+
     def test_transfer_measure(self):
         # come up with my own measure that only checks if training data
         # and test data are the same
@@ -536,6 +602,27 @@ class SensitivityAnalysersTests(unittest.TestCase):
         assert_array_equal(res.samples[0], [18,1,1])
 
 
+    def test_repeated_reduce_int(self):
+        class CountFeatures(Measure):
+            is_trained = True
+            def __init__(self, **kwargs):
+                Measure.__init__(self, **kwargs)
+                self.ncalls = 0
+            def _call(self, ds):
+                self.ncalls += 1
+                if self.ncalls == 1:
+                    return Dataset([[ds.nfeatures]])
+                # fractional counts come only later on
+                return Dataset([[ds.nfeatures / 2.0]])
+
+        spl = Splitter('fa.nonbogus_targets')
+        for reduce_as, target in (('sum', 19.0), ('mean', 19 / 3.0)):
+            rm = RepeatedMeasure(CountFeatures(), spl, reduce_as=reduce_as)
+            res = rm(self.dataset)
+            assert_equal(res.shape, (1, 1))
+            assert_array_almost_equal(res.samples[0], [target])
+
+
 def suite():
     return unittest.makeSuite(SensitivityAnalysersTests)
 
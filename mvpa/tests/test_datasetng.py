@@ -299,6 +299,46 @@ def test_ds_shallowcopy():
     #ok_(np.any(ds.uniquechunks != ds_.uniquechunks))
 
 
+def test_ds_shallowcopy_on_write():
+    ds = normal_feature_dataset()
+    ds.fa['ids'] = np.arange(ds.nfeatures)
+    ds_ = ds.copy(deep=False)
+    targets = ds.sa.targets.copy()
+
+    # attributes are shared and not copied
+    ok_(ds_.sa.targets is ds.sa.targets)
+    ok_(ds_.fa.ids is ds.fa.ids)
+
+    # assigning a new value affects only one side, not any other attribute
+    ds_.sa.targets = np.zeros(len(ds_))
+    assert_array_equal(ds.sa.targets, targets)
+    ok_(ds_.sa.chunks is ds.sa.chunks)
+    ds.fa.ids = np.ones(ds.nfeatures)
+    assert_array_equal(ds_.fa.ids, np.arange(ds.nfeatures))
+
+    # same for replacing an attribute or adding a new one
+    ds_.sa['chunks'] = np.ones(len(ds_))
+    ds_.sa['new'] = np.ones(len(ds_))
+    ok_(np.any(ds.sa.chunks != 1))
+    ok_(not 'new' in ds.sa)
+
+    # item access provides a private attribute, which still shares the data
+    ds__ = ds.copy(deep=False)
+    ok_(not ds__.sa['chunks'] is ds.sa['chunks'])
+    ok_(ds__.sa.chunks.base is ds.sa.chunks
+        or ds__.sa.chunks.base is ds.sa.chunks.base)
+    ds__.sa['chunks'].set_length_check(5)
+    assert_raises(ValueError, ds__.sa['chunks']._set, np.arange(len(ds)))
+    ds.sa.chunks = np.arange(len(ds))
+
+    # growing one side does not affect the other
+    ds__ = ds.copy(deep=False)
+    ds__.append(ds)
+    assert_equal(len(ds__.sa.targets), 2 * len(ds))
+    assert_equal(len(ds.sa.targets), len(ds))
+    ds.sa.targets = targets
+
+
 def test_ds_deepcopy():
     # lets use some instance of somewhat evolved dataset
     ds = normal_feature_dataset()
@@ -16,7 +16,7 @@ from mvpa.base import externals
 from mvpa.datasets.eep import eep_dataset, EEPBin
 
 from mvpa.testing.tools import assert_equal, assert_true, \
-     assert_array_almost_equal
+     assert_array_almost_equal, assert_array_equal, assert_raises
 
 def test_eep_load():
     eb = EEPBin(os.path.join(pymvpa_dataroot, 'eep.bin'))
@@ -43,6 +43,32 @@ def test_eep_bin():
     assert_equal(eb.data.shape, (2, 32, 4))
 
 
+def test_eep_mmap():
+    fname = os.path.join(pymvpa_dataroot, 'eep.bin')
+    eb = EEPBin(fname)
+    ebm = EEPBin(fname, mmap=True)
+
+    assert_true(isinstance(ebm.data, np.memmap))
+    assert_equal(ebm.data.shape, eb.data.shape)
+    assert_array_equal(ebm.data, eb.data)
+    assert_equal(ebm.channels, eb.channels)
+
+    pz = eb.channels.index('Pz')
+    sel = ebm.get_data(trials=[1], channels=['Pz', 0],
+                       timepoints=slice(1, 3))
+    assert_array_equal(sel, eb.data[1:2][:, [pz, 0], 1:3])
+    assert_raises(ValueError, ebm.get_data, timepoints=[1, 2])
+
+    ds = eep_dataset(fname, targets=[1, 2], mmap=True)
+    assert_array_equal(ds.samples, eep_dataset(eb, targets=[1, 2]).samples)
+
+    ds = eep_dataset(ebm, targets=[2], trials=[1], channels=['Pz', 'Fz'],
+                     timepoints=slice(1, None))
+    assert_equal(ds.shape, (1, 6))
+    assert_equal(list(ds.fa.channels), ['Pz'] * 3 + ['Fz'] * 3)
+    assert_array_almost_equal(ds.fa.timepoints[:3], [0, 0.002, 0.004])
+
+
     # XXX put me back whenever there is a proper resamples()
 #     def test_resampling(self):
 #         ds = eep_dataset(os.path.join(pymvpa_dataroot, 'eep.bin'),
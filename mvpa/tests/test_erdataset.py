@@ -50,6 +50,11 @@ def test_erdataset():
     assert_equal(len(erds.a.mapper), 2)
     assert_true(isinstance(erds.a.mapper[0], BoxcarMapper))
     assert_true(isinstance(erds.a.mapper[1], FlattenMapper))
+    # evenly spaced events can be a view into the original samples
+    serds = eventrelated_dataset(ds, evs, strided=True)
+    assert_array_equal(erds.samples, serds.samples)
+    assert_array_equal(erds.sa.targets, serds.sa.targets)
+    assert_true(np.may_share_memory(serds.samples, ds.samples))
     #
     # now check the same dataset with event descretization
     tr = 2.5
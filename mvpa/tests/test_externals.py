@@ -86,6 +86,54 @@ class TestExternals(unittest.TestCase):
 
 
 
+    def test_externals_cache(self):
+        import os, shutil, tempfile
+        tmpdir = tempfile.mkdtemp()
+        saved = (externals._cache, externals._cache_filename,
+                 externals._cache_modified)
+        try:
+            cfg.add_section('externals')
+            cfg.set('externals', 'cache directory', tmpdir)
+            externals._cache = None
+            externals._cache_modified = False
+            self.failUnless(externals.exists('numpy'))
+            # custom checks are never stored
+            externals._KNOWN['checker3'] = 'pass'
+            self.failUnless(externals.exists('checker3'))
+            externals._KNOWN.pop('checker3')
+            # caches of previous installations get removed
+            open(os.path.join(tmpdir, 'externals-stale'), 'w').write('')
+            externals._save_cache()
+            cachefiles = os.listdir(tmpdir)
+            self.failUnlessEqual(len(cachefiles), 1)
+            cachefile = os.path.join(tmpdir, cachefiles[0])
+            self.failUnlessEqual(open(cachefile).read(), 'yes\tnumpy\n')
+
+            # next session picks the result up from the cache without
+            # running the check -- fake a negative one to see it
+            open(cachefile, 'w').write('no\tnumpy\n')
+            externals._cache = None
+            cfg.remove_option('externals', 'have numpy')
+            self.failUnless(not externals.exists('numpy'))
+            # unless asked to recheck
+            self.failUnless(externals.exists('numpy', force=True))
+        finally:
+            (externals._cache, externals._cache_filename,
+             externals._cache_modified) = saved
+            cfg.remove_section('externals')
+            shutil.rmtree(tmpdir)
+
+
+    def test_nproc(self):
+        self.failUnlessEqual(externals.get_nproc(3), 3)
+        self.failUnless(externals.get_nproc(None) >= 1)
+        externals.check_nproc(1, 'tests')
+        externals.check_nproc(None, 'tests')
+        if not externals.exists('pprocess'):
+            self.failUnlessRaises(RuntimeError, externals.check_nproc, 2,
+                                  'tests')
+
+
 def suite():
     return unittest.makeSuite(TestExternals)
 
@@ -32,6 +32,25 @@ class GPRTests(unittest.TestCase):
     def test_linear(self):
         pass
 
+    def test_single_precision(self):
+        from mvpa.base import cfg
+        dataset = data_generators.linear1d_gaussian_noise()
+        precision = cfg.get('general', 'precision', default=None)
+        try:
+            predictions = []
+            for p in ('double', 'single'):
+                cfg.set('general', 'precision', p)
+                clf = GPR(GeneralizedLinearKernel())
+                clf.train(dataset)
+                predictions.append(clf.predict(dataset.samples))
+            # kernels are computed in double precision regardless
+            assert_array_equal(predictions[0], predictions[1])
+        finally:
+            if precision is None:
+                cfg.remove_option('general', 'precision')
+            else:
+                cfg.set('general', 'precision', precision)
+
 
 def suite():
     return unittest.makeSuite(GPRTests)
@@ -88,6 +88,34 @@ class IFSTests(unittest.TestCase):
         self.failUnless((resds.samples[:,0] == signal.samples[:,0]).all())
 
 
+    @reseed_rng()
+    def test_ifs_nproc(self):
+        from mvpa.clfs.gnb import GNB
+        clf = GNB()
+        fmeasure = CrossValidation(clf, NFoldPartitioner(),
+                                   postproc=mean_sample())
+        pmeasure = ProxyMeasure(clf, postproc=BinaryFxNode(mean_mismatch_error,
+                                                           'targets'))
+        splitter = Splitter('purpose', attr_values=['train', 'test'])
+        fselector = FixedNElementTailSelector(1, tail='lower', mode='select')
+        if not externals.exists('pprocess'):
+            self.assertRaises(RuntimeError, IFS, fmeasure, pmeasure, splitter,
+                              nproc=2)
+            raise SkipTest('pprocess is required for multiprocess IFS')
+        ds = self.get_data()
+        ds.sa['purpose'] = np.where(ds.sa.chunks % 2, 'train', 'test')
+        orig_samples = ds.samples.copy()
+        results = []
+        for nproc in (1, 2):
+            ifs = IFS(fmeasure, pmeasure, splitter, fselector=fselector,
+                      nproc=nproc)
+            ifs.train(ds)
+            results.append((ifs.ca.errors, list(ifs.slicearg)))
+        # candidate buffers must not leak into the input dataset
+        assert_array_equal(ds.samples, orig_samples)
+        self.failUnlessEqual(results[0], results[1])
+
+
 def suite():
     return unittest.makeSuite(IFSTests)
 
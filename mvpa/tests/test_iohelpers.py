@@ -94,6 +94,71 @@ class IOHelperTests(unittest.TestCase):
             pass
 
 
+    def test_column_data_cache(self):
+        file_, fpath = mkstemp('mvpa', 'test')
+        file_ = open(fpath, 'w')
+        file_.write("# some comment\nA 1 0.5\n\nB 2 bogus\n")
+        file_.close()
+        cachefile = fpath + '.npz'
+
+        kwargs = dict(header=['l', 'i', 'f'], dtype=[str, int, float])
+        d = ColumnData(fpath, **kwargs)
+        self.failUnlessEqual(d['l'], ['A', 'B'])
+        self.failUnlessEqual(d['i'], [1, 2])
+        # unconvertable value is kept as is
+        self.failUnlessEqual(d['f'], [0.5, 'bogus'])
+        ok_(not os.path.exists(cachefile))
+
+        dc = ColumnData(fpath, cache=True, **kwargs)
+        ok_(os.path.exists(cachefile))
+        # now from the cache
+        dc = ColumnData(fpath, cache=True, **kwargs)
+        self.failUnlessEqual(dc, d)
+        self.failUnlessEqual([type(v) for v in dc['f']], [float, str])
+        # different parsing does not use the cache
+        dc = ColumnData(fpath, header=['l', 'i', 'f'], cache=True)
+        self.failUnlessEqual(dc['l'], ['A', 'B'])
+        self.failUnlessEqual(dc['i'], [1.0, 2.0])
+
+        # modified file invalidates the cache
+        file_ = open(fpath, 'a')
+        file_.write("C 3 1.5\n")
+        file_.close()
+        dc = ColumnData(fpath, cache=True, **kwargs)
+        self.failUnlessEqual(dc['i'], [1, 2, 3])
+
+        # wrong number of columns is still detected
+        file_ = open(fpath, 'a')
+        file_.write("D 4\n")
+        file_.close()
+        self.failUnlessRaises(RuntimeError, ColumnData, fpath, **kwargs)
+
+        os.remove(fpath)
+        os.remove(cachefile)
+
+
+    def test_column_data_chunks(self):
+        # large enough to be read in multiple chunks
+        nlines = 200000
+        file_, fpath = mkstemp('mvpa', 'test')
+        file_ = open(fpath, 'w')
+        file_.write(''.join(['%i %i.5\n' % (i, i) for i in xrange(nlines)]))
+        file_.close()
+        self.failUnless(os.path.getsize(fpath) > 2 ** 21)
+
+        d = ColumnData(fpath, header=['i', 'f'], dtype=[int, float])
+        self.failUnlessEqual(d['i'], range(nlines))
+        self.failUnlessEqual(d['f'][-1], nlines - 0.5)
+
+        # wrong number of columns is detected in any chunk
+        file_ = open(fpath, 'a')
+        file_.write("1 2 3\n")
+        file_.close()
+        self.failUnlessRaises(RuntimeError, ColumnData, fpath,
+                              header=['i', 'f'])
+        os.remove(fpath)
+
+
     def test_samples_attributes(self):
         sa = SampleAttributes(os.path.join(pymvpa_dataroot,
                                            'attributes_literal.txt'),
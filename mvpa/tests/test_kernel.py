@@ -287,6 +287,35 @@ class KernelTests(unittest.TestCase):
         self.failUnless((ed - ed_manual).sum() < 0.0000001)
 
 
+    def test_single_precision(self):
+        from mvpa.base import cfg
+        data = datasets['uni4large'].samples[:5, :8]
+        ds = Dataset(data)
+        precision = cfg.get('general', 'precision', default=None)
+        try:
+            cfg.set('general', 'precision', 'double')
+            self.failUnlessEqual(squared_euclidean_distance(data).dtype,
+                                 np.float64)
+            lk = npK.LinearKernel()
+            lk.compute(ds)
+            self.failUnlessEqual(lk.as_raw_np().dtype, np.float64)
+
+            cfg.set('general', 'precision', 'single')
+            ed = squared_euclidean_distance(data)
+            self.failUnlessEqual(ed.dtype, np.float32)
+            self.failUnless(np.abs(ed - squared_euclidean_distance(
+                data.astype('float32'))).max() < 1e-5)
+            for k in (npK.LinearKernel(), npK.RbfKernel(),
+                      PrecomputedKernel(matrix=np.ones((5, 5)))):
+                k.compute(ds)
+                self.failUnlessEqual(k.as_raw_np().dtype, np.float32)
+        finally:
+            if precision is None:
+                cfg.remove_option('general', 'precision')
+            else:
+                cfg.set('general', 'precision', precision)
+
+
     def test_pnorm_w(self):
         data0 = datasets['uni4large'].samples.T
         weight = np.abs(data0[11, :60])
@@ -122,3 +122,29 @@ def test_polydetrend():
     # but if done inplace that is no longer true
     poly_detrend(ds, chunks_attr='chunks', polyord=1, space='time')
     assert_array_equal(ds, mds)
+
+
+def test_polydetrend_blocksize():
+    samples = np.random.normal(size=(30, 7)) \
+              + np.arange(30)[:, None] * np.arange(7)
+    ds = dataset_wizard(samples, chunks=[0] * 10 + [1] * 20)
+    mds = PolyDetrendMapper(chunks_attr='chunks', polyord=2).forward(ds)
+    # compare against explicit least squares fit
+    regs = [np.zeros(len(ds)) for i in range(6)]
+    for i, c in enumerate((0, 1)):
+        cids = ds.chunks == c
+        for p in range(3):
+            regs[i * 3 + p][cids] = np.linspace(-1, 1, cids.sum()) ** p
+    regs = np.array(regs).T
+    assert_array_almost_equal(
+        mds.samples,
+        samples - np.dot(regs, np.linalg.lstsq(regs, samples)[0]))
+
+    # block-wise processing yields identical results, with and without
+    # in-place modification
+    mds_block = PolyDetrendMapper(chunks_attr='chunks', polyord=2,
+                                  blocksize=3).forward(ds)
+    assert_array_almost_equal(mds, mds_block)
+    assert_array_equal(ds.samples, samples)
+    poly_detrend(ds, chunks_attr='chunks', polyord=2, blocksize=2)
+    assert_array_almost_equal(ds, mds)
@@ -9,6 +9,8 @@
 """Unit tests for PyMVPA MEG stuff"""
 
 import os.path
+import shutil
+import tempfile
 
 from mvpa.testing import *
 from mvpa import pymvpa_dataroot
@@ -36,6 +38,29 @@ class MEGTests(unittest.TestCase):
         self.failUnless(meg.data[3, 0, 808] == -4.30692876e-12)
 
 
+    def test_tuebingen_meg_cache(self):
+        if not externals.exists('gzip'):
+            return
+        tempdir = tempfile.mkdtemp()
+        fname = os.path.join(tempdir, 'tueb_meg.dat.gz')
+        shutil.copy(os.path.join(pymvpa_dataroot, 'tueb_meg.dat.gz'), fname)
+
+        meg = TuebingenMEG(fname)
+        megc = TuebingenMEG(fname, cache=True)
+        self.failUnless(os.path.exists(fname + '.npz'))
+        # now from the cache
+        megcc = TuebingenMEG(fname, cache=True)
+        for m in (megc, megcc):
+            self.failUnless(m.channelids == meg.channelids)
+            self.failUnless(m.ntimepoints == meg.ntimepoints)
+            self.failUnless(m.nsamples == meg.nsamples)
+            self.failUnless(m.samplingrate == meg.samplingrate)
+            assert_array_equal(m.timepoints, meg.timepoints)
+            assert_array_equal(m.data, meg.data)
+
+        shutil.rmtree(tempdir)
+
+
 def suite():
     return unittest.makeSuite(MEGTests)
 
@@ -255,6 +255,18 @@ def test_cached_query_engine():
     cmp_res(results_ind[0], [qec[fid] for fid in xrange(ds.nfeatures)])
     cmp_res(results_kw[0], [qec(myspace=x) for x in ds.fa.myspace])
     ok_(qec.train(ds2) is None)
+
+    # queries are told apart by their content, also for large arrays which
+    # only differ in their abbreviated middle
+    key = ne.CachedQueryEngine._get_query_key
+    a1 = np.zeros(2000)
+    a2 = a1.copy()
+    a2[1000] = 1
+    ok_(repr(a1) == repr(a2))
+    ok_(key([('a', a1)]) != key([('a', a2)]))
+    ok_(key([('a', a1)]) == key([('a', a1.copy())]))
+    ok_(key([('a', a1)]) != key([('a', a1.astype(int))]))
+    ok_(key([('a', (0, 1, 2))]) == key([('a', [0, 1, 2])]))
     # unfortunately we are not catching those
     #ds2.fa.myspace = ds2.fa.myspace*3
     #assert_raises(ValueError, qec.train, ds2)
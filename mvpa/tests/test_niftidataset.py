@@ -18,7 +18,8 @@ if not externals.exists('nibabel'):
     raise SkipTest
 
 from mvpa import pymvpa_dataroot
-from mvpa.datasets.mri import fmri_dataset, _load_anyimg, map2nifti
+from mvpa.datasets.mri import fmri_dataset, fmri_runs_dataset, \
+     _load_anyimg, map2nifti
 from mvpa.datasets.eventrelated import eventrelated_dataset
 from mvpa.misc.fsl import FslEV3
 from mvpa.misc.support import Event, value2idx
@@ -309,6 +310,89 @@ def test_nifti_dataset_from3_d():
     assert_array_equal(ds2.targets, labels)
 
 
+@with_tempfile(suffix='.nii')
+def test_fmridataset_slabs(filename):
+    import nibabel
+    tssrc = os.path.join(pymvpa_dataroot, 'bold.nii.gz')
+    masrc = os.path.join(pymvpa_dataroot, 'mask.nii.gz')
+    # uncompressed copy to test memory-mapped access
+    nibabel.load(tssrc).to_filename(filename)
+    attr = SampleAttributes(os.path.join(pymvpa_dataroot, 'attributes.txt'))
+    ds = fmri_dataset(tssrc, targets=attr.targets, chunks=attr.chunks,
+                      mask=masrc, add_fa={'mymask': masrc})
+    for src in (tssrc, filename):
+        for mask in (masrc, None):
+            for slabsize in (1, 100, 10000):
+                dss = fmri_dataset(src, targets=attr.targets,
+                                   chunks=attr.chunks, mask=mask,
+                                   add_fa={'mymask': masrc},
+                                   slabsize=slabsize, dtype='float32')
+                assert_equal(dss.samples.dtype, np.float32)
+                if mask is None:
+                    dss = dss[:, dss.fa.mymask != 0]
+                assert_array_equal(ds.samples, dss.samples)
+                for col in ('sa', 'fa', 'a'):
+                    assert_equal(sorted(getattr(ds, col).keys()),
+                                 sorted(getattr(dss, col).keys()))
+                assert_array_equal(ds.fa.voxel_indices, dss.fa.voxel_indices)
+                assert_array_equal(ds.sa.time_coords, dss.sa.time_coords)
+                assert_equal(ds.a.voxel_dim, dss.a.voxel_dim)
+                # mapping back into the volume works as before
+                assert_array_equal(map2nifti(ds).get_data(),
+                                   map2nifti(dss).get_data())
+    # datatype is determined by the header, and no data is left cached in
+    # the images
+    for src in (tssrc, filename):
+        img = nibabel.load(src)
+        dss = fmri_dataset(img, mask=masrc, slabsize=100)
+        assert_equal(dss.samples.dtype, img.get_data_dtype())
+        assert_false(img.in_memory)
+    # list of volumes
+    dss = fmri_dataset((masrc, masrc), mask=masrc, slabsize=1)
+    assert_array_equal(dss.samples,
+                       fmri_dataset((masrc, masrc), mask=masrc).samples)
+    assert_raises(ValueError, fmri_dataset, (masrc, tssrc), mask=masrc,
+                  slabsize=1)
+
+
+@with_tempfile(suffix='.nii')
+def test_fmri_runs_dataset(filename):
+    import nibabel
+    tssrc = os.path.join(pymvpa_dataroot, 'bold.nii.gz')
+    masrc = os.path.join(pymvpa_dataroot, 'mask.nii.gz')
+    nibabel.load(tssrc).to_filename(filename)
+    ds = fmri_dataset(tssrc, mask=masrc)
+    runs = [tssrc, filename, tssrc]
+    for nproc in (1, 2, None):
+        for dtype in (None, 'float32'):
+            mds = fmri_runs_dataset(runs, mask=masrc, nproc=nproc,
+                                    dtype=dtype, slabsize=500)
+            assert_equal(mds.shape, (3 * len(ds), ds.nfeatures))
+            if not dtype is None:
+                assert_equal(mds.samples.dtype, np.dtype(dtype))
+            for i in range(3):
+                run = mds[mds.chunks == i]
+                assert_array_equal(run.samples, ds.samples)
+                assert_array_equal(run.sa.time_indices, ds.sa.time_indices)
+                assert_array_almost_equal(run.sa.time_coords,
+                                          ds.sa.time_coords)
+            assert_array_equal(mds.fa.voxel_indices, ds.fa.voxel_indices)
+            assert_array_equal(map2nifti(mds, mds.samples[:1]).get_data(),
+                               map2nifti(ds, ds.samples[:1]).get_data())
+    # loaded runs do not keep their data cached
+    imgs = [nibabel.load(r) for r in runs]
+    mds = fmri_runs_dataset(imgs, mask=masrc, nproc=2)
+    assert_equal(mds.samples.dtype, imgs[0].get_data_dtype())
+    assert_false(np.any([img.in_memory for img in imgs]))
+    # explicit chunks and errors in loader threads
+    mds = fmri_runs_dataset(runs[:2], mask=masrc, chunks=5, targets=1)
+    assert_array_equal(mds.sa.chunks, [5] * len(mds))
+    assert_raises(ValueError, fmri_runs_dataset,
+                  [tssrc, os.path.join(pymvpa_dataroot, 'example4d.nii.gz')])
+    assert_raises(IOError, fmri_runs_dataset, [tssrc, filename + '_none'],
+                  mask=masrc, nproc=2)
+
+
 #def test_nifti_dataset_roi_mask_neighbors(self):
 #    """Test if we could request neighbors within spherical ROI whenever
 #       center is outside of the mask
@@ -16,6 +16,12 @@ from mvpa.datasets.base import Dataset
 from mvpa.measures.noiseperturbation import NoisePerturbationSensitivity
 from mvpa.generators.partition import NFoldPartitioner
 from mvpa.measures.base import CrossValidation
+from mvpa.measures.glm import GLM
+from mvpa.measures.corrcoef import CorrCoef
+
+
+def _no_noise(size):
+    return np.zeros(size)
 
 
 class PerturbationSensitivityAnalyzerTests(unittest.TestCase):
@@ -50,6 +56,64 @@ class PerturbationSensitivityAnalyzerTests(unittest.TestCase):
         self.failUnless(-0.2 < np.mean(map) < 0.2)
 
 
+    def test_perturbation_groups(self):
+        cv = CrossValidation(sample_clf_lin, NFoldPartitioner())
+        ds = self.dataset
+        orig_samples = ds.samples.copy()
+        for kwargs in (dict(groupsize=4), dict(groupsize=3, nrepetitions=2)):
+            pa = NoisePerturbationSensitivity(cv, **kwargs)
+            map = pa(ds)
+            assert_equal(map.shape, (len(ds.sa['chunks'].unique),
+                                     ds.nfeatures))
+            # all features get their groups' sensitivity
+            assert_true(np.isfinite(map.samples).all())
+            # perturbations are reverted
+            assert_array_equal(ds.samples, orig_samples)
+        assert_raises(ValueError, NoisePerturbationSensitivity, cv,
+                      groupsize=0)
+
+
+    def test_perturbation_univariate(self):
+        # univariate measures need a single evaluation only
+        ds = self.dataset
+        design = np.random.standard_normal((len(ds), 2))
+        pa = NoisePerturbationSensitivity(GLM(design), univariate=True,
+                                          noise=_no_noise)
+        # no noise -- no effect
+        assert_array_equal(pa(ds).samples, np.zeros((2, ds.nfeatures)))
+        pa = NoisePerturbationSensitivity(GLM(design), univariate=True)
+        map = pa(ds)
+        assert_equal(map.shape, (2, ds.nfeatures))
+        assert_true((map.samples != 0).all())
+        # only effects on the feature's own value are returned, instead of
+        # the full perturbation map
+        ds = ds[:, :6]
+        full = NoisePerturbationSensitivity(CorrCoef())(ds)
+        assert_equal(full.shape, (6, 6))
+        assert_true((np.diag(full.samples) != 0).all())
+        diag = NoisePerturbationSensitivity(CorrCoef(), univariate=True)(ds)
+        assert_equal(diag.shape, (1, 6))
+        assert_true((diag.samples != 0).all())
+        # multivariate measures cannot be perturbed at once
+        cv = CrossValidation(sample_clf_lin, NFoldPartitioner())
+        assert_raises(ValueError, NoisePerturbationSensitivity, cv,
+                      univariate=True)
+
+
+    @reseed_rng()
+    def test_perturbation_nproc(self):
+        cv = CrossValidation(sample_clf_lin, NFoldPartitioner())
+        if not externals.exists('pprocess'):
+            assert_raises(RuntimeError, NoisePerturbationSensitivity, cv,
+                          nproc=2)
+            raise SkipTest('pprocess is required for multiprocess analysis')
+        # without noise sensitivities are deterministic
+        maps = [NoisePerturbationSensitivity(cv, noise=_no_noise, nproc=nproc,
+                                             groupsize=5)(self.dataset)
+                for nproc in (1, 2)]
+        assert_array_equal(maps[0], maps[1])
+
+
 def suite():
     return unittest.makeSuite(PerturbationSensitivityAnalyzerTests)
 
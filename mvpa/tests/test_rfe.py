@@ -375,6 +375,73 @@ class RFETests(unittest.TestCase):
             # use the same classifier
 
 
+    @reseed_rng()
+    def test_rfe_inplace_warm_start(self):
+        data = normal_feature_dataset(perlabel=20, nchunks=5, nfeatures=100,
+                                      nonbogus_features=[0, 1], snr=1.5)
+        data.fa['fid'] = np.arange(data.nfeatures)
+        orig_samples = data.samples.copy()
+
+        def get_rfe(clf, **kwargs):
+            return RFE(clf.get_sensitivity_analyzer(postproc=maxofabs_sample()),
+                       ProxyMeasure(clf,
+                                    postproc=BinaryFxNode(mean_mismatch_error,
+                                                          'targets')),
+                       Repeater(2),
+                       fselector=FractionTailSelector(
+                           0.80, mode='select', tail='upper'),
+                       train_pmeasure=False, **kwargs)
+
+        from mvpa.clfs.smlr import SMLR
+        # fixed seed to get identical classifiers in both runs
+        clf = SMLR(seed=3)
+        rfes = [get_rfe(clf), get_rfe(clf, inplace=True)]
+        for rfe in rfes:
+            rfe.train(data)
+        # in-place working copies do not change a thing
+        assert_array_equal(data.samples, orig_samples)
+        assert_array_equal(rfes[0].ca.errors, rfes[1].ca.errors)
+        assert_array_equal(rfes[0].ca.history, rfes[1].ca.history)
+        assert_array_equal(rfes[0](data).fa.fid, rfes[1](data).fa.fid)
+
+        rfe = get_rfe(SMLR(), inplace=True, warm_start=True)
+        rfe.train(data)
+        assert_array_equal(data.samples, orig_samples)
+        # informative features survive
+        self.failUnless(set([0, 1]).issubset(rfe(data).fa.fid))
+
+
+    @reseed_rng()
+    def test_rfe_parallel_cv(self):
+        if not externals.exists('pprocess'):
+            self.assertRaises(RuntimeError, CrossValidation, sample_clf_lin,
+                              NFoldPartitioner(), nproc=2)
+            raise SkipTest('pprocess is required for multiprocess CV')
+        data = datasets['uni2small']
+        results = []
+        for nproc in (1, 2):
+            from mvpa.clfs.smlr import SMLR
+            rfeclf = SMLR(seed=1)
+            clf = FeatureSelectionClassifier(
+                SMLR(seed=1),
+                RFE(rfeclf.get_sensitivity_analyzer(
+                        postproc=maxofabs_sample()),
+                    ProxyMeasure(rfeclf,
+                                 postproc=BinaryFxNode(mean_mismatch_error,
+                                                       'targets')),
+                    Repeater(2),
+                    fselector=FractionTailSelector(
+                        0.80, mode='select', tail='upper'),
+                    inplace=True))
+            cv = CrossValidation(clf, NFoldPartitioner(), nproc=nproc,
+                                 enable_ca=['stats'])
+            res = cv(data)
+            results.append((res.samples, res.sa.cvfolds,
+                            cv.ca.stats.matrix))
+        for r1, r2 in zip(*results):
+            assert_array_equal(r1, r2)
+
+
     def test_james_problem(self):
         percent = 80
         dataset = datasets['uni2small']
@@ -20,8 +20,10 @@ from mvpa.clfs.transerror import ConfusionMatrix
 from mvpa.measures.searchlight import sphere_searchlight, Searchlight
 from mvpa.measures.gnbsearchlight import sphere_gnbsearchlight,\
      GNBSearchlight
+from mvpa.measures.ridgesearchlight import sphere_ridgesearchlight
 
 from mvpa.misc.neighborhood import IndexQueryEngine, Sphere
+from mvpa.misc.errorfx import rms_error
 from mvpa.generators.partition import NFoldPartitioner
 from mvpa.generators.permutation import AttributePermutator
 from mvpa.measures.base import CrossValidation
@@ -135,6 +137,25 @@ class SearchlightTests(unittest.TestCase):
             self.failUnless(dmax <= 1e-13)
 
 
+    @sweepargs(lm=(None, 2.0))
+    def test_ridge_searchlight(self, lm=None):
+        from mvpa.clfs.ridge import RidgeReg
+        ds = datasets['3dsmall'].copy()
+        ds.fa['voxel_indices'] = ds.fa.myspace
+        ds.sa['targets'] = np.random.normal(size=len(ds))
+        ridge = RidgeReg(lm=lm)
+        cv = CrossValidation(ridge, NFoldPartitioner(), errorfx=rms_error)
+        skwargs = dict(radius=1, enable_ca=['roi_sizes'])
+        res = sphere_searchlight(cv, **skwargs)(ds)
+        for bs in (None, 1, 7):
+            sl = sphere_ridgesearchlight(ridge, NFoldPartitioner(),
+                                         roi_blocksize=bs, **skwargs)
+            rres = sl(ds)
+            assert_equal(rres.shape, res.shape)
+            assert_array_almost_equal(rres.samples, res.samples)
+            assert_equal(len(sl.ca.roi_sizes), ds.nfeatures)
+
+
     def test_partial_searchlight_with_full_report(self):
         ds = self.dataset.copy()
         center_ids = np.zeros(ds.nfeatures, dtype='bool')
@@ -42,6 +42,24 @@ class SOMMapperTests(unittest.TestCase):
             self.failUnless((np.round(rmapped) == colors).all())
 
 
+    def test_som_batchsize_dtype(self):
+        colors = np.random.rand(20, 3)
+        soms = []
+        for kwargs in ({}, {'batchsize': 3}, {'dtype': 'float32'}):
+            som = SimpleSOMMapper((6, 4), 10, learning_rate=0.01, **kwargs)
+            np.random.seed(11)
+            som.train(colors)
+            soms.append(som)
+        # batches only affect memory footprint, not the result
+        self.failUnless(np.allclose(soms[0].K, soms[1].K))
+        self.failUnless((soms[0].forward(colors)
+                         == soms[1].forward(colors)).all())
+        self.failUnless(soms[2].K.dtype == np.float32)
+        self.failUnless(np.allclose(soms[0].K, soms[2].K, atol=1e-4))
+        self.failUnless('batchsize=3' in repr(soms[1]))
+        self.failUnless("dtype='float32'" in repr(soms[2]))
+
+
 def suite():
     return unittest.makeSuite(SOMMapperTests)
 
@@ -325,6 +325,49 @@ class StateTests(unittest.TestCase):
             self.failUnlessEqual(sv.name, sv_dc.name)
             self.failUnlessEqual(sv._instance_index, sv_dc._instance_index)
 
+    def test_instances_do_not_share_collections(self):
+        class TestClassMutableParameter(TestClassParametrized):
+            plist = Parameter([1, 2], doc="mutable default")
+
+        p1 = TestClassMutableParameter(p1=3, enable_ca=['state1'])
+        p2 = TestClassMutableParameter()
+        self.failUnless(not p1.params is p2.params)
+        self.failUnless(not p1.ca['state1'] is p2.ca['state1'])
+        # immutable properties are shared with the class template
+        self.failUnless(p1.params['p1'].__doc__ is p2.params['p1'].__doc__)
+        # mutable default values are not
+        p1.params.plist.append(3)
+        self.failUnlessEqual(p2.params.plist, [1, 2])
+        self.failUnlessEqual(TestClassMutableParameter().params.plist,
+                             [1, 2])
+        # per-instance changes do not leak
+        self.failUnlessEqual(p1.params.p1, 3)
+        self.failUnlessEqual(p2.params.p1, 0)
+        self.failUnless(p1.ca.is_enabled('state1'))
+        self.failUnless(not p2.ca.is_enabled('state1'))
+
+        # and deep copies are independent as well
+        p1.ca.state1 = [123]
+        p3 = copy.deepcopy(p1)
+        self.failUnless(p3.ca is p3._collections['ca'])
+        self.failUnlessEqual(p3.params.plist, [1, 2, 3])
+        self.failUnlessEqual(p3.ca.state1, [123])
+        p3.ca.state1.append(4)
+        p3.params.p1 = 5
+        self.failUnlessEqual(p1.ca.state1, [123])
+        self.failUnlessEqual(p1.params.p1, 3)
+        self.failUnless(p3.ca.is_enabled('state1'))
+
+
+    def test_pickling_state_variable(self):
+        import cPickle
+        proper = TestClassProper(enable_ca=['state1'])
+        proper.ca.state1 = 123
+        proper_p = cPickle.loads(cPickle.dumps(proper))
+        # value of an attribute disabled by default survives as well
+        self.failUnless(proper_p.ca.is_enabled('state1'))
+        self.failUnlessEqual(proper_p.ca.state1, 123)
+
 def suite():
     return unittest.makeSuite(StateTests)
 
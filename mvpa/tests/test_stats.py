@@ -97,8 +97,8 @@ class StatsTests(unittest.TestCase):
         self.failUnless(a.shape == (1, ds.nfeatures))
         self.failUnless(ac.shape == (len(ds.UT), ds.nfeatures))
 
-        assert_array_equal(ac[0], ac[1])
-        assert_array_equal(a, ac[1])
+        assert_array_almost_equal(ac[0], ac[1])
+        assert_array_almost_equal(a, ac[1])
 
         # check for p-value attrs
         if externals.exists('scipy'):
@@ -10,8 +10,11 @@
 
 import inspect
 import re
+import sys
 import unittest
 
+from mvpa.base import externals
+
 
 class SuiteTest(unittest.TestCase):
 
@@ -24,6 +27,31 @@ class SuiteTest(unittest.TestCase):
             self.fail(msg="Cannot import everything from mvpa.suite."
                       "Getting %s" % e)
 
+    def test_lazy_imports(self):
+        import mvpa.suite as suite
+        lazy = [(k, v) for k, v in vars(suite).items()
+                if isinstance(v, suite._LazyImport)]
+        for name, obj in lazy:
+            deps = obj._LazyImport__deps
+            if deps is not None and not externals.exists(deps):
+                # missing externals are reported upon first use
+                self.failUnlessRaises(RuntimeError, obj._resolve)
+                continue
+            # resolving must provide the actual object and rebind it
+            module = obj._LazyImport__module
+            actual = obj._resolve()
+            self.failUnless(getattr(suite, name) is actual)
+            self.failUnless(not isinstance(actual, suite._LazyImport))
+            # all public classes and functions of the module are declared
+            if not inspect.ismodule(actual) and module in sys.modules:
+                for k, v in vars(sys.modules[module]).iteritems():
+                    if not k.startswith('_') \
+                           and (inspect.isclass(v) or inspect.isfunction(v)) \
+                           and v.__module__ == module:
+                        self.failUnless(k in vars(suite), msg="%s.%s is not "
+                                        "provided by mvpa.suite" % (module, k))
+
+
     def test_docstrings(self):
         from mvpa.suite import suite_stats
         # Lets do compliance checks
@@ -11,9 +11,9 @@
 import unittest, re
 from StringIO import StringIO
 
-from mvpa.base.verbosity import OnceLogger
+from mvpa.base.verbosity import OnceLogger, Profiler
 
-from mvpa.base import verbose, error
+from mvpa.base import verbose, error, profiler
 
 if __debug__:
     from mvpa.base import debug
@@ -135,6 +135,68 @@ class VerboseOutputTest(unittest.TestCase):
         self.failUnless(self.sout.getvalue().startswith("ERROR"))
 
 
+    def test_profiler(self):
+        """Test profiler aggregation and reports"""
+        prof = Profiler(active=True)
+        for i in xrange(3):
+            ptoken = prof.active and prof.start(self, 'run')
+            prof.stop(ptoken)
+        prof.stop(prof.start('explicit'))
+        prof.count('events', 5)
+        prof.count('events')
+        stats = prof.stats
+        self.failUnlessEqual(sorted(stats.keys()),
+                             ['VerboseOutputTest.run', 'explicit'])
+        self.failUnlessEqual(stats['VerboseOutputTest.run']['calls'], 3)
+        self.failUnless(stats['explicit']['time'] >= 0)
+        self.failUnlessEqual(prof.counters, {'events': 6})
+
+        prof.dump(self.sout)
+        table = self.sout.getvalue().splitlines()
+        self.failUnless(table[0].startswith('node'))
+        self.failUnlessEqual(len(table), 4)
+        self.failUnless(table[-1].startswith('events'))
+
+        try:
+            import json
+        except ImportError:
+            json = None
+        if json is not None:
+            report = json.loads(prof.as_json())
+            self.failUnlessEqual(report['counters'], {'events': 6})
+            self.failUnlessEqual(
+                report['nodes']['VerboseOutputTest.run']['calls'], 3)
+        self.failUnlessRaises(ValueError, prof.dump, self.sout, 'xml')
+
+        prof.reset()
+        self.failUnlessEqual(prof.stats, {})
+        # disabled global profiler should not collect anything
+        if not profiler.active:
+            self.failUnlessEqual(profiler.stats, {})
+
+
+    def test_profiler_hooks(self):
+        """Test that instrumented hot paths report to the profiler"""
+        from mvpa.clfs.knn import kNN
+        from mvpa.misc.data_generators import normal_feature_dataset
+        ds = normal_feature_dataset(nlabels=2, nchunks=2, perlabel=4,
+                                    nfeatures=3)
+        was_active = profiler.active
+        profiler.reset()
+        profiler.active = True
+        try:
+            clf = kNN(k=1)
+            clf.train(ds)
+            clf.predict(ds)
+            clf.predict(ds)
+        finally:
+            profiler.active = was_active
+        stats = profiler.stats
+        profiler.reset()
+        self.failUnlessEqual(stats['kNN.train']['calls'], 1)
+        self.failUnlessEqual(stats['kNN.predict']['calls'], 2)
+
+
     if __debug__:
         def test_debug(self):
             verbose.handlers = []           # so debug doesn't spoil it
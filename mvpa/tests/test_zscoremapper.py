@@ -138,3 +138,82 @@ def test_zscore():
     zm = ZScoreMapper(params={0: (2,1), 1: (12,1)})
     zm.train(ds)                        # train
     assert_array_almost_equal(zm.forward(ds), np.transpose([check + check]))
+
+
+def test_zscore_chunkwise_vs_manual():
+    # random data with chunks of unequal size and some samples excluded from
+    # parameter estimation
+    samples = np.random.normal(loc=3, scale=2, size=(30, 4))
+    ds = dataset_wizard(samples.copy(),
+                        targets=[0, 1, 2] * 10,
+                        chunks=[0] * 7 + [1] * 11 + [2] * 12)
+    zm = ZScoreMapper(param_est=('targets', [0, 1]))
+    zm.train(ds)
+    zds = zm.forward(ds)
+    for c in ds.UC:
+        cids = ds.chunks == c
+        est = samples[np.logical_and(cids, ds.targets != 2)]
+        assert_array_almost_equal(
+            zds.samples[cids],
+            (samples[cids] - est.mean(axis=0)) / est.std(axis=0))
+    # source stays untouched
+    assert_array_equal(ds.samples, samples)
+
+
+def test_zscore_partial_train():
+    samples = np.random.normal(loc=3, scale=2, size=(40, 5))
+    ds = dataset_wizard(samples, targets=range(40),
+                        chunks=[0] * 10 + [1] * 30)
+    for chunks_attr in (None, 'chunks'):
+        zm = ZScoreMapper(chunks_attr=chunks_attr)
+        zm.train(ds)
+        zpm = ZScoreMapper(chunks_attr=chunks_attr)
+        # feed the data in portions that split a chunk, empty ones included
+        for portion in (slice(0, 0), slice(0, 5), slice(5, 5), slice(5, 25),
+                        slice(25, None)):
+            zpm.partial_train(ds[portion])
+        ok_(zpm.is_trained)
+        assert_array_almost_equal(zm.forward(ds).samples,
+                                  zpm.forward(ds).samples)
+        # regular training starts from scratch
+        zpm.train(ds[:20])
+        zm.train(ds[:20])
+        assert_array_almost_equal(zm.forward(ds[:20]).samples,
+                                  zpm.forward(ds[:20]).samples)
+    # fixed parameters cannot be updated
+    assert_raises(RuntimeError, ZScoreMapper(params=(0, 1)).partial_train, ds)
+
+
+def test_zscore_precision():
+    from mvpa.base import cfg
+    def zscored(d, **kwargs):
+        zm = ZScoreMapper(**kwargs)
+        zm.train(d)
+        return zm.forward(d).samples
+    ds = dataset_wizard(np.arange(40).reshape(10, 4), chunks=[0, 1] * 5)
+    dsf = ds.copy()
+    dsf.samples = dsf.samples.astype('float64')
+    precision = cfg.get('general', 'precision', default=None)
+    try:
+        cfg.set('general', 'precision', 'double')
+        assert_equal(zscored(ds).dtype, np.float64)
+        assert_equal(zscored(dsf).dtype, np.float64)
+        cfg.set('general', 'precision', 'single')
+        for d in (ds, dsf):
+            zds = zscored(d)
+            assert_equal(zds.dtype, np.float32)
+            assert_array_almost_equal(zds, zscored(d, dtype='float64'))
+        # explicit dtype has the last word
+        assert_equal(zscored(ds, dtype='float64').dtype, np.float64)
+        assert_equal(zscored(dsf, dtype='float64').dtype, np.float64)
+        # source is not modified
+        assert_array_equal(dsf.samples, ds.samples)
+        # in-place z-scoring keeps floating point data as is
+        samples = dsf.samples
+        zscore(dsf)
+        ok_(dsf.samples is samples)
+    finally:
+        if precision is None:
+            cfg.remove_option('general', 'precision')
+        else:
+            cfg.set('general', 'precision', precision)